@@ -0,0 +1,13 @@
+class ContentAuditAgent:
+    def audit_content(self, x):
+        self.load_checklists()
+        self.split_into_chunks(x)
+        self.analyze_chunk(x)
+        self.fix_chunk_with_ai(x)
+        self.postprocess_content(x)
+        self.generate_report()
+    def postprocess_content(self, t):
+        t = self._strip_scaffolding(t)
+        t = self._clean_links(t)
+        t = self._fix_code_fences(t)
+        return t
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Static Assets - In-memory, precompressed static files shared by both servers
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+
+# File types served from memory; everything else falls through to the server's own handling
+ASSET_EXTENSIONS = {".html", ".js", ".css"}
+
+# Variants smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+# Local src/href references in HTML pages that get a ?v=<hash> fingerprint
+ASSET_REFERENCE = re.compile(r'(\b(?:src|href)=")([^":?#]+)(")')
+
+FINGERPRINT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class Asset:
+    """One static file with its precompressed variants"""
+    name: str
+    content_type: str
+    digest: str
+    mtime_ns: int
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def fingerprint(self) -> str:
+        return self.digest[:12]
+
+    def etag(self, encoding: str) -> str:
+        # Each encoding is a different representation and needs its own strong ETag
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.fingerprint}{suffix}"'
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Map each encoding in an Accept-Encoding header to its q-value"""
+    accepted = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class AssetStore:
+    """Static files loaded into memory with gzip/brotli variants and content-hash ETags
+
+    HTML pages are rewritten so that references to other assets carry a
+    ``?v=<hash>`` fingerprint. Fingerprinted requests are served with
+    ``Cache-Control: immutable``; everything else must revalidate with its
+    ETag. Call ``invalidate`` (from a file watcher) or ``refresh`` (from a
+    polling loop) when files change.
+    """
+
+    def __init__(self, root: Path, extensions=ASSET_EXTENSIONS):
+        self.root = Path(root)
+        self.extensions = set(extensions)
+        self._assets: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _candidates(self) -> List[Path]:
+        return sorted(p for p in self.root.iterdir() if p.is_file() and p.suffix in self.extensions)
+
+    def _build(self, path: Path, data: bytes, mtime_ns: int) -> Asset:
+        variants = {"identity": data}
+        if len(data) >= MIN_COMPRESS_SIZE:
+            gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gzipped) < len(data):
+                variants["gzip"] = gzipped
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    variants["br"] = compressed
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        return Asset(
+            name=path.name,
+            content_type=content_type,
+            digest=hashlib.sha256(data).hexdigest(),
+            mtime_ns=mtime_ns,
+            variants=variants,
+        )
+
+    def _fingerprint_html(self, data: bytes, assets: Dict[str, Asset]) -> bytes:
+        def add_version(match):
+            asset = assets.get(match.group(2).lstrip("./"))
+            if asset is None or asset.name.endswith(".html"):
+                return match.group(0)
+            return f"{match.group(1)}{match.group(2)}?v={asset.fingerprint}{match.group(3)}"
+
+        return ASSET_REFERENCE.sub(add_version, data.decode("utf-8")).encode("utf-8")
+
+    def refresh(self) -> bool:
+        """Reload files whose mtime changed; returns True if anything changed"""
+        with self._lock:
+            stats = {path.name: (path, path.stat().st_mtime_ns) for path in self._candidates()}
+            if stats.keys() == self._assets.keys() and all(
+                self._assets[name].mtime_ns == mtime_ns for name, (_, mtime_ns) in stats.items()
+            ):
+                return False
+
+            # Non-HTML first so pages are fingerprinted with the current hashes
+            assets = {}
+            for name, (path, mtime_ns) in stats.items():
+                if path.suffix == ".html":
+                    continue
+                current = self._assets.get(name)
+                if current is not None and current.mtime_ns == mtime_ns:
+                    assets[name] = current
+                else:
+                    assets[name] = self._build(path, path.read_bytes(), mtime_ns)
+            for name, (path, mtime_ns) in stats.items():
+                if path.suffix == ".html":
+                    html = self._fingerprint_html(path.read_bytes(), assets)
+                    assets[name] = self._build(path, html, mtime_ns)
+
+            self._assets = assets
+            return True
+
+    def invalidate(self, path) -> None:
+        """Reload after a watcher reported a change to ``path``"""
+        if Path(path).suffix in self.extensions:
+            self.refresh()
+
+    def get(self, name: str) -> Optional[Asset]:
+        return self._assets.get(name.lstrip("/"))
+
+    def respond(self, name: str, version: Optional[str], accept_encoding: Optional[str],
+                if_none_match: Optional[str]) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Build (status, headers, body) for a request, or None if ``name`` is not an asset"""
+        asset = self.get(name)
+        if asset is None:
+            return None
+
+        accepted = parse_accept_encoding(accept_encoding)
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and accepted.get(candidate, accepted.get("*", 0)) > 0:
+                encoding = candidate
+                break
+
+        etag = asset.etag(encoding)
+        fingerprinted = version is not None and version == asset.fingerprint
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": FINGERPRINT_CACHE_CONTROL if fingerprinted else REVALIDATE_CACHE_CONTROL,
+        }
+        if etag_matches(if_none_match, etag):
+            return 304, headers, b""
+
+        body = asset.variants[encoding]
+        headers["Content-Type"] = asset.content_type
+        headers["Content-Length"] = str(len(body))
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return 200, headers, body
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Audit Jobs - Bounded job queue running content audits in a process pool
+
+Each job runs one ``ContentAuditAgent.audit_content`` call in a worker
+process. Everything the agent prints, and its trace spans, come back to
+the server as events tagged with workflow node ids, and the server streams
+them to the caller as server-sent events. At most ``workers`` jobs run at
+once and at most ``max_queue`` wait; beyond that ``submit`` raises
+``AuditQueueFull`` so the endpoint can answer 429 with a Retry-After.
+
+The agent class is configurable (``WORKFLOW_AUDIT_AGENT=module:Class``),
+so ``audit_jobs:DryRunAgent`` runs the whole pipeline without any
+OpenAI calls.
+"""
+
+import asyncio
+import contextlib
+import importlib
+import inspect
+import io
+import json
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Any, AsyncIterator, Optional
+
+from checklist_engine import ChecklistEngine
+from tracing import Tracer, current_node
+
+logger = logging.getLogger(__name__)
+
+AUDIT_WORKERS = int(os.environ.get("WORKFLOW_AUDIT_WORKERS", "2"))
+AUDIT_QUEUE_SIZE = int(os.environ.get("WORKFLOW_AUDIT_QUEUE_SIZE", "8"))
+AUDIT_AGENT = os.environ.get("WORKFLOW_AUDIT_AGENT", "content_audit_agent_v4:ContentAuditAgent")
+
+# Where the agent module lives, added to sys.path in the workers
+AGENT_DIR = Path(__file__).parent.parent / "article-optimizer"
+
+# Retry-After hint before any job has finished
+DEFAULT_JOB_SECONDS = 30.0
+
+# Set in each worker by the pool initializer; events go back to the server through it
+_worker_events = None
+
+
+class AuditQueueFull(Exception):
+    """Raised by ``submit`` when the waiting queue is at its limit"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Audit queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class DryRunAgent:
+    """Offline stand-in for ContentAuditAgent with the same traced methods
+
+    Produces canned output without network access, for trying out the
+    /audit stream and the live graph.
+    """
+
+    def __init__(self, step_seconds: float = 0.05):
+        self.step_seconds = step_seconds
+
+    def _step(self, message: str):
+        print(message)
+        time.sleep(self.step_seconds)
+
+    def load_checklists(self):
+        self.engine = ChecklistEngine()
+        self._step(f"Loaded {len(self.engine.rules)} pattern checks")
+        return list(self.engine.rules)
+
+    def split_into_chunks(self, content: str):
+        self._step("Splitting content")
+        words = content.split()
+        return [" ".join(words[i:i + 400]) for i in range(0, len(words), 400)] or [""]
+
+    def analyze_chunk(self, chunk: str):
+        failed = [check_id for check_id, match in self.engine.scan(chunk).items() if not match.passed]
+        self._step(f"Analyzed chunk of {len(chunk.split())} words: {len(failed)} checks failed")
+        return {"failed": failed}
+
+    def fix_chunk_with_ai(self, chunk: str):
+        self._step("Fixing chunk (dry run, no API call)")
+        return chunk
+
+    def postprocess_content(self, content: str):
+        self._step("Postprocessing")
+        return content.strip()
+
+    def generate_report(self, results):
+        self._step("Generating report")
+        failed = sorted({check_id for result in results for check_id in result["failed"]})
+        return f"# Audit Report\n\nChunks analyzed: {len(results)}\nFailed checks: {', '.join(failed) or 'none'}\n"
+
+    def audit_content(self, content: str, fix: bool = False, web_search: bool = False):
+        self.load_checklists()
+        chunks = self.split_into_chunks(content)
+        results = [self.analyze_chunk(chunk) for chunk in chunks]
+        fixed = None
+        if fix:
+            fixed = self.postprocess_content("\n\n".join(self.fix_chunk_with_ai(chunk) for chunk in chunks))
+        return {"report_markdown": self.generate_report(results), "fixed_content": fixed}
+
+
+def load_agent_class(spec: str):
+    """Resolve ``module:Class``, looking in the article-optimizer directory too"""
+    module_name, _, attribute = spec.partition(":")
+    if str(AGENT_DIR) not in sys.path:
+        sys.path.insert(0, str(AGENT_DIR))
+    return getattr(importlib.import_module(module_name), attribute or "ContentAuditAgent")
+
+
+class _LogStream(io.TextIOBase):
+    """stdout/stderr replacement that turns each printed line into a log event"""
+
+    def __init__(self, emit: Callable[[str, Any], None], stream: str):
+        self.emit = emit
+        self.stream = stream
+        self._buffer = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            if line.strip():
+                self.emit("log", {"node": current_node(), "stream": self.stream, "message": line})
+        return len(text)
+
+    def flush(self) -> None:
+        if self._buffer.strip():
+            self.emit("log", {"node": current_node(), "stream": self.stream, "message": self._buffer})
+        self._buffer = ""
+
+
+def _init_worker(events) -> None:
+    global _worker_events
+    _worker_events = events
+
+
+def _normalize_result(result: Any) -> Dict[str, Any]:
+    if isinstance(result, dict):
+        return {
+            "report_markdown": result.get("report_markdown", result.get("reportMarkdown", "")),
+            "fixed_content": result.get("fixed_content", result.get("fixedContent")),
+        }
+    if isinstance(result, tuple) and len(result) == 2:
+        return {"report_markdown": result[0], "fixed_content": result[1]}
+    return {"report_markdown": "" if result is None else str(result), "fixed_content": None}
+
+
+def run_audit_job(job_id: str, request: Dict[str, Any], agent_spec: str) -> None:
+    """Worker entry point: run one audit and report events through the shared queue"""
+    def emit(event: str, data: Any) -> None:
+        _worker_events.put((job_id, event, data))
+
+    tracer = Tracer(lambda spans: emit("spans", spans), flush_interval=0.1)
+    stdout, stderr = _LogStream(emit, "stdout"), _LogStream(emit, "stderr")
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            agent = tracer.attach(load_agent_class(agent_spec)())
+            # Only pass the options the agent's audit_content accepts
+            options = {"fix": bool(request.get("fix")), "web_search": bool(request.get("web_search"))}
+            parameters = inspect.signature(agent.audit_content).parameters
+            accepts_any = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+            kwargs = {k: v for k, v in options.items() if accepts_any or k in parameters}
+            with tracer.run(job_id):
+                result = agent.audit_content(request.get("content") or request.get("url"), **kwargs)
+            stdout.flush()
+            stderr.flush()
+        tracer.close()
+        emit("result", _normalize_result(result))
+    except Exception as e:
+        stdout.flush()
+        stderr.flush()
+        tracer.close()
+        # The failing node is the span that ended with ok=false
+        emit("error", {"message": f"{type(e).__name__}: {e}"})
+
+
+class AuditJob:
+    def __init__(self, request: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.started = False
+
+
+class AuditJobQueue:
+    """Runs audit jobs in a process pool with a bounded waiting queue"""
+
+    def __init__(self, workers: int = AUDIT_WORKERS, max_queue: int = AUDIT_QUEUE_SIZE,
+                 agent_spec: str = AUDIT_AGENT,
+                 on_spans: Optional[Callable[[list], Awaitable[None]]] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.agent_spec = agent_spec
+        self.on_spans = on_spans
+        self.jobs: Dict[str, AuditJob] = {}
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.pool_restarts = 0
+        self.average_seconds: Optional[float] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._context = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._events = None
+        self._reader: Optional[threading.Thread] = None
+
+    def _start(self) -> None:
+        """Create the pool on first use so importing the server stays cheap"""
+        if self._pool is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.workers)
+        # Spawned, not forked: forking the threaded server can leave a child stuck on a lock held at fork time
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+        self._pool = self._new_pool()
+        self._reader = threading.Thread(target=self._read_events, name="audit-events", daemon=True)
+        self._reader.start()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context,
+                                   initializer=_init_worker, initargs=(self._events,))
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a new pool after a worker died; jobs failing on the same pool replace it once"""
+        if self._pool is not broken:
+            return
+        logger.warning("Audit worker process died; restarting the pool")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+        self.pool_restarts += 1
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up"""
+        per_job = self.average_seconds or DEFAULT_JOB_SECONDS
+        ahead = max(0, self.running + self.waiting - self.workers) + 1
+        return max(1, math.ceil(per_job * ahead / self.workers))
+
+    def submit(self, request: Dict[str, Any]) -> AuditJob:
+        """Queue an audit; raises ``AuditQueueFull`` when too many jobs are waiting"""
+        self._start()
+        # Jobs admitted but not yet holding a worker slot count against the queue limit
+        if self.running + self.waiting >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise AuditQueueFull(self.retry_after())
+        job = AuditJob(request)
+        self.jobs[job.id] = job
+        self.waiting += 1
+        job.events.put_nowait(("queued", {"job": job.id, "position": self.waiting}))
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    async def _run(self, job: AuditJob) -> None:
+        async with self._slots:
+            self.waiting -= 1
+            job.started = True
+            self.running += 1
+            job.events.put_nowait(("started", {"job": job.id}))
+            started = time.monotonic()
+            pool = self._pool
+            try:
+                await self.loop.run_in_executor(pool, run_audit_job, job.id, job.request, self.agent_spec)
+            except BrokenProcessPool:
+                # Not retried: this job may be what killed the worker (e.g. out of memory)
+                logger.error(f"Audit job {job.id} lost its worker process")
+                self._replace_pool(pool)
+                job.events.put_nowait(("error", {"message": "The audit worker process died; please retry"}))
+            except Exception as e:
+                # e.g. the worker process died; the job never reported back
+                logger.error(f"Audit job {job.id} failed: {e}")
+                job.events.put_nowait(("error", {"message": f"{type(e).__name__}: {e}"}))
+            finally:
+                self.running -= 1
+                self.completed += 1
+                elapsed = time.monotonic() - started
+                self.average_seconds = elapsed if self.average_seconds is None else (
+                    0.8 * self.average_seconds + 0.2 * elapsed)
+
+    def _read_events(self) -> None:
+        """Forward worker events to the event loop (runs in a thread)"""
+        while True:
+            message = self._events.get()
+            if message is None:
+                return
+            try:
+                self.loop.call_soon_threadsafe(self._dispatch, *message)
+            except RuntimeError:
+                # Event loop closed while a worker was still reporting
+                return
+
+    def _dispatch(self, job_id: str, event: str, data: Any) -> None:
+        job = self.jobs.get(job_id)
+        if event == "spans" and self.on_spans is not None:
+            asyncio.ensure_future(self.on_spans(data))
+        if job is not None:
+            job.events.put_nowait((event, data))
+
+    async def stream(self, job: AuditJob) -> AsyncIterator[str]:
+        """Server-sent events for ``job`` until its result or error"""
+        try:
+            while True:
+                event, data = await job.events.get()
+                yield f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+                if event in ("result", "error"):
+                    return
+        finally:
+            self.jobs.pop(job.id, None)
+            if not job.started and not job.task.done():
+                # Client went away before the job started; don't run it
+                job.task.cancel()
+                self.waiting -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "pool_restarts": self.pool_restarts,
+            "average_seconds": self.average_seconds,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._events.put(None)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Batch Parse - Generate workflows for many agent scripts at once
+
+Takes files, directories and glob patterns, parses every script with
+``WorkflowParser`` in a process pool across all cores, and streams one
+record per script as NDJSON or as the compact binary stream of
+workflow_codec.py:
+
+    python batch_parse.py agents/ 'clients/**/content_audit_*.py' -o graphs.ndjson
+    python batch_parse.py agents/ --format binary -o graphs.bin
+
+Each record is ``{"path", "digest", "status"}`` plus ``workflow``
+(status ``parsed`` or ``unchanged``) or ``error`` (status ``error``). A
+manifest of content hashes (the script plus its ``checklists/*.json``)
+and the workflows they gave is kept on disk. Scripts whose hash hasn't
+changed since the last run are reported as ``unchanged`` with their
+stored workflow instead of being parsed again, so every run still writes
+every graph. The manifest is dropped when the parser itself changes.
+"""
+
+import argparse
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from parser import WorkflowParser
+from workflow_codec import WorkflowEncoder
+
+DEFAULT_MANIFEST = ".workflow-manifest.json"
+
+# Modules whose code shapes the parsed workflow; editing any of them invalidates the manifest
+PARSER_SOURCES = ("parser.py", "layout.py", "graph_metrics.py", "checklist_index.py")
+
+
+def expand_inputs(inputs: Iterable[str], pattern: str = "*.py") -> List[Path]:
+    """Scripts named by ``inputs``: files, directories (searched recursively for ``pattern``) and globs"""
+    found: Dict[Path, Path] = {}
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            matches = sorted(path.rglob(pattern))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(Path(match) for match in glob.glob(item, recursive=True))
+        for match in matches:
+            if match.is_file():
+                found.setdefault(match.resolve(), match)
+    return list(found.values())
+
+
+def parser_fingerprint() -> str:
+    hasher = hashlib.sha256()
+    for name in PARSER_SOURCES:
+        hasher.update(name.encode() + b"\0")
+        hasher.update((Path(__file__).parent / name).read_bytes())
+    return hasher.hexdigest()
+
+
+class Manifest:
+    """Content hash of every script as of its last successful parse and the workflow it gave, stored as JSON"""
+
+    def __init__(self, path: Optional[Path], fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.scripts: Dict[str, str] = {}
+        # Parsed workflows keyed by digest, so unchanged scripts can be emitted without parsing
+        self.workflows: Dict[str, Any] = {}
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                data = {}
+            if data.get("parser") == fingerprint:
+                self.scripts = data.get("scripts", {})
+                self.workflows = data.get("workflows", {})
+
+    def unchanged(self, key: str, digest: str) -> bool:
+        return self.scripts.get(key) == digest and digest in self.workflows
+
+    def workflow(self, digest: str) -> Any:
+        return self.workflows[digest]
+
+    def record(self, key: str, digest: str, workflow: Any) -> None:
+        self.scripts[key] = digest
+        self.workflows[digest] = workflow
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        live = set(self.scripts.values())
+        workflows = {digest: workflow for digest, workflow in self.workflows.items() if digest in live}
+        body = json.dumps({"parser": self.fingerprint, "scripts": self.scripts, "workflows": workflows},
+                          indent=1, sort_keys=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(body)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class _ChecklistHashes:
+    """Hash of each checklists/ directory, computed once per run however many scripts share it"""
+
+    def __init__(self):
+        self._hashes: Dict[Path, bytes] = {}
+
+    def get(self, script: Path) -> bytes:
+        directory = script.parent / "checklists"
+        cached = self._hashes.get(directory)
+        if cached is None:
+            hasher = hashlib.sha256()
+            for checklist_file in sorted(directory.glob("*.json")):
+                try:
+                    data = checklist_file.read_bytes()
+                except OSError:
+                    continue
+                hasher.update(checklist_file.name.encode() + b"\0")
+                hasher.update(hashlib.sha256(data).digest())
+            cached = self._hashes[directory] = hasher.digest()
+        return cached
+
+
+def parse_job(job: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+    """Worker side: parse one script whose content was read by the caller"""
+    path, content = job
+    # The parser reports problems with print(); keep them off an NDJSON stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        parser = WorkflowParser(path)
+        workflow = parser.parse(content)
+    if parser.error is not None:
+        return {"status": "error", "error": parser.error}
+    return {"status": "parsed", "workflow": workflow}
+
+
+def parse_scripts(scripts: List[Path], manifest: Manifest, jobs: Optional[int] = None,
+                  force: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield a record per script: unchanged ones (with their stored workflow) first, then parse results in input order
+
+    The manifest is updated in memory as scripts parse; call ``save()`` afterwards.
+    """
+    checklists = _ChecklistHashes()
+    pending: List[Tuple[Path, str, Optional[str]]] = []
+    for script in scripts:
+        try:
+            content = script.read_text()
+        except (OSError, UnicodeDecodeError) as e:
+            yield {"path": str(script), "digest": None, "status": "error", "error": str(e)}
+            continue
+        hasher = hashlib.sha256(content.encode())
+        hasher.update(checklists.get(script))
+        digest = hasher.hexdigest()
+        if not force and manifest.unchanged(str(script.resolve()), digest):
+            yield {"path": str(script), "digest": digest, "status": "unchanged",
+                   "workflow": manifest.workflow(digest)}
+        else:
+            pending.append((script, digest, content))
+
+    if not pending:
+        return
+    work = [(str(script), content) for script, _, content in pending]
+    workers = min(jobs or os.cpu_count() or 1, len(pending))
+    if workers == 1:
+        results: Iterable[Dict[str, Any]] = map(parse_job, work)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(parse_job, work, chunksize=max(1, len(work) // (workers * 4)))
+    try:
+        for (script, digest, _), result in zip(pending, results):
+            if result["status"] == "parsed":
+                manifest.record(str(script.resolve()), digest, result["workflow"])
+            yield {"path": str(script), "digest": digest, **result}
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def write_ndjson(records: Iterable[Dict[str, Any]], out) -> None:
+    for record in records:
+        out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        out.flush()
+
+
+def write_binary(records: Iterable[Dict[str, Any]], out) -> None:
+    encoder = WorkflowEncoder()
+    for record in records:
+        out.write(encoder.encode(record))
+        out.flush()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Parse many agent scripts into workflows")
+    parser.add_argument("inputs", nargs="+", help="script files, directories or glob patterns")
+    parser.add_argument("--pattern", default="*.py", help="file pattern searched for in directories (default *.py)")
+    parser.add_argument("--format", choices=("ndjson", "binary"), default="ndjson",
+                        help="NDJSON, or the interned MessagePack stream of workflow_codec.py")
+    parser.add_argument("-o", "--output", default="-", help="output file (default stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST,
+                        help=f"content hash manifest used to skip unchanged scripts (default {DEFAULT_MANIFEST})")
+    parser.add_argument("--no-manifest", action="store_true", help="parse everything and keep no manifest")
+    parser.add_argument("--force", action="store_true", help="parse every script, then refresh the manifest")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scripts = expand_inputs(args.inputs, args.pattern)
+    manifest = Manifest(None if args.no_manifest else Path(args.manifest), parser_fingerprint())
+    counts: Dict[str, int] = {}
+
+    def counted(records):
+        for record in records:
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+            yield record
+
+    started = time.perf_counter()
+    binary = args.format == "binary"
+    if args.output == "-":
+        out = contextlib.nullcontext(sys.stdout.buffer if binary else sys.stdout)
+    else:
+        out = open(args.output, "wb" if binary else "w")
+    try:
+        with out as stream:
+            records = counted(parse_scripts(scripts, manifest, args.jobs, args.force))
+            (write_binary if binary else write_ndjson)(records, stream)
+    finally:
+        # Keep what parsed even if the run was interrupted
+        manifest.save()
+
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "no scripts"
+    print(f"{len(scripts)} scripts: {summary} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 1 if counts.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Benchmark - Parse, payload and fan-out measurements for the visualizer
+
+Generates a synthetic ``ContentAuditAgent`` module and checklist directory
+of a chosen size in a temporary directory, then records:
+
+- ``WorkflowParser.parse`` latency and peak allocation
+- payload sizes: full workflow, topology (plain and gzip), node details and a one-step delta
+- change-to-receive latency for N WebSocket clients of server.py
+- change-to-receive latency for N HTTP pollers of simple_server.py
+- server memory (current and peak RSS, from /proc)
+
+Each change adds or removes one checklist file and one postprocessing step
+and rewrites the script, so every round produces a real topology update
+on both servers (simple_server.py's workflow only reflects the checklist
+count).
+Results are written as JSON so runs on different commits can be compared:
+
+    python benchmark.py run --steps 50 --checklists 20 --clients 100
+    python benchmark.py compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+
+try:
+    import websockets
+except ImportError:  # optional; only needed for the server.py fan-out run
+    websockets = None
+
+from node_details import split_workflow
+from parser import AUDIT_METHOD_NODES, WorkflowParser
+from workflow_delta import diff_workflows
+
+HERE = Path(__file__).parent
+SCRIPT_NAME = "content_audit_agent_v4.py"
+SEVERITIES = ("high", "medium", "low")
+
+
+def agent_source(steps: int, helpers: int) -> str:
+    """Source of a ContentAuditAgent with ``steps`` postprocessing steps and ``helpers`` helper methods"""
+    pipeline = [name for name in AUDIT_METHOD_NODES if name != "postprocess_content"]
+    lines = ['"""Synthetic ContentAuditAgent generated by benchmark.py"""', "", "", "class ContentAuditAgent:"]
+    lines += [
+        "    def audit_content(self, content, fix=False, web_search=False):",
+        '        """Audit ``content`` and optionally fix it."""',
+        "        if content.startswith('http'):",
+        "            content = self.fetch_google_doc(content)",
+        "        self.load_checklists()",
+        "        chunks = self.split_into_chunks(content)",
+        "        results = [self.analyze_chunk(chunk) for chunk in chunks]",
+        "        if fix:",
+        "            chunks = [self.fix_chunk_with_ai(chunk) for chunk in chunks]",
+        "            if web_search:",
+        "                self.validate_fixes(chunks)",
+        "        content = self.postprocess_content(' '.join(chunks))",
+        "        return self.generate_report(results), content",
+        "",
+    ]
+    for index, name in enumerate(pipeline):
+        lines += [f"    def {name}(self, *args):", f'        """{name.replace("_", " ").capitalize()}."""']
+        lines += [f"        self.helper_{h}(args)" for h in range(index, helpers, len(pipeline))]
+        lines += ["        return args", ""]
+    lines += ["    def postprocess_content(self, content):", '        """Run every cleanup step."""']
+    lines += [f"        content = self._step_{i}(content)" for i in range(steps)]
+    lines += ["        return content", ""]
+    for i in range(steps):
+        lines += [f"    def _step_{i}(self, content):", f'        """Cleanup step {i}."""',
+                  f"        return content.replace('<{i}>', '')", ""]
+    for h in range(helpers):
+        lines += [f"    def helper_{h}(self, value):", f'        """Helper {h}."""',
+                  f"        return [item for item in value if item != {h}]", ""]
+    return "\n".join(lines)
+
+
+def write_checklists(directory: Path, checklists: int, checks: int) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(checklists):
+        document = {
+            "name": f"Synthetic {i}",
+            "checks": [{
+                "id": f"synthetic-{i}-{j}",
+                "label": f"Avoid phrase {i}.{j}",
+                "params": {"severity": SEVERITIES[j % 3], "avoid_patterns": [f"phrase {i} {j}"]},
+            } for j in range(checks)],
+        }
+        (directory / f"checklist_{i:03d}.json").write_text(json.dumps(document, indent=2))
+
+
+def write_agent(workspace: Path, steps: int, helpers: int) -> Path:
+    script = workspace / SCRIPT_NAME
+    script.write_text(agent_source(steps, helpers))
+    return script
+
+
+def percentiles(values: List[float]) -> Dict[str, Any]:
+    """Summary of a latency sample, in milliseconds"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "p50": at(0.50),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """Current and peak resident set size of ``pid`` in KiB (Linux only)"""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    memory["rss_kb" if key == "VmRSS" else "peak_rss_kb"] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+
+def bench_parse(script: Path, repeat: int) -> Dict[str, Any]:
+    """Time full parses of ``script`` (read, AST walk, checklists, layout)"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        WorkflowParser(str(script)).parse()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    WorkflowParser(str(script)).parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"latency_ms": percentiles(timings), "peak_alloc_kb": peak // 1024,
+            "script_bytes": script.stat().st_size}
+
+
+def bench_payload(script: Path, steps: int, helpers: int) -> Dict[str, Any]:
+    """Sizes of what the servers send, plus the delta for a one-step change"""
+    workflow = WorkflowParser(str(script)).parse()
+    topology, details = split_workflow(workflow)
+    topology_json = json.dumps(topology, separators=(",", ":")).encode()
+    detail_sizes = [len(json.dumps(document, separators=(",", ":"))) for document in details.values()]
+
+    # Same agent with one more postprocessing step, laid out from the previous positions as the servers do
+    script.write_text(agent_source(steps + 1, helpers))
+    positions = {node["id"]: (node["x"], node["y"]) for node in topology["nodes"]}
+    changed, _ = split_workflow(WorkflowParser(str(script), positions).parse())
+    script.write_text(agent_source(steps, helpers))
+    delta = diff_workflows(topology, changed)
+
+    return {
+        "nodes": len(topology["nodes"]),
+        "connections": len(topology["connections"]),
+        "full_bytes": len(json.dumps(workflow, separators=(",", ":"))),
+        "topology_bytes": len(topology_json),
+        "topology_gzip_bytes": len(gzip.compress(topology_json)),
+        "details_total_bytes": sum(detail_sizes),
+        "details_max_bytes": max(detail_sizes, default=0),
+        "delta_bytes": len(json.dumps(delta, separators=(",", ":"))),
+    }
+
+
+class ServerProcess:
+    """server.py (under uvicorn) or simple_server.py running against the synthetic agent"""
+
+    def __init__(self, kind: str, workspace: Path, port: int, debounce: float):
+        self.kind = kind
+        self.port = port
+        env = {
+            **os.environ,
+            "WORKFLOW_SCRIPT": str(workspace / SCRIPT_NAME),
+            "WORKFLOW_OUTPUT": str(workspace / "workflow.json"),
+            "WORKFLOW_DEBOUNCE_SECONDS": str(debounce),
+        }
+        if kind == "server":
+            command = [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1",
+                       "--port", str(port), "--log-level", "warning"]
+        else:
+            command = [sys.executable, "simple_server.py", "--port", str(port)]
+        self.log = open(workspace / f"{kind}.log", "w")
+        self.process = subprocess.Popen(command, cwd=HERE, env=env, stdout=self.log,
+                                        stderr=subprocess.STDOUT)
+
+    def wait_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.kind} exited with code {self.process.returncode}; see {self.log.name}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/cache-stats", timeout=1):
+                    return
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.2)
+        raise RuntimeError(f"{self.kind} did not start within {timeout}s")
+
+    def memory(self) -> Dict[str, int]:
+        return process_memory(self.process.pid)
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+class RoundTracker:
+    """Which clients have seen the current change, and how long it took them"""
+
+    def __init__(self, clients: int):
+        self.clients = clients
+        self.latencies: List[float] = []
+        self.spreads: List[float] = []
+        self.missed = 0
+        self.started: Optional[float] = None
+        self._seen: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def begin(self) -> None:
+        with self._lock:
+            self._seen = {}
+            self._done.clear()
+            self.started = time.perf_counter()
+
+    def received(self, client: int) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            if self.started is None or client in self._seen:
+                return
+            self._seen[client] = now
+            self.latencies.append(now - self.started)
+            if len(self._seen) == self.clients:
+                self._done.set()
+
+    def finish(self, timeout: float) -> None:
+        self._done.wait(timeout)
+        with self._lock:
+            self.missed += self.clients - len(self._seen)
+            if self._seen:
+                self.spreads.append(max(self._seen.values()) - min(self._seen.values()))
+            self.started = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {"latency_ms": percentiles(self.latencies), "spread_ms": percentiles(self.spreads),
+                "missed": self.missed}
+
+
+def run_rounds(tracker: RoundTracker, change: Callable[[int], None], rounds: int, timeout: float) -> None:
+    for round_index in range(rounds):
+        tracker.begin()
+        change(round_index)
+        tracker.finish(timeout)
+
+
+async def _websocket_clients(url: str, tracker: RoundTracker, change: Callable[[int], None],
+                             rounds: int, timeout: float) -> Dict[str, int]:
+    connected = 0
+    resyncs = 0
+    all_connected = asyncio.Event()
+
+    async def client(index: int) -> None:
+        nonlocal connected, resyncs
+        async with websockets.connect(url, max_size=None) as ws:
+            await ws.recv()  # catch-up message
+            connected += 1
+            if connected == tracker.clients:
+                all_connected.set()
+            async for message in ws:
+                data = json.loads(message)
+                if data.get("type") == "resync":
+                    # Our queue overflowed; ask for the full workflow like the browser does
+                    resyncs += 1
+                    await ws.send("resync")
+                elif data.get("type") in ("workflow_update", "workflow_delta"):
+                    tracker.received(index)
+
+    tasks = [asyncio.create_task(client(i)) for i in range(tracker.clients)]
+    try:
+        await asyncio.wait_for(all_connected.wait(), timeout)
+        # Rounds block on threading events; run them off the loop so clients keep receiving
+        await asyncio.get_running_loop().run_in_executor(None, run_rounds, tracker, change, rounds, timeout)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return {"connected": connected, "resyncs": resyncs}
+
+
+def bench_websocket(server: ServerProcess, clients: int, rounds: int, change: Callable[[int], None],
+                    timeout: float) -> Dict[str, Any]:
+    """N WebSocket clients of server.py; latency is script write to message received"""
+    tracker = RoundTracker(clients)
+    url = f"ws://127.0.0.1:{server.port}/ws"
+    counts = asyncio.run(_websocket_clients(url, tracker, change, rounds, timeout))
+    return {"clients": clients, "rounds": rounds, **counts, **tracker.summary(), "memory": server.memory()}
+
+
+def bench_polling(server: ServerProcess, clients: int, rounds: int, change: Callable[[int], None],
+                  timeout: float, interval: float) -> Dict[str, Any]:
+    """N conditional-GET pollers of simple_server.py; latency is script write to new ETag seen"""
+    tracker = RoundTracker(clients)
+    url = f"http://127.0.0.1:{server.port}/workflow.json"
+    stop = threading.Event()
+    requests = [0] * clients
+    not_modified = [0] * clients
+    ready = threading.Barrier(clients + 1)
+
+    def poll(index: int) -> None:
+        etag = None
+
+        def fetch() -> Optional[str]:
+            request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+            requests[index] += 1
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    response.read()
+                    return response.headers.get("ETag")
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    not_modified[index] += 1
+                return None
+
+        etag = fetch()
+        ready.wait()
+        # Spread the pollers over the interval like independent browsers
+        stop.wait(random.uniform(0, interval))
+        while not stop.is_set():
+            try:
+                new_etag = fetch()
+            except OSError:
+                new_etag = None
+            if new_etag and new_etag != etag:
+                etag = new_etag
+                tracker.received(index)
+            stop.wait(interval)
+
+    threads = [threading.Thread(target=poll, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    try:
+        run_rounds(tracker, change, rounds, timeout)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout)
+    return {"clients": clients, "rounds": rounds, "interval_s": interval, **tracker.summary(),
+            "requests": sum(requests), "not_modified": sum(not_modified), "memory": server.memory()}
+
+
+def git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=HERE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=HERE,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    return {"commit": commit, "dirty": bool(dirty)}
+
+
+def run(args) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("func", "output")},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="workflow-bench-") as tmp:
+        workspace = Path(tmp)
+        write_checklists(workspace / "checklists", args.checklists, args.checks)
+        script = write_agent(workspace, args.steps, args.helpers)
+        print(f"Synthetic agent: {args.steps} steps, {args.helpers} helpers, "
+              f"{args.checklists} checklists x {args.checks} checks")
+
+        results["parse"] = bench_parse(script, args.parse_repeat)
+        print(f"  parse p50 {results['parse']['latency_ms']['p50']}ms")
+        results["payload"] = bench_payload(script, args.steps, args.helpers)
+        print(f"  topology {results['payload']['topology_bytes']} bytes, "
+              f"delta {results['payload']['delta_bytes']} bytes")
+
+        extra_checklist = workspace / "checklists" / "checklist_extra.json"
+
+        def change(round_index: int) -> None:
+            # Alternate between one extra step/checklist and none so every write changes the topology
+            grow = round_index % 2 == 0
+            if grow:
+                extra_checklist.write_text(json.dumps({"name": "Extra", "checks": []}))
+            else:
+                extra_checklist.unlink()
+            script.write_text(agent_source(args.steps + 1 if grow else args.steps, args.helpers))
+
+        targets = {target.strip() for target in args.targets.split(",")}
+        if "server" in targets:
+            if websockets is None:
+                print("  skipping server.py fan-out: the websockets package is not installed")
+            else:
+                server = ServerProcess("server", workspace, args.port, args.debounce)
+                try:
+                    server.wait_ready()
+                    results["websocket"] = bench_websocket(server, args.clients, args.rounds, change, args.timeout)
+                finally:
+                    server.stop()
+                print(f"  websocket p95 {results['websocket']['latency_ms'].get('p95')}ms "
+                      f"({results['websocket']['missed']} missed)")
+        if "simple" in targets:
+            # Start from the base agent whatever round the previous server ended on
+            extra_checklist.unlink(missing_ok=True)
+            script.write_text(agent_source(args.steps, args.helpers))
+            server = ServerProcess("simple", workspace, args.port, args.debounce)
+            try:
+                server.wait_ready()
+                results["polling"] = bench_polling(server, args.clients, args.rounds, change,
+                                                   args.timeout, args.poll_interval)
+            finally:
+                server.stop()
+            print(f"  polling p95 {results['polling']['latency_ms'].get('p95')}ms "
+                  f"({results['polling']['missed']} missed)")
+    return results
+
+
+def flatten(document: Any, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of a results document keyed by dotted path"""
+    if isinstance(document, dict):
+        flat = {}
+        for key, value in document.items():
+            flat.update(flatten(value, f"{prefix}{key}."))
+        return flat
+    if isinstance(document, (int, float)) and not isinstance(document, bool):
+        return {prefix[:-1]: document}
+    return {}
+
+
+def compare(before_path: Path, after_path: Path) -> None:
+    before = json.loads(Path(before_path).read_text())
+    after = json.loads(Path(after_path).read_text())
+    print(f"{'metric':<40} {'before':>12} {'after':>12} {'change':>9}")
+    old, new = flatten(before), flatten(after)
+    for key in old:
+        if key.startswith(("config.", "cpus")) or key not in new:
+            continue
+        change = f"{(new[key] - old[key]) / old[key] * 100:+.1f}%" if old[key] else ""
+        print(f"{key:<40} {old[key]:>12} {new[key]:>12} {change:>9}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Workflow visualizer benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="generate a synthetic agent and measure")
+    run_parser.add_argument("--steps", type=int, default=20, help="postprocessing steps (one node each)")
+    run_parser.add_argument("--helpers", type=int, default=20, help="extra helper methods in the agent")
+    run_parser.add_argument("--checklists", type=int, default=5, help="checklist files (one node each)")
+    run_parser.add_argument("--checks", type=int, default=20, help="checks per checklist file")
+    run_parser.add_argument("--parse-repeat", type=int, default=20, help="timed parses")
+    run_parser.add_argument("--clients", type=int, default=50, help="concurrent WebSocket clients / HTTP pollers")
+    run_parser.add_argument("--rounds", type=int, default=10, help="script changes per server")
+    run_parser.add_argument("--targets", default="server,simple",
+                            help="comma-separated servers to load: server, simple (default both)")
+    run_parser.add_argument("--poll-interval", type=float, default=2.0,
+                            help="seconds between polls, like the enhanced view (default 2)")
+    run_parser.add_argument("--debounce", type=float, default=0.05,
+                            help="WORKFLOW_DEBOUNCE_SECONDS for server.py (default 0.05)")
+    run_parser.add_argument("--timeout", type=float, default=15.0, help="seconds to wait for each change")
+    run_parser.add_argument("--port", type=int, default=8765, help="port for the server under test")
+    run_parser.add_argument("--output", type=Path, help="results file (default benchmark-<commit>-<time>.json)")
+
+    compare_parser = commands.add_parser("compare", help="show the change between two results files")
+    compare_parser.add_argument("before", type=Path)
+    compare_parser.add_argument("after", type=Path)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "compare":
+        compare(args.before, args.after)
+        return
+
+    results = run(args)
+    output = args.output
+    if output is None:
+        commit = results["git"].get("commit", "unknown")[:10]
+        output = Path(f"benchmark-{commit}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
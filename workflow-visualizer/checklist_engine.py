@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Checklist Engine - Single-pass matching for the master checklist's text patterns
+
+Every literal in ``patterns``/``avoid_patterns`` across the checks is
+compiled into one Aho-Corasick automaton. Templates such as
+"not just X, but also Y" become a single alternation regex. A chunk is
+then scanned once per automaton instead of once per pattern per check.
+Checks without text patterns (AI checks, word counts, ...) are not handled
+here.
+
+pyahocorasick is used when it is installed; otherwise a pure-Python
+automaton with the same interface is used.
+"""
+
+import json
+import re
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Any, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # optional; the pure-Python automaton below is used instead
+    ahocorasick = None
+
+CHECKLIST_DATA = Path(__file__).parent / "checklist-data.js"
+
+# Single capital letters stand for "any phrase" in template patterns
+PLACEHOLDER = re.compile(r"\b[XYZ]\b")
+
+# Joins texts in a batch; no pattern can match across it
+SEPARATOR = "\x00"
+
+
+def load_checklist_data(path: Path = CHECKLIST_DATA) -> Dict[str, Any]:
+    """Read the master checklist from checklist-data.js (or a plain JSON file)"""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        return json.loads(text)
+    # checklist-data.js assigns a JSON object literal to a const
+    data, _ = json.JSONDecoder().raw_decode(text, text.index("{"))
+    return data
+
+
+def iter_checks(data: Dict[str, Any]):
+    for category in data.get("categories", []):
+        for check in category.get("checks", []):
+            yield check
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _lower(text: str) -> str:
+    """Lowercase without changing offsets (a few characters grow when lowercased)"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class Automaton:
+    """Pure-Python Aho-Corasick automaton with pyahocorasick's interface"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+
+    def add_word(self, word: str, value: Any) -> None:
+        state = 0
+        for ch in word:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(value)
+
+    def make_automaton(self) -> None:
+        # Breadth-first so every fail link points at an already finished state
+        queue = deque(self._goto[0].values())  # depth-1 states fail to the root
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter(self, text: str):
+        """Yield (end index, value) for every occurrence, overlapping ones included"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for value in output[state]:
+                yield i, value
+
+
+@dataclass
+class CheckMatch:
+    """Occurrences of one check's patterns in a text"""
+    check_id: str
+    avoid: bool
+    count: int = 0
+    spans: List[Tuple[int, int]] = field(default_factory=list)
+    passed: Optional[bool] = None
+
+
+@dataclass(frozen=True)
+class _Rule:
+    check_id: str
+    avoid: bool
+    min_count: int
+    max_count: Optional[int]
+
+
+class ChecklistEngine:
+    """All text-pattern checks compiled for single-pass scanning"""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, case_sensitive: bool = False):
+        data = load_checklist_data() if data is None else data
+        self.case_sensitive = case_sensitive
+        self.rules: Dict[str, _Rule] = {}
+        # Literal -> [(check id, needs left boundary, needs right boundary)]
+        literals: Dict[str, List[Tuple[str, bool, bool]]] = {}
+        templates: List[Tuple[str, str]] = []
+
+        for check in iter_checks(data):
+            params = check.get("params", {})
+            avoid = "avoid_patterns" in params or "avoid_pattern" in params
+            if avoid:
+                patterns = params.get("avoid_patterns") or [params["avoid_pattern"]]
+            else:
+                patterns = params.get("patterns") or []
+            if not patterns:
+                continue
+            self.rules[check["id"]] = _Rule(
+                check["id"], avoid, params.get("min_count", 1), params.get("max_count"))
+            for pattern in patterns:
+                if PLACEHOLDER.search(pattern):
+                    templates.append((check["id"], pattern))
+                    continue
+                key = pattern if case_sensitive else _lower(pattern)
+                literals.setdefault(key, []).append(
+                    (check["id"], _is_word_char(pattern[0]), _is_word_char(pattern[-1])))
+
+        self._automaton = ahocorasick.Automaton() if ahocorasick is not None else Automaton()
+        for literal, owners in literals.items():
+            self._automaton.add_word(literal, (len(literal), tuple(owners)))
+        if literals:
+            self._automaton.make_automaton()
+        self._has_literals = bool(literals)
+
+        self._template_owners = [check_id for check_id, _ in templates]
+        self._template_regex = None
+        if templates:
+            alternatives = []
+            for i, (_, pattern) in enumerate(templates):
+                parts = PLACEHOLDER.split(pattern)
+                body = re.escape(parts[0])
+                for position, part in enumerate(parts[1:], 1):
+                    # A placeholder in the middle spans up to the next literal part; at the end, one word
+                    trailing = position == len(parts) - 1 and not part
+                    body += (r"\w+" if trailing else f"[^{SEPARATOR}\\n]+?") + re.escape(part)
+                alternatives.append(f"(?P<t{i}>{body})")
+            flags = 0 if case_sensitive else re.IGNORECASE
+            self._template_regex = re.compile("|".join(alternatives), flags)
+
+    def _matches(self, text: str):
+        """Yield (check id, start, end) for every pattern occurrence in ``text``"""
+        if self._has_literals:
+            haystack = text if self.case_sensitive else _lower(text)
+            length = len(haystack)
+            for end, (size, owners) in self._automaton.iter(haystack):
+                start = end - size + 1
+                before = start > 0 and _is_word_char(haystack[start - 1])
+                after = end + 1 < length and _is_word_char(haystack[end + 1])
+                for check_id, left_boundary, right_boundary in owners:
+                    # Word-like patterns only match whole words ("step" not in "misstep")
+                    if (left_boundary and before) or (right_boundary and after):
+                        continue
+                    yield check_id, start, end + 1
+        if self._template_regex is not None:
+            for match in self._template_regex.finditer(text):
+                yield self._template_owners[int(match.lastgroup[1:])], match.start(), match.end()
+
+    def _results(self, found: Iterable[Tuple[str, int, int]]) -> Dict[str, CheckMatch]:
+        results = {check_id: CheckMatch(check_id, rule.avoid) for check_id, rule in self.rules.items()}
+        for check_id, start, end in found:
+            result = results[check_id]
+            result.count += 1
+            result.spans.append((start, end))
+        for check_id, result in results.items():
+            rule = self.rules[check_id]
+            result.spans.sort()
+            if rule.avoid:
+                result.passed = result.count == 0
+            else:
+                result.passed = result.count >= rule.min_count and (
+                    rule.max_count is None or result.count <= rule.max_count)
+        return results
+
+    def scan(self, text: str) -> Dict[str, CheckMatch]:
+        """Per-check counts, spans and pass/fail for one text"""
+        return self._results(self._matches(text))
+
+    def scan_batch(self, texts: Iterable[str]) -> List[Dict[str, CheckMatch]]:
+        """``scan`` for many chunks or documents with a single pass over all of them
+
+        Spans are relative to each text.
+        """
+        texts = [text.replace(SEPARATOR, " ") for text in texts]
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(SEPARATOR)
+
+        per_text: List[List[Tuple[str, int, int]]] = [[] for _ in texts]
+        for check_id, start, end in self._matches(SEPARATOR.join(texts)):
+            index = bisect_right(starts, start) - 1
+            per_text[index].append((check_id, start - starts[index], end - starts[index]))
+        return [self._results(found) for found in per_text]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Checklist Index - Compact, pre-serialized checklist documents served on demand
+
+Built from the agent's ``checklists/*.json`` files (falling back to
+checklist-data.js when they define no checks), the index holds three
+levels of documents:
+
+- the summary: categories with counts only, small enough for first paint
+- one document per category: its checks' ids, labels, severity and auto-fix flag
+- one document per check: the full definition with its parameters
+
+Each document is serialized once per rebuild and carries a content-hash
+ETag, like the static assets.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from assets import etag_matches
+from checklist_engine import CHECKLIST_DATA, load_checklist_data
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = "no-cache"
+
+
+def slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "category"
+
+
+def categories_from_file(path: Path) -> List[Dict[str, Any]]:
+    """Categories defined by one checklist file
+
+    Accepts the master checklist layout (``{"categories": [...]}``), a single
+    checklist (``{"name": ..., "checks": [...]}``) or a bare list of checks.
+    """
+    data = load_checklist_data(path)
+    if isinstance(data, list):
+        return [{"name": path.stem.replace("_", " ").title(), "checks": data}]
+    if not isinstance(data, dict):
+        return []
+    if "categories" in data:
+        return [c for c in data["categories"] if isinstance(c, dict)]
+    if "checks" in data:
+        return [{"name": data.get("name") or path.stem.replace("_", " ").title(),
+                 "color": data.get("color"), "checks": data["checks"]}]
+    return []
+
+
+class ChecklistIndex:
+    """Category summary, per-category and per-check documents for the checklist views"""
+
+    def __init__(self, checklist_dir: Path, fallback: Optional[Path] = CHECKLIST_DATA):
+        self.checklist_dir = Path(checklist_dir)
+        self.fallback = Path(fallback) if fallback else None
+        self._signature = None
+        self._documents: Optional[Dict[Tuple[str, str], Tuple[str, bytes]]] = None
+        self._lock = threading.Lock()
+
+    def _sources(self) -> List[Path]:
+        if self.checklist_dir.is_dir():
+            return sorted(self.checklist_dir.glob("*.json"))
+        return []
+
+    def _stat_signature(self):
+        paths = self._sources() + ([self.fallback] if self.fallback else [])
+        signature = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load_categories(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        categories, sources = [], []
+        for path in self._sources():
+            try:
+                found = categories_from_file(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping checklist {path.name}: {e}")
+                continue
+            if any(category.get("checks") for category in found):
+                categories.extend(found)
+                sources.append(path.name)
+        if not categories and self.fallback and self.fallback.exists():
+            categories = categories_from_file(self.fallback)
+            sources = [self.fallback.name]
+        return categories, sources
+
+    def _build(self) -> Dict[Tuple[str, str], Tuple[str, bytes]]:
+        categories, sources = self._load_categories()
+        documents: Dict[Tuple[str, str], Any] = {}
+        summary = []
+        used_ids = set()
+        for category in categories:
+            category_id = slugify(category.get("name", ""))
+            while category_id in used_ids:
+                category_id += "-2"
+            used_ids.add(category_id)
+
+            checks = [c for c in category.get("checks", []) if isinstance(c, dict) and "id" in c]
+            entries = []
+            severities: Dict[str, int] = {}
+            for check in checks:
+                params = check.get("params", {})
+                severity = params.get("severity", "low")
+                severities[severity] = severities.get(severity, 0) + 1
+                entries.append({
+                    "id": check["id"],
+                    "label": check.get("label", check["id"]),
+                    "severity": severity,
+                    "auto_fixable": bool(params.get("auto_fixable")),
+                })
+                documents[("check", check["id"])] = {**check, "category": category_id}
+
+            documents[("category", category_id)] = {
+                "id": category_id,
+                "name": category.get("name", category_id),
+                "color": category.get("color"),
+                "checks": entries,
+            }
+            summary.append({
+                "id": category_id,
+                "name": category.get("name", category_id),
+                "color": category.get("color"),
+                "total": len(entries),
+                "severity": severities,
+                "auto_fixable": sum(1 for entry in entries if entry["auto_fixable"]),
+            })
+
+        documents[("summary", "")] = {
+            "total_checks": sum(category["total"] for category in summary),
+            "sources": sources,
+            "categories": summary,
+        }
+
+        serialized = {}
+        for key, document in documents.items():
+            body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+            serialized[key] = (f'"{hashlib.sha256(body).hexdigest()[:16]}"', body)
+        return serialized
+
+    def _current(self) -> Dict[Tuple[str, str], Tuple[str, bytes]]:
+        with self._lock:
+            if self._documents is None:
+                self._signature = self._stat_signature()
+                self._documents = self._build()
+            return self._documents
+
+    def invalidate(self, path=None) -> None:
+        """Drop the index after a watcher reported a change; rebuilt on next request"""
+        if path is None or Path(path).suffix in (".json", ".js"):
+            with self._lock:
+                self._documents = None
+
+    def refresh(self) -> bool:
+        """Invalidate if any checklist file changed (for polling servers)"""
+        if self._stat_signature() != self._signature:
+            self.invalidate()
+            return True
+        return False
+
+    def document(self, kind: str, key: str = "") -> Optional[Tuple[str, bytes]]:
+        """(etag, body) for ``summary``, ``category`` or ``check`` documents"""
+        return self._current().get((kind, key))
+
+    def respond(self, kind: str, key: str, if_none_match: Optional[str]) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Build (status, headers, body) for a request, or None if the document doesn't exist"""
+        found = self.document(kind, key)
+        if found is None:
+            return None
+        etag, body = found
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            return 304, headers, b""
+        headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+        return 200, headers, body
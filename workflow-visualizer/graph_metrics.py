@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Graph Metrics - Adjacency index and precomputed per-node metrics for a workflow
+
+Everything here is O(N + E) and runs once per parse, so the frontends only
+read the results instead of recomputing them every poll.
+"""
+
+from typing import Dict, List, Any, Optional
+
+# Estimated execution time per node type, used to weight the critical path
+# until real timings are available
+NODE_TYPE_ESTIMATE_MS = {
+    "input": 100,
+    "process": 500,
+    "checklist": 300,
+    "decision": 50,
+    "api": 2000,
+}
+
+
+class GraphIndex:
+    """Adjacency lists for a workflow, keyed by node id"""
+
+    def __init__(self, workflow: Dict[str, Any]):
+        self.node_ids: List[str] = [n["id"] for n in workflow.get("nodes", [])]
+        self.nodes: Dict[str, Dict[str, Any]] = {n["id"]: n for n in workflow.get("nodes", [])}
+        self.outgoing: Dict[str, List[str]] = {node_id: [] for node_id in self.node_ids}
+        self.incoming: Dict[str, List[str]] = {node_id: [] for node_id in self.node_ids}
+        for conn in workflow.get("connections", []):
+            # Connections to unknown nodes are not drawn, so they don't count either
+            if conn["from"] in self.nodes and conn["to"] in self.nodes:
+                self.outgoing[conn["from"]].append(conn["to"])
+                self.incoming[conn["to"]].append(conn["from"])
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Tarjan's algorithm (iterative); components come out in reverse topological order"""
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in self.node_ids:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node_id, child_pos = work.pop()
+                if child_pos == 0:
+                    index[node_id] = lowlink[node_id] = counter
+                    counter += 1
+                    stack.append(node_id)
+                    on_stack.add(node_id)
+
+                children = self.outgoing[node_id]
+                recursed = False
+                while child_pos < len(children):
+                    child = children[child_pos]
+                    child_pos += 1
+                    if child not in index:
+                        work.append((node_id, child_pos))
+                        work.append((child, 0))
+                        recursed = True
+                        break
+                    if child in on_stack:
+                        lowlink[node_id] = min(lowlink[node_id], index[child])
+                if recursed:
+                    continue
+
+                if lowlink[node_id] == index[node_id]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node_id:
+                            break
+                    components.append(component)
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node_id])
+
+        return components
+
+
+def compute_metrics(workflow: Dict[str, Any],
+                    node_weights: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Compute degree, depth, cycles and the critical path for a workflow
+
+    ``node_weights`` maps node ids to a cost in milliseconds; nodes without a
+    weight fall back to the estimate for their type. Cycles are collapsed to
+    their strongly connected component, so depth and the critical path are
+    computed over a DAG.
+    """
+    graph = GraphIndex(workflow)
+    node_weights = node_weights or {}
+
+    def weight(node_id: str) -> float:
+        if node_id in node_weights:
+            return node_weights[node_id]
+        return NODE_TYPE_ESTIMATE_MS.get(graph.nodes[node_id].get("type"), 0)
+
+    position = {node_id: i for i, node_id in enumerate(graph.node_ids)}
+    components = graph.strongly_connected_components()
+    component_of = {}
+    for i, component in enumerate(components):
+        for node_id in component:
+            component_of[node_id] = i
+
+    # Tarjan emits components in reverse topological order
+    topo_order = list(reversed(range(len(components))))
+    successors: List[set] = [set() for _ in components]
+    for node_id in graph.node_ids:
+        for child in graph.outgoing[node_id]:
+            if component_of[child] != component_of[node_id]:
+                successors[component_of[node_id]].add(component_of[child])
+
+    # Depth: longest chain of edges from any source
+    depth = [0] * len(components)
+    for c in topo_order:
+        for s in successors[c]:
+            depth[s] = max(depth[s], depth[c] + 1)
+
+    # Critical path: heaviest source-to-sink chain
+    component_weight = [sum(weight(n) for n in component) for component in components]
+    best = list(component_weight)
+    best_next: List[Optional[int]] = [None] * len(components)
+    for c in reversed(topo_order):
+        for s in successors[c]:
+            if component_weight[c] + best[s] > best[c]:
+                best[c] = component_weight[c] + best[s]
+                best_next[c] = s
+
+    critical_path: List[str] = []
+    critical_ms = 0.0
+    if components:
+        c: Optional[int] = max(topo_order, key=lambda i: best[i])
+        critical_ms = best[c]
+        while c is not None:
+            critical_path.extend(sorted(components[c], key=position.__getitem__))
+            c = best_next[c]
+
+    cycles = [
+        sorted(component, key=position.__getitem__)
+        for component in components
+        if len(component) > 1 or component[0] in graph.outgoing[component[0]]
+    ]
+
+    return {
+        "nodes": {
+            node_id: {
+                "incoming": len(graph.incoming[node_id]),
+                "outgoing": len(graph.outgoing[node_id]),
+                "depth": depth[component_of[node_id]],
+            }
+            for node_id in graph.node_ids
+        },
+        "max_depth": max(depth, default=0),
+        "cycles": cycles,
+        "critical_path": critical_path,
+        "critical_path_ms": critical_ms,
+    }
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Layered Layout - Sugiyama-style node positions computed on the server
+
+Layers come from the topological depth in graph_metrics, long edges are
+split into dummy vertices, crossings are reduced with alternating
+barycenter sweeps and coordinates are assigned with an order-preserving
+balanced placement. Given the previous layout, nodes that stay in their
+layer keep their old position wherever the spacing allows, so a small edit
+only moves the nodes around it. The sweeps are vectorized with NumPy when it is
+installed and fall back to plain Python otherwise, so the stdlib-only
+simple_server.py can use the same layout.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional; the pure-Python path runs the same algorithm, just slower
+    np = None
+
+from graph_metrics import compute_metrics
+
+# Geometry, matching the node sizes used by the frontends
+LAYER_SPACING = 250   # horizontal distance between layers
+NODE_SPACING = 100    # vertical slot of a real node
+DUMMY_SPACING = 30    # vertical slot of a long-edge bend point
+MARGIN_X = 100
+MARGIN_Y = 50
+
+CROSSING_SWEEPS = 4
+PLACEMENT_PASSES = 4
+
+_cache: "OrderedDict[str, Dict[str, Tuple[int, int]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 32
+
+
+def graph_hash(workflow: Dict[str, Any]) -> str:
+    """Hash of the topology only; labels and other fields don't affect layout"""
+    hasher = hashlib.sha256()
+    for node in workflow.get("nodes", []):
+        hasher.update(node["id"].encode() + b"\0")
+    hasher.update(b"\1")
+    for conn in workflow.get("connections", []):
+        hasher.update(f"{conn['from']}\0{conn['to']}\0".encode())
+    return hasher.hexdigest()
+
+
+def _mean_by_target(values, targets, sources, default):
+    """Per vertex, the mean of ``values[source]`` over its edges; vertices without edges keep ``default``"""
+    if np is not None:
+        sums = np.bincount(targets, weights=values[sources], minlength=len(default))
+        counts = np.bincount(targets, minlength=len(default))
+        return np.where(counts > 0, sums / np.maximum(counts, 1), default)
+
+    sums = [0.0] * len(default)
+    counts = [0] * len(default)
+    for target, source in zip(targets, sources):
+        sums[target] += values[source]
+        counts[target] += 1
+    return [sums[v] / counts[v] if counts[v] else default[v] for v in range(len(default))]
+
+
+def _layer_order(layer_of, key, tiebreak):
+    """Vertices sorted by layer, then ``key``, then ``tiebreak``"""
+    if np is not None:
+        return np.lexsort((tiebreak, key, layer_of))
+    return sorted(range(len(layer_of)), key=lambda v: (layer_of[v], key[v], tiebreak[v]))
+
+
+def _slots(order, layer_of, layer_start):
+    """Position of every vertex within its layer for a global ``order``"""
+    if np is not None:
+        slot = np.empty(len(order), dtype=float)
+        slot[order] = np.arange(len(order)) - layer_start[layer_of[order]]
+        return slot
+    slot = [0.0] * len(order)
+    for rank, vertex in enumerate(order):
+        slot[vertex] = float(rank - layer_start[layer_of[vertex]])
+    return slot
+
+
+def _place(desired, offsets, order, layer_of, balanced=True):
+    """Positions closest to ``desired`` that keep each layer's order and minimum separation
+
+    ``offsets`` are the cumulative minimum distances from the first vertex
+    of each layer. The result averages a top-down and a bottom-up packing,
+    which keeps every layer balanced around its desired positions; with
+    ``balanced=False`` it is the top-down packing alone, so an overlap only
+    pushes vertices further down.
+    """
+    if np is not None:
+        shifted = desired[order] - offsets[order]
+        # Lift each layer above the previous one so a single accumulate is segmented per layer
+        lift = layer_of[order] * (np.ptp(shifted) + 1.0)
+        down = np.maximum.accumulate(shifted + lift) - lift
+        placed = np.empty(len(order))
+        if not balanced:
+            placed[order] = down + offsets[order]
+            return placed
+        up = np.minimum.accumulate((shifted + lift)[::-1])[::-1] - lift
+        placed[order] = (down + up) / 2 + offsets[order]
+        return placed
+
+    placed = [0.0] * len(order)
+    down = [0.0] * len(order)
+    running, layer = 0.0, None
+    for i, vertex in enumerate(order):
+        value = desired[vertex] - offsets[vertex]
+        running = value if layer_of[vertex] != layer else max(running, value)
+        layer = layer_of[vertex]
+        down[i] = running
+        placed[vertex] = running + offsets[vertex]
+    if not balanced:
+        return placed
+    running, layer = 0.0, None
+    for i in range(len(order) - 1, -1, -1):
+        vertex = order[i]
+        value = desired[vertex] - offsets[vertex]
+        running = value if layer_of[vertex] != layer else min(running, value)
+        layer = layer_of[vertex]
+        placed[vertex] = (down[i] + running) / 2 + offsets[vertex]
+    return placed
+
+
+def _select(pairs, keep):
+    targets = [t for t, s in pairs if keep(t)]
+    sources = [s for t, s in pairs if keep(t)]
+    if np is not None:
+        return np.asarray(targets, dtype=np.int64), np.asarray(sources, dtype=np.int64)
+    return targets, sources
+
+
+def _packing_offsets(order, layer_of, layer_start, size):
+    """Cumulative minimum distance of every vertex from the first one in its layer"""
+    if np is not None:
+        ordered_size = size[order]
+        gaps = np.zeros(len(order))
+        same_layer = layer_of[order][1:] == layer_of[order][:-1]
+        gaps[1:] = np.where(same_layer, (ordered_size[1:] + ordered_size[:-1]) / 2, 0.0)
+        running = np.cumsum(gaps)
+        offsets = np.empty(len(order))
+        offsets[order] = running - running[layer_start[layer_of[order]]]
+        return offsets
+
+    offsets = [0.0] * len(order)
+    for i in range(1, len(order)):
+        previous, vertex = order[i - 1], order[i]
+        if layer_of[previous] == layer_of[vertex]:
+            offsets[vertex] = offsets[previous] + (size[previous] + size[vertex]) / 2
+    return offsets
+
+
+def _stabilize(y, layer_of, node_ids, previous):
+    """Pull nodes that kept their layer back to their previous ``y``, packing the rest around them
+
+    Only real nodes are re-packed; bend points have no previous position and
+    aren't part of the result. Returns the new positions and whether they are
+    in the previous layout's frame.
+    """
+    count = len(node_ids)
+    layers = [int(layer) for layer in layer_of[:count]]
+    anchors = {}
+    for i, node_id in enumerate(node_ids):
+        old = previous.get(node_id)
+        if old is not None and old[0] == MARGIN_X + layers[i] * LAYER_SPACING:
+            anchors[i] = old[1] - MARGIN_Y
+    if not anchors:
+        return y, False
+
+    # Move the fresh layout into the old frame, then pin the anchored nodes
+    shifts = sorted(anchors[i] - float(y[i]) for i in anchors)
+    shift = shifts[len(shifts) // 2]
+    desired = [float(y[i]) + shift for i in range(count)]
+    for i, old_y in anchors.items():
+        desired[i] = old_y
+
+    order = sorted(range(count), key=lambda v: (layers[v], desired[v]))
+    layer_start = [0] * (layers[order[-1]] + 1)
+    for position in range(count - 1, -1, -1):
+        layer_start[layers[order[position]]] = position
+    size = [NODE_SPACING] * count
+    if np is not None:
+        desired, order, layers = np.asarray(desired), np.asarray(order), np.asarray(layers)
+        layer_start, size = np.asarray(layer_start), np.asarray(size, dtype=float)
+    offsets = _packing_offsets(order, layers, layer_start, size)
+    # Pinned nodes stay put unless a node above them needs the room
+    return _place(desired, offsets, order, layers, balanced=False), True
+
+
+def compute_layout(workflow: Dict[str, Any],
+                   metrics: Optional[Dict[str, Any]] = None,
+                   previous: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Tuple[int, int]]:
+    """Compute ``{node_id: (x, y)}`` for a workflow
+
+    Odd and even layers are updated alternately, so each sweep and placement
+    pass touches every layer at once instead of looping layer by layer.
+    ``previous`` is the last layout of the same workflow, if any.
+    """
+    node_ids = [n["id"] for n in workflow.get("nodes", [])]
+    if not node_ids:
+        return {}
+    metrics = metrics or compute_metrics(workflow)
+    node_metrics = metrics["nodes"]
+
+    # Vertices 0..n-1 are real nodes; long edges add dummy vertices after them
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    layer_of = [node_metrics[node_id]["depth"] for node_id in node_ids]
+    is_dummy = [False] * len(node_ids)
+    segments = set()
+    for conn in workflow.get("connections", []):
+        u, v = index.get(conn["from"]), index.get(conn["to"])
+        if u is None or v is None or layer_of[u] >= layer_of[v]:
+            # Edges inside a cycle's component don't constrain ordering
+            continue
+        tail = u
+        for layer in range(layer_of[u] + 1, layer_of[v]):
+            dummy = len(layer_of)
+            layer_of.append(layer)
+            is_dummy.append(True)
+            segments.add((tail, dummy))
+            tail = dummy
+        segments.add((tail, v))
+    segments = sorted(segments)
+
+    layer_count = max(layer_of) + 1
+    layer_sizes = [0] * layer_count
+    for layer in layer_of:
+        layer_sizes[layer] += 1
+    layer_start = [0] * layer_count
+    for layer in range(1, layer_count):
+        layer_start[layer] = layer_start[layer - 1] + layer_sizes[layer - 1]
+
+    # Edge ends for each (direction, parity) half-sweep; segments never change
+    downward = [(v, u) for u, v in segments]
+    upward = [(u, v) for u, v in segments]
+    sweeps = [
+        _select(pairs, lambda t, p=parity: layer_of[t] % 2 == p)
+        for pairs in (downward, upward) for parity in (1, 0)
+    ]
+    placement = [
+        _select(downward + upward, lambda t, p=parity: layer_of[t] % 2 == p)
+        for parity in (0, 1)
+    ]
+
+    vertex_ids = list(range(len(layer_of)))
+    size = [DUMMY_SPACING if dummy else NODE_SPACING for dummy in is_dummy]
+    if np is not None:
+        layer_of = np.asarray(layer_of)
+        layer_start = np.asarray(layer_start)
+        vertex_ids = np.arange(len(layer_of))
+        size = np.asarray(size, dtype=float)
+
+    # Crossing minimization: barycenter sweeps down then up, keeping ties stable
+    order = _layer_order(layer_of, vertex_ids, vertex_ids)
+    slot = _slots(order, layer_of, layer_start)
+    for _ in range(CROSSING_SWEEPS):
+        for targets, sources in sweeps:
+            keys = _mean_by_target(slot, targets, sources, slot)
+            order = _layer_order(layer_of, keys, slot)
+            slot = _slots(order, layer_of, layer_start)
+
+    # Coordinate assignment: start packed, then pull towards neighbours
+    offsets = _packing_offsets(order, layer_of, layer_start, size)
+    y = offsets
+    for _ in range(PLACEMENT_PASSES):
+        for targets, sources in placement:
+            desired = _mean_by_target(y, targets, sources, y)
+            y = _place(desired, offsets, order, layer_of)
+
+    in_previous_frame = False
+    if previous:
+        y, in_previous_frame = _stabilize(y, layer_of, node_ids, previous)
+
+    y = [float(value) for value in y[:len(node_ids)]]
+    layer_of = [int(layer) for layer in layer_of[:len(node_ids)]]
+    # A stable layout only shifts down when something would land above the margin
+    top = min(0.0, min(y)) if in_previous_frame else min(y)
+    return {
+        node_id: (MARGIN_X + layer_of[i] * LAYER_SPACING, int(round(MARGIN_Y + y[i] - top)))
+        for i, node_id in enumerate(node_ids)
+    }
+
+
+def apply_layout(workflow: Dict[str, Any], metrics: Optional[Dict[str, Any]] = None,
+                 previous: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Any]:
+    """Set ``x``/``y`` on every node, reusing the cached layout for an identical graph
+
+    ``previous`` (``{node_id: (x, y)}`` from the last version) keeps existing
+    nodes where they were.
+    """
+    key = graph_hash(workflow)
+    with _cache_lock:
+        positions = _cache.get(key)
+        if positions is not None:
+            _cache.move_to_end(key)
+    if positions is None:
+        positions = compute_layout(workflow, metrics, previous)
+        with _cache_lock:
+            _cache[key] = positions
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    for node in workflow.get("nodes", []):
+        node["x"], node["y"] = positions[node["id"]]
+    return workflow
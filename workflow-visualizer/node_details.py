@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Node Details - Per-node detail documents served apart from the workflow topology
+
+The workflow sent on every poll and broadcast carries only what is needed
+to draw the graph. Everything else on a node (its ``details`` panel
+content and any other extra fields) is split off into one document per
+node, fetched from ``/nodes/{id}`` when a panel or tooltip opens.
+
+``NodeDetailStore`` keeps the current documents, a bounded LRU of encoded
+bodies with content-hash ETags, and evicts only the nodes whose document
+changed when a new parse is published.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+from assets import etag_matches
+
+# Node fields kept in the topology document; everything else goes to /nodes/{id}
+TOPOLOGY_FIELDS = ("id", "type", "label", "subtext", "x", "y")
+
+CACHE_CONTROL = "no-cache"
+
+
+def split_workflow(workflow: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """Split a parsed workflow into its topology and per-node detail documents
+
+    Every node gets a detail document (``{"id": ...}`` at least), so clients
+    can fetch any node without first checking whether it has details.
+    """
+    nodes = []
+    details = {}
+    for node in workflow.get("nodes", []):
+        nodes.append({key: node[key] for key in TOPOLOGY_FIELDS if key in node})
+        details[node["id"]] = {"id": node["id"], **{
+            key: value for key, value in node.items() if key not in TOPOLOGY_FIELDS
+        }}
+    topology = dict(workflow)
+    topology["nodes"] = nodes
+    return topology, details
+
+
+class NodeDetailStore:
+    """Detail documents for the current workflow, served by node id with ETags"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._documents: Dict[str, str] = {}
+        self._cache: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def publish(self, details: Dict[str, str]) -> List[str]:
+        """Make ``details`` (node id -> serialized document, from a snapshot) current
+
+        Only nodes whose document changed, or that were removed, are evicted
+        from the cache. Returns their ids.
+        """
+        with self._lock:
+            if details is self._documents:
+                # Same snapshot as last time
+                return []
+            changed = [node_id for node_id, document in details.items()
+                       if self._documents.get(node_id) != document]
+            changed += [node_id for node_id in self._documents if node_id not in details]
+            for node_id in changed:
+                self._cache.pop(node_id, None)
+            self._documents = details
+            self.invalidations += len(changed)
+            return changed
+
+    def has_node(self, node_id: str) -> bool:
+        """Whether the current workflow has a node with this id"""
+        return node_id in self._documents
+
+    def get(self, node_id: str) -> Optional[Tuple[str, bytes]]:
+        """(etag, body) for ``node_id``, or None if the workflow has no such node"""
+        with self._lock:
+            cached = self._cache.get(node_id)
+            if cached is not None:
+                self._cache.move_to_end(node_id)
+                self.hits += 1
+                return cached
+            document = self._documents.get(node_id)
+            if document is None:
+                return None
+            self.misses += 1
+            body = document.encode("utf-8")
+            cached = (f'"{hashlib.sha256(body).hexdigest()[:16]}"', body)
+            self._cache[node_id] = cached
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            return cached
+
+    def respond(self, node_id: str, if_none_match: Optional[str]) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Build (status, headers, body) for a request, or None for an unknown node"""
+        found = self.get(node_id)
+        if found is None:
+            return None
+        etag, body = found
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(if_none_match, etag):
+            return 304, headers, b""
+        headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+        return 200, headers, body
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "nodes": len(self._documents),
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
@@ -4,95 +4,210 @@ Script Parser - Analyzes the content_audit_agent_v4.py to extract workflow struc
 """
 
 import ast
+import hashlib
 import json
 import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
+
+from checklist_index import categories_from_file
+from graph_metrics import compute_metrics
+from layout import apply_layout
+from metrics import REGISTRY
+from node_details import split_workflow
+
+
+class MethodInfo:
+    """Calls made inside one class method, recorded during the visitor pass"""
+
+    def __init__(self, name: str, docstring: Optional[str] = None):
+        self.name = name
+        self.docstring = docstring
+        # (depth, visit order, callee name, is attribute call)
+        self.calls: List[Tuple[int, int, str, bool]] = []
+
+    def call_names(self, attributes_only: bool = False) -> List[str]:
+        """Callee names in ``ast.walk`` (breadth-first) order"""
+        # Sorting depth-first visit order by depth reproduces breadth-first order
+        return [
+            name for _, _, name, is_attr in sorted(self.calls)
+            if is_attr or not attributes_only
+        ]
+
+
+class ClassInfo:
+    """A class definition and its directly defined methods"""
+
+    def __init__(self, name: str, methods: List[MethodInfo]):
+        self.name = name
+        self.methods = methods
+
+    def find_methods(self, name: str) -> List[MethodInfo]:
+        return [method for method in self.methods if method.name == name]
+
+
+class ScriptVisitor(ast.NodeVisitor):
+    """Single pass over a module collecting class, method and call data
+
+    Every extractor in WorkflowParser reads from the collected data instead
+    of walking the tree again.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.order = 0
+        self._classes: List[Tuple[int, int, ClassInfo]] = []
+        self._pending_methods: Dict[int, MethodInfo] = {}
+        self._open_methods: List[Tuple[MethodInfo, int]] = []
+
+    def visit(self, node: ast.AST):
+        self.order += 1
+        return super().visit(node)
+
+    def generic_visit(self, node: ast.AST):
+        self.depth += 1
+        super().generic_visit(node)
+        self.depth -= 1
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        methods = []
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                method = MethodInfo(item.name, ast.get_docstring(item))
+                self._pending_methods[id(item)] = method
+                methods.append(method)
+        self._classes.append((self.depth, self.order, ClassInfo(node.name, methods)))
+        self.generic_visit(node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        method = self._pending_methods.pop(id(node), None)
+        if method is None:
+            self.generic_visit(node)
+            return
+        self._open_methods.append((method, self.depth))
+        self.generic_visit(node)
+        self._open_methods.pop()
+
+    def visit_Call(self, node: ast.Call):
+        if isinstance(node.func, ast.Attribute):
+            name, is_attr = node.func.attr, True
+        elif isinstance(node.func, ast.Name):
+            name, is_attr = node.func.id, False
+        else:
+            name = None
+        if name is not None:
+            # A call belongs to every enclosing method, like ast.walk(method) would see it
+            for method, base_depth in self._open_methods:
+                method.calls.append((self.depth - base_depth, self.order, name, is_attr))
+        self.generic_visit(node)
+
+    def find_classes(self, name: str) -> List[ClassInfo]:
+        """Classes with ``name`` in ``ast.walk`` (breadth-first) order"""
+        return [info for _, _, info in sorted(self._classes, key=lambda c: c[:2]) if info.name == name]
+
+
+# ContentAuditAgent methods that become workflow nodes: (node id, type, label, subtext).
+# tracing.py uses the same table to key spans by node id.
+AUDIT_METHOD_NODES: Dict[str, Tuple[str, str, str, str]] = {
+    "load_checklists": ("load-checklists", "checklist", "Load Checklists", "JSON files"),
+    "fetch_google_doc": ("fetch-doc", "input", "Fetch Google Doc", "URL input"),
+    "split_into_chunks": ("split-chunks", "process", "Split into Chunks", "~400 words"),
+    "analyze_chunk": ("analyze-chunks", "process", "Analyze Chunks", "Loop through"),
+    "fix_chunk_with_ai": ("fix-ai", "api", "Fix with AI", "OpenAI API"),
+    "postprocess_content": ("postprocess", "process", "Postprocess", "Clean content"),
+    "generate_report": ("report", "process", "Generate Report", "Markdown"),
+    "validate_fixes": ("validate", "process", "Validate Fixes", "Check quality"),
+}
 
 
 class WorkflowParser:
-    def __init__(self, script_path: str = "../article-optimizer/content_audit_agent_v4.py"):
+    def __init__(self, script_path: str = "../article-optimizer/content_audit_agent_v4.py",
+                 previous_positions: Optional[Dict[str, Tuple[int, int]]] = None):
         self.script_path = Path(script_path)
+        # Positions from the last version of this workflow, kept where possible by the layout
+        self.previous_positions = previous_positions
         self.workflow = {
             "nodes": [],
             "connections": []
         }
         self.node_positions = {}
+        self._node_index: Dict[str, Dict[str, Any]] = {}
+        self._connection_index: Set[Tuple[str, str]] = set()
         self.current_x = 100
         self.current_y = 100
+        # Why the last parse fell back to the default workflow, if it did
+        self.error: Optional[str] = None
         
-    def parse(self) -> Dict[str, Any]:
-        """Parse the script and extract workflow structure"""
-        if not self.script_path.exists():
+    def parse(self, content: Optional[str] = None) -> Dict[str, Any]:
+        """Parse the script and extract workflow structure
+
+        ``content`` may be passed when the caller has already read the
+        script (e.g. the parse cache) to avoid reading it a second time.
+        """
+        if content is None and not self.script_path.exists():
             print(f"Script not found at {self.script_path}")
+            self.error = "script not found"
             return self.get_default_workflow()
         
         try:
-            with open(self.script_path, 'r') as f:
-                content = f.read()
+            if content is None:
+                with open(self.script_path, 'r') as f:
+                    content = f.read()
             
-            # Parse AST
+            # Parse AST and collect class/method/call data in one pass
             tree = ast.parse(content)
+            visitor = ScriptVisitor()
+            visitor.visit(tree)
             
             # Extract main workflow from audit_content method
-            self.extract_audit_workflow(tree)
+            self.extract_audit_workflow(visitor)
             
             # Extract checklist information
             self.extract_checklists()
             
             # Extract postprocessing steps
-            self.extract_postprocessing(tree)
+            self.extract_postprocessing(visitor)
+            
+            # Precompute metrics and node positions once per parse
+            self.layout_workflow(self.workflow, self.previous_positions)
+            self.node_positions = {n["id"]: (n["x"], n["y"]) for n in self.workflow["nodes"]}
             
             return self.workflow
             
         except Exception as e:
             print(f"Error parsing script: {e}")
+            self.error = str(e)
             return self.get_default_workflow()
     
-    def extract_audit_workflow(self, tree: ast.AST):
+    def extract_audit_workflow(self, visitor: ScriptVisitor):
         """Extract the main audit workflow from the audit_content method"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef) and node.name == "ContentAuditAgent":
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef) and item.name == "audit_content":
-                        self.parse_audit_method(item)
-                        break
+        for class_info in visitor.find_classes("ContentAuditAgent"):
+            methods = class_info.find_methods("audit_content")
+            if methods:
+                self.parse_audit_method(methods[0], class_info)
     
-    def parse_audit_method(self, func_node: ast.FunctionDef):
+    def parse_audit_method(self, method: MethodInfo, class_info: Optional[ClassInfo] = None):
         """Parse the audit_content method to extract workflow steps"""
-        steps = []
-        
         # Analyze the function body for key operations
-        for stmt in ast.walk(func_node):
-            if isinstance(stmt, ast.Call):
-                if isinstance(stmt.func, ast.Attribute):
-                    method_name = stmt.func.attr
-                    
-                    # Map method calls to workflow nodes
-                    if method_name == "load_checklists":
-                        self.add_node("load-checklists", "checklist", "Load Checklists", "JSON files", 100, 200)
-                    elif method_name == "fetch_google_doc":
-                        self.add_node("fetch-doc", "input", "Fetch Google Doc", "URL input", 100, 100)
-                    elif method_name == "split_into_chunks":
-                        self.add_node("split-chunks", "process", "Split into Chunks", "~400 words", 350, 100)
-                    elif method_name == "analyze_chunk":
-                        self.add_node("analyze-chunks", "process", "Analyze Chunks", "Loop through", 600, 100)
-                    elif method_name == "fix_chunk_with_ai":
-                        self.add_node("fix-ai", "api", "Fix with AI", "OpenAI API", 850, 350)
-                    elif method_name == "postprocess_content":
-                        self.add_node("postprocess", "process", "Postprocess", "Clean content", 600, 550)
-                    elif method_name == "generate_report":
-                        self.add_node("report", "process", "Generate Report", "Markdown", 350, 650)
-                    elif method_name == "validate_fixes":
-                        self.add_node("validate", "process", "Validate Fixes", "Check quality", 600, 450)
+        for method_name in method.call_names(attributes_only=True):
+            # Map method calls to workflow nodes
+            if method_name in AUDIT_METHOD_NODES:
+                details = None
+                if class_info is not None:
+                    details = self.method_details(class_info, method_name)
+                self.add_node(*AUDIT_METHOD_NODES[method_name], details=details)
         
         # Add input/output nodes
-        self.add_node("start", "input", "Input Content", "Doc/File", 100, 50)
-        self.add_node("output", "input", "Output", "Report & Fixed", 600, 700)
+        self.add_node("start", "input", "Input Content", "Doc/File")
+        self.add_node("output", "input", "Output", "Report & Fixed")
         
         # Add decision nodes based on parameters
-        self.add_node("fix-decision", "decision", "Fix Issues?", "--fix flag", 600, 300)
-        self.add_node("websearch-decision", "decision", "Web Search?", "--web-search", 850, 450)
+        self.add_node("fix-decision", "decision", "Fix Issues?", "--fix flag")
+        self.add_node("websearch-decision", "decision", "Web Search?", "--web-search")
         
         # Create connections based on typical flow
         self.add_connection("start", "load-checklists")
@@ -116,78 +231,99 @@ class WorkflowParser:
             checklist_files = list(checklist_dir.glob("*.json"))
             
             # Add individual checklist nodes
-            y_offset = 50
-            for i, checklist_file in enumerate(checklist_files):
+            for checklist_file in checklist_files:
                 name = checklist_file.stem.replace("_", " ").title()
                 node_id = f"check-{checklist_file.stem}"
-                self.add_node(
-                    node_id, 
-                    "checklist", 
-                    name, 
-                    "Quality checks",
-                    850 + (i % 2) * 200,
-                    y_offset + (i // 2) * 100
-                )
+                self.add_node(node_id, "checklist", name, "Quality checks",
+                              details=self.checklist_details(checklist_file))
                 self.add_connection("analyze-chunks", node_id)
                 self.add_connection(node_id, "fix-decision")
     
-    def extract_postprocessing(self, tree: ast.AST):
+    def extract_postprocessing(self, visitor: ScriptVisitor):
         """Extract postprocessing steps"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef) and node.name == "ContentAuditAgent":
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef) and item.name == "postprocess_content":
-                        # Extract individual postprocessing steps
-                        steps = self.extract_method_calls(item)
-                        
-                        # Add postprocessing sub-nodes
-                        y_offset = 500
-                        for i, step in enumerate(steps[:5]):  # Limit to 5 for visualization
-                            if step.startswith("_"):
-                                step_name = step[1:].replace("_", " ").title()
-                                node_id = f"post-{i}"
-                                self.add_node(
-                                    node_id,
-                                    "process",
-                                    step_name[:20],  # Truncate long names
-                                    "Cleanup",
-                                    850 + (i * 150),
-                                    y_offset + 100
-                                )
+        for class_info in visitor.find_classes("ContentAuditAgent"):
+            for method in class_info.find_methods("postprocess_content"):
+                # Extract individual postprocessing steps
+                steps = self.extract_method_calls(method)
+                
+                # Add postprocessing sub-nodes; the layout engine places any number of them
+                for i, step in enumerate(steps):
+                    if step.startswith("_"):
+                        step_name = step[1:].replace("_", " ").title()
+                        node_id = f"post-{i}"
+                        self.add_node(
+                            node_id,
+                            "process",
+                            step_name[:20],  # Truncate long names
+                            "Cleanup",
+                            details=self.method_details(class_info, step)
+                        )
+                        self.add_connection("postprocess", node_id)
     
-    def extract_method_calls(self, func_node: ast.FunctionDef) -> List[str]:
+    def extract_method_calls(self, method: MethodInfo) -> List[str]:
         """Extract method calls from a function"""
-        methods = []
-        for node in ast.walk(func_node):
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Attribute):
-                    methods.append(node.func.attr)
-                elif isinstance(node.func, ast.Name):
-                    methods.append(node.func.id)
-        return methods
+        return method.call_names()
+    
+    def method_details(self, class_info: ClassInfo, method_name: str) -> Optional[Dict[str, Any]]:
+        """Detail panel content for a node backed by a method: its docstring and helper calls"""
+        methods = class_info.find_methods(method_name)
+        if not methods:
+            return None
+        method = methods[0]
+        own_methods = {m.name for m in class_info.methods}
+        helpers = list(dict.fromkeys(
+            name for name in method.call_names(attributes_only=True)
+            if name in own_methods and name != method_name
+        ))
+        details: Dict[str, Any] = {"description": (method.docstring or f"{method_name}()").split("\n\n")[0]}
+        if helpers:
+            details["features"] = [f"{name}()" for name in helpers]
+        return details
+    
+    def checklist_details(self, checklist_file: Path) -> Dict[str, Any]:
+        """Detail panel content for a checklist node: the labels of the checks in the file"""
+        try:
+            categories = categories_from_file(checklist_file)
+        except (OSError, ValueError):
+            categories = []
+        checks = [
+            check for category in categories for check in category.get("checks", [])
+            if isinstance(check, dict)
+        ]
+        details: Dict[str, Any] = {"description": f"{len(checks)} checks from checklists/{checklist_file.name}"}
+        if checks:
+            details["patterns"] = [check.get("label") or check.get("id", "") for check in checks]
+        return details
     
-    def add_node(self, node_id: str, node_type: str, label: str, subtext: str, x: int, y: int):
-        """Add a node to the workflow"""
+    def add_node(self, node_id: str, node_type: str, label: str, subtext: str,
+                 details: Optional[Dict[str, Any]] = None):
+        """Add a node to the workflow; positions are assigned by ``layout_workflow``
+
+        ``details`` is the node's detail panel content. It is served separately
+        from the topology (see node_details.py).
+        """
         # Check if node already exists
-        if any(n["id"] == node_id for n in self.workflow["nodes"]):
+        if node_id in self._node_index:
             return
         
-        self.workflow["nodes"].append({
+        node = {
             "id": node_id,
             "type": node_type,
             "label": label,
-            "subtext": subtext,
-            "x": x,
-            "y": y
-        })
-        self.node_positions[node_id] = (x, y)
+            "subtext": subtext
+        }
+        if details:
+            node["details"] = details
+        self.workflow["nodes"].append(node)
+        self._node_index[node_id] = node
     
     def add_connection(self, from_id: str, to_id: str, label: Optional[str] = None):
         """Add a connection between nodes"""
         # Check if connection already exists
-        if any(c["from"] == from_id and c["to"] == to_id for c in self.workflow["connections"]):
+        if (from_id, to_id) in self._connection_index:
             return
         
+        self._connection_index.add((from_id, to_id))
         conn = {"from": from_id, "to": to_id}
         if label:
             conn["label"] = label
@@ -195,22 +331,22 @@ class WorkflowParser:
     
     def get_default_workflow(self) -> Dict[str, Any]:
         """Return a default workflow structure"""
-        return {
+        workflow = {
             "nodes": [
-                {"id": "start", "type": "input", "label": "Input Content", "subtext": "Google Doc / File", "x": 100, "y": 100},
-                {"id": "load-checklists", "type": "checklist", "label": "Load Checklists", "subtext": "5 checklists", "x": 100, "y": 200},
-                {"id": "split-chunks", "type": "process", "label": "Split into Chunks", "subtext": "~400 words each", "x": 350, "y": 100},
-                {"id": "analyze-loop", "type": "process", "label": "Analyze Chunks", "subtext": "For each chunk", "x": 600, "y": 100},
-                {"id": "check-seo", "type": "checklist", "label": "SEO Checks", "subtext": "Keywords, titles", "x": 850, "y": 50},
-                {"id": "check-nlp", "type": "checklist", "label": "NLP Checks", "subtext": "Readability", "x": 850, "y": 150},
-                {"id": "check-ai", "type": "checklist", "label": "AI Patterns", "subtext": "Content quality", "x": 850, "y": 250},
-                {"id": "decision-fix", "type": "decision", "label": "Fix Issues?", "subtext": "--fix flag", "x": 600, "y": 350},
-                {"id": "fix-issues", "type": "api", "label": "Fix with OpenAI", "subtext": "API calls", "x": 850, "y": 350},
-                {"id": "decision-websearch", "type": "decision", "label": "Web Search?", "subtext": "--web-search", "x": 850, "y": 450},
-                {"id": "web-search", "type": "api", "label": "Search Web", "subtext": "Fact checking", "x": 1100, "y": 450},
-                {"id": "postprocess", "type": "process", "label": "Postprocess", "subtext": "Clean & normalize", "x": 600, "y": 550},
-                {"id": "generate-report", "type": "process", "label": "Generate Report", "subtext": "Audit results", "x": 350, "y": 650},
-                {"id": "output", "type": "input", "label": "Output", "subtext": "Report & Fixed content", "x": 600, "y": 650}
+                {"id": "start", "type": "input", "label": "Input Content", "subtext": "Google Doc / File"},
+                {"id": "load-checklists", "type": "checklist", "label": "Load Checklists", "subtext": "5 checklists"},
+                {"id": "split-chunks", "type": "process", "label": "Split into Chunks", "subtext": "~400 words each"},
+                {"id": "analyze-loop", "type": "process", "label": "Analyze Chunks", "subtext": "For each chunk"},
+                {"id": "check-seo", "type": "checklist", "label": "SEO Checks", "subtext": "Keywords, titles"},
+                {"id": "check-nlp", "type": "checklist", "label": "NLP Checks", "subtext": "Readability"},
+                {"id": "check-ai", "type": "checklist", "label": "AI Patterns", "subtext": "Content quality"},
+                {"id": "decision-fix", "type": "decision", "label": "Fix Issues?", "subtext": "--fix flag"},
+                {"id": "fix-issues", "type": "api", "label": "Fix with OpenAI", "subtext": "API calls"},
+                {"id": "decision-websearch", "type": "decision", "label": "Web Search?", "subtext": "--web-search"},
+                {"id": "web-search", "type": "api", "label": "Search Web", "subtext": "Fact checking"},
+                {"id": "postprocess", "type": "process", "label": "Postprocess", "subtext": "Clean & normalize"},
+                {"id": "generate-report", "type": "process", "label": "Generate Report", "subtext": "Audit results"},
+                {"id": "output", "type": "input", "label": "Output", "subtext": "Report & Fixed content"}
             ],
             "connections": [
                 {"from": "start", "to": "load-checklists"},
@@ -233,9 +369,158 @@ class WorkflowParser:
                 {"from": "load-checklists", "to": "analyze-loop"}
             ]
         }
+        return self.layout_workflow(workflow, self.previous_positions)
+
+    @staticmethod
+    def layout_workflow(workflow: Dict[str, Any],
+                        previous: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Any]:
+        """Add precomputed metrics and layered-layout positions to ``workflow``"""
+        metrics = compute_metrics(workflow)
+        apply_layout(workflow, metrics, previous)
+        workflow["metrics"] = metrics
+        return workflow
+
+
+@dataclass(frozen=True)
+class WorkflowSnapshot:
+    """An immutable, pre-serialized parse result shared by every consumer
+
+    ``json`` is the topology only (ids, types, labels, positions, edges);
+    ``details`` maps each node id to its serialized detail document, served
+    on demand by ``/nodes/{id}``.
+    """
+    digest: str
+    json: str
+    details: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def workflow(self) -> Dict[str, Any]:
+        """Return a fresh (mutable) copy of the workflow document"""
+        return json.loads(self.json)
+
+    def positions(self) -> Dict[str, Tuple[int, int]]:
+        """``{node_id: (x, y)}`` of the laid-out nodes"""
+        return {node["id"]: (node["x"], node["y"]) for node in self.workflow.get("nodes", []) if "x" in node}
+
+    def message(self, message_type: str = "workflow_update", **fields: Any) -> str:
+        """Build the WebSocket message text without re-serializing the workflow"""
+        header = json.dumps({"type": message_type, **fields}, separators=(",", ":"))
+        return f'{header[:-1]},"workflow":{self.json}}}'
+
+
+def parse_with_workflow_parser(script_path: Path, content: Optional[str],
+                               previous: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, Any]:
+    """Default cache builder: run a fresh WorkflowParser over the script"""
+    return WorkflowParser(str(script_path), previous).parse(content)
+
+
+PARSE_SECONDS = REGISTRY.histogram(
+    "workflow_parse_duration_seconds", "Time spent parsing the script on a parse cache miss")
+
+
+class ParseCache:
+    """Content-hash keyed cache of workflow snapshots
+
+    Lookups first compare a cheap stat signature (path, mtime, size and the
+    ``checklists/*.json`` set). Only when that changes is the script read and
+    hashed, and only when the content hash is new is the builder run again.
+    The builder also gets the previous snapshot's node positions so the
+    layout can keep them.
+    """
+
+    def __init__(self, builder: Optional[Callable[..., Dict[str, Any]]] = None,
+                 max_entries: int = 8):
+        self.builder = builder or parse_with_workflow_parser
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stat_index: Dict[str, Tuple[Any, str]] = {}
+        self._snapshots: "OrderedDict[str, WorkflowSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_signature(path: Path) -> Tuple[Any, ...]:
+        """Stat-level signature for a script and its checklist directory"""
+        try:
+            st = path.stat()
+            script_sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            script_sig = None
+
+        checklist_sig = []
+        checklist_dir = path.parent / "checklists"
+        if checklist_dir.exists():
+            for checklist_file in sorted(checklist_dir.glob("*.json")):
+                try:
+                    st = checklist_file.stat()
+                except OSError:
+                    continue
+                checklist_sig.append((checklist_file.name, st.st_mtime_ns, st.st_size))
+        return (script_sig, tuple(checklist_sig))
+
+    def get(self, script_path) -> WorkflowSnapshot:
+        """Return the snapshot for ``script_path``, parsing only when it changed"""
+        path = Path(script_path).resolve()
+        key = str(path)
+        signature = self._stat_signature(path)
+
+        with self._lock:
+            indexed = self._stat_index.get(key)
+            if indexed and indexed[0] == signature and indexed[1] in self._snapshots:
+                self._snapshots.move_to_end(indexed[1])
+                self.hits += 1
+                return self._snapshots[indexed[1]]
+
+            content = None
+            if signature[0] is not None:
+                try:
+                    content = path.read_text()
+                except OSError:
+                    content = None
+
+            hasher = hashlib.sha256(key.encode())
+            hasher.update(b"\0" + (content or "").encode())
+            hasher.update(repr(signature[1]).encode())
+            digest = hasher.hexdigest()
+
+            snapshot = self._snapshots.get(digest)
+            if snapshot is not None:
+                self._snapshots.move_to_end(digest)
+                self.hits += 1
+            else:
+                self.misses += 1
+                previous = None
+                if indexed and indexed[1] in self._snapshots:
+                    previous = self._snapshots[indexed[1]].positions()
+                started = time.perf_counter()
+                topology, details = split_workflow(self.builder(path, content, previous))
+                PARSE_SECONDS.observe(time.perf_counter() - started)
+                snapshot = WorkflowSnapshot(
+                    digest=digest,
+                    json=json.dumps(topology, separators=(",", ":")),
+                    details={node_id: json.dumps(document, separators=(",", ":"))
+                             for node_id, document in details.items()},
+                )
+                self._snapshots[digest] = snapshot
+                while len(self._snapshots) > self.max_entries:
+                    self._snapshots.popitem(last=False)
+
+            self._stat_index[key] = (signature, digest)
+            return snapshot
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of cached snapshots"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._snapshots)}
+
+
+# Shared by server.py, simple_server.py and the script watcher
+parse_cache = ParseCache()
 
 
 if __name__ == "__main__":
-    parser = WorkflowParser()
+    import sys
+    # Optional script path; batch_parse.py handles many scripts at once
+    parser = WorkflowParser(*sys.argv[1:2])
     workflow = parser.parse()
     print(json.dumps(workflow, indent=2))
\ No newline at end of file
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Pub/Sub - One watcher/parser shared by every server.py worker process
+
+When server.py runs in several worker processes, one of them is elected
+leader by taking an exclusive ``flock`` on ``<socket>.lock``. The leader
+watches and parses the script and runs a broker on a Unix domain socket.
+Every other worker subscribes to the broker and receives each new
+snapshot with its epoch and version, so all workers hand out identical
+versions and deltas while parsing happens once per change. Followers
+publish through the broker too (e.g. trace spans from their audits), and
+the broker passes messages on to everyone else.
+
+The lock is released when the leader exits. Followers see their broker
+connection close, and the first one to take the lock becomes the new leader.
+Frames are a 4-byte big-endian length followed by a JSON document
+``{"topic": ..., "data": ...}``.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Any, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct(">I")
+
+# Topics whose last message is replayed to workers that (re)connect
+RETAINED_TOPICS = ("snapshot",)
+
+# A subscriber with more than this buffered is dropped; it reconnects and gets the retained snapshot
+MAX_BUFFERED_BYTES = 64 * 1024 * 1024
+
+RECONNECT_SECONDS = 0.5
+
+# A live broker greets new subscribers at once; a socket left behind by a dead leader never does
+HANDSHAKE_SECONDS = 2.0
+
+Handler = Callable[[Any], Awaitable[None]]
+
+
+def encode_frame(topic: str, data: Any) -> bytes:
+    body = json.dumps({"topic": topic, "data": data}, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[str, Any, bytes]:
+    """(topic, data, raw frame) for the next frame; raises IncompleteReadError at EOF"""
+    header = await reader.readexactly(HEADER.size)
+    body = await reader.readexactly(HEADER.unpack(header)[0])
+    message = json.loads(body)
+    return message["topic"], message["data"], header + body
+
+
+class WorkerCluster:
+    """This worker's membership: the leader running the broker, or a subscribed follower"""
+
+    def __init__(self, socket_path, handlers: Dict[str, Handler], on_leader: Callable[[], Awaitable[None]]):
+        self.socket_path = Path(socket_path)
+        self.lock_path = self.socket_path.with_name(self.socket_path.name + ".lock")
+        self.handlers = handlers
+        self.on_leader = on_leader
+        self.is_leader = False
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self._lock_fd: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Set[asyncio.StreamWriter] = set()
+        self._retained: Dict[str, bytes] = {}
+        self._upstream: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        for writer in list(self._subscribers):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            self.socket_path.unlink(missing_ok=True)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            if self._try_lock():
+                await self._lead()
+                return
+            try:
+                await self._follow()
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                pass
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def _lead(self) -> None:
+        self.is_leader = True
+        # Whatever is at the path belongs to a leader that no longer holds the lock
+        self.socket_path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._serve_subscriber, path=str(self.socket_path))
+        logger.info(f"Elected workflow leader (pid {os.getpid()}); broker at {self.socket_path}")
+        await self.on_leader()
+
+    async def _follow(self) -> None:
+        reader, writer = await asyncio.open_unix_connection(str(self.socket_path))
+        try:
+            await asyncio.wait_for(read_frame(reader), HANDSHAKE_SECONDS)
+            self._upstream = writer
+            logger.info(f"Following the workflow leader at {self.socket_path}")
+            while True:
+                topic, data, _ = await read_frame(reader)
+                await self._deliver(topic, data)
+        finally:
+            self._upstream = None
+            writer.close()
+
+    async def _serve_subscriber(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(encode_frame("hello", {"leader": os.getpid()}))
+        for frame in self._retained.values():
+            writer.write(frame)
+        self._subscribers.add(writer)
+        try:
+            while True:
+                topic, data, frame = await read_frame(reader)
+                self._fan_out(topic, frame, exclude=writer)
+                await self._deliver(topic, data)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            writer.close()
+
+    def _fan_out(self, topic: str, frame: bytes, exclude: Optional[asyncio.StreamWriter] = None) -> None:
+        if topic in RETAINED_TOPICS:
+            self._retained[topic] = frame
+        for writer in list(self._subscribers):
+            if writer is exclude:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_BUFFERED_BYTES:
+                logger.warning("Dropping a worker that stopped reading from the broker")
+                self.dropped += 1
+                self._subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(frame)
+
+    async def _deliver(self, topic: str, data: Any) -> None:
+        handler = self.handlers.get(topic)
+        if handler is None:
+            return
+        self.received += 1
+        try:
+            await handler(data)
+        except Exception as e:
+            logger.error(f"Error handling {topic} message: {e}")
+
+    async def publish(self, topic: str, data: Any) -> None:
+        """Send ``data`` to every other worker (the caller handles it locally)"""
+        frame = encode_frame(topic, data)
+        self.published += 1
+        if self.is_leader:
+            self._fan_out(topic, frame)
+        elif self._upstream is not None:
+            try:
+                self._upstream.write(frame)
+                await self._upstream.drain()
+            except ConnectionError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "role": "leader" if self.is_leader else ("follower" if self._upstream is not None else "connecting"),
+            "pid": os.getpid(),
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+        }
@@ -7,17 +7,28 @@ Provides real-time updates when the script changes
 import asyncio
 import json
 import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Set, Dict, Any
+from typing import Dict, Any, Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, Response, StreamingResponse
 import uvicorn
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-from parser import WorkflowParser
+from assets import AssetStore
+from audit_jobs import AuditJobQueue, AuditQueueFull
+from checklist_index import ChecklistIndex
+from metrics import CONTENT_TYPE, REGISTRY, message_type
+from node_details import NodeDetailStore
+from parser import WorkflowSnapshot, parse_cache
+from pubsub import WorkerCluster
+from trace_store import TraceStore
+from workflow_delta import WorkflowHistory
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,125 +36,513 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# Maximum number of undelivered messages buffered per client
+SEND_QUEUE_SIZE = int(os.environ.get("WORKFLOW_SEND_QUEUE_SIZE", "16"))
+
+# Sent to a client whose queue overflowed; it answers with "resync" to get the full workflow
+RESYNC_NOTICE = json.dumps({"type": "resync"}).encode()
+
+# Served at /metrics; every worker process reports its own values
+BROADCAST_SECONDS = REGISTRY.histogram(
+    "workflow_broadcast_duration_seconds", "Time to queue a broadcast for every connected client")
+SEND_LAG_SECONDS = REGISTRY.histogram(
+    "workflow_client_send_lag_seconds", "Time from queueing a message for a client until it was written")
+SENT_BYTES = REGISTRY.counter(
+    "workflow_sent_bytes", "WebSocket payload bytes sent, by message type", ["type"])
+SENT_MESSAGES = REGISTRY.counter(
+    "workflow_sent_messages", "WebSocket messages sent, by message type", ["type"])
+RESYNCS = REGISTRY.counter(
+    "workflow_client_resyncs", "Client queues that overflowed and were replaced by a resync notice")
+WATCH_EVENTS = REGISTRY.counter(
+    "workflow_watch_events", "Filesystem events received for the script")
+WATCH_COALESCED = REGISTRY.counter(
+    "workflow_watch_events_coalesced", "Script events folded into an update that was already due")
+WATCH_UPDATES = REGISTRY.counter(
+    "workflow_watch_updates", "Updates run after the debounce period")
+
+class ClientConnection:
+    """A connected socket with its own bounded outbound queue and writer task"""
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.resync_pending = False
+
 # Store active WebSocket connections
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+    def __init__(self, queue_size: int = SEND_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.evicted = 0
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.add(websocket)
+        client = ClientConnection(websocket, self.queue_size)
+        client.writer = asyncio.create_task(self._write(client))
+        self.active_connections[websocket] = client
         logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.discard(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        if client.writer is not None and client.writer is not asyncio.current_task():
+            client.writer.cancel()
         logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
 
-    async def broadcast(self, message: Dict[str, Any]):
-        """Send message to all connected clients"""
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message: {e}")
-                disconnected.add(connection)
-        
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
+    def send(self, websocket: WebSocket, message):
+        """Queue a message (str for text frames, bytes for binary) for one client"""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            self._enqueue(client, message)
+
+    async def broadcast(self, message: str):
+        """Queue a pre-serialized message for all connected clients
+
+        The payload is encoded once and shared; each client's writer task
+        delivers it, so a slow socket never delays the others.
+        """
+        started = time.perf_counter()
+        payload = message.encode()
+        for client in list(self.active_connections.values()):
+            self._enqueue(client, payload)
+        BROADCAST_SECONDS.observe(time.perf_counter() - started)
+
+    def _enqueue(self, client: ClientConnection, payload):
+        try:
+            client.queue.put_nowait((payload, time.perf_counter()))
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if client.resync_pending:
+            # Still hasn't drained the previous resync notice: give up on it
+            self.evicted += 1
+            logger.warning("Evicting slow client")
+            self.disconnect(client.websocket)
+            asyncio.create_task(self._close(client.websocket))
+            return
+
+        # Drop the backlog; the client will fetch the full workflow instead
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        client.resync_pending = True
+        client.queue.put_nowait((RESYNC_NOTICE, time.perf_counter()))
+        RESYNCS.inc()
+        logger.warning("Client send queue overflowed; requesting resync")
+
+    async def _write(self, client: ClientConnection):
+        websocket = client.websocket
+        try:
+            while True:
+                payload, enqueued_at = await client.queue.get()
+                if isinstance(payload, bytes):
+                    await websocket.send_bytes(payload)
+                else:
+                    await websocket.send_text(payload)
+                SEND_LAG_SECONDS.observe(time.perf_counter() - enqueued_at)
+                kind = message_type(payload)
+                SENT_BYTES.labels(kind).inc(len(payload))
+                SENT_MESSAGES.labels(kind).inc()
+                if payload is RESYNC_NOTICE:
+                    client.resync_pending = False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message: {e}")
+            self.disconnect(websocket)
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
 
 manager = ConnectionManager()
 
+REGISTRY.callback("workflow_active_connections", "Open WebSocket connections", "gauge",
+                  lambda: len(manager.active_connections))
+REGISTRY.callback("workflow_dropped_clients", "Slow clients evicted after ignoring a resync notice", "counter",
+                  lambda: manager.evicted)
+REGISTRY.callback("workflow_parse_cache_hits", "Parse cache lookups answered without parsing", "counter",
+                  lambda: parse_cache.stats()["hits"])
+REGISTRY.callback("workflow_parse_cache_misses", "Parse cache lookups that ran the parser", "counter",
+                  lambda: parse_cache.stats()["misses"])
+
+# Versioned snapshots; clients receive deltas between consecutive versions
+history = WorkflowHistory()
+
+# Per-node detail documents for /nodes/{id}; broadcasts carry only the topology
+node_details = NodeDetailStore(max_entries=int(os.environ.get("WORKFLOW_NODE_CACHE_SIZE", "256")))
+
+async def load_snapshot():
+    """Parse (or fetch from cache) off the event loop and record a new version if it changed
+
+    Returns the message to broadcast for the new version, or None.
+    """
+    if cluster is not None and not cluster.is_leader:
+        # Followers receive versions from the leader instead of parsing
+        return None
+    loop = asyncio.get_running_loop()
+    snapshot = await loop.run_in_executor(parse_executor, parse_cache.get, script_path)
+    # Detail-only changes evict just those nodes and leave the topology version alone
+    changed = node_details.publish(snapshot.details)
+    message = history.publish(snapshot)
+    if cluster is not None and (message is not None or changed):
+        await cluster.publish("snapshot", {
+            "epoch": history.epoch,
+            "version": history.version,
+            "digest": snapshot.digest,
+            "json": snapshot.json,
+            "details": snapshot.details,
+        })
+    return message
+
+async def apply_leader_snapshot(record: Dict[str, Any]):
+    """Follower side of load_snapshot: adopt the leader's version and notify our clients"""
+    snapshot = WorkflowSnapshot(digest=record["digest"], json=record["json"], details=record["details"])
+    node_details.publish(snapshot.details)
+    message = history.replicate(snapshot, record["epoch"], record["version"])
+    if message is not None:
+        await manager.broadcast(message)
+
+# Quiet period used to coalesce bursts of filesystem events into one parse
+DEBOUNCE_SECONDS = float(os.environ.get("WORKFLOW_DEBOUNCE_SECONDS", "0.3"))
+
+# Parses run here so the event loop keeps serving pings and new connections
+parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workflow-parse")
+
 # File watcher for script changes
 class ScriptWatcher(FileSystemEventHandler):
-    def __init__(self, script_path: str, manager: ConnectionManager):
+    def __init__(self, script_path: str, manager: ConnectionManager,
+                 debounce_seconds: float = DEBOUNCE_SECONDS):
         self.script_path = Path(script_path)
         self.manager = manager
-        self.parser = WorkflowParser(str(self.script_path))
+        self.debounce_seconds = debounce_seconds
         self.loop = None
+        self._debounce_handle: Optional[asyncio.TimerHandle] = None
+        self._update_task: Optional[asyncio.Task] = None
+        self._update_pending = False
         
     def set_loop(self, loop):
         self.loop = loop
         
+    def _is_script(self, path: str) -> bool:
+        return path.endswith('.py') and 'content_audit' in path
+        
     def on_modified(self, event):
-        if event.src_path.endswith('.py') and 'content_audit' in event.src_path:
+        if self._is_script(event.src_path):
             logger.info(f"Script modified: {event.src_path}")
-            if self.loop:
-                asyncio.run_coroutine_threadsafe(
-                    self.update_workflow(),
-                    self.loop
-                )
+            self._notify()
+    
+    def on_created(self, event):
+        self.on_modified(event)
+    
+    def on_moved(self, event):
+        # Editors that save atomically write a temp file and rename it over the script
+        if self._is_script(event.dest_path):
+            logger.info(f"Script replaced: {event.dest_path}")
+            self._notify()
+    
+    def _notify(self):
+        """Called from the watchdog thread; hand the event to the event loop"""
+        WATCH_EVENTS.inc()
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._debounce)
+    
+    def _debounce(self):
+        """Restart the quiet-period timer so a burst of events triggers one update"""
+        if self._debounce_handle is not None:
+            self._debounce_handle.cancel()
+            WATCH_COALESCED.inc()
+        self._debounce_handle = self.loop.call_later(self.debounce_seconds, self._schedule_update)
+    
+    def _schedule_update(self):
+        """Run at most one update at a time, keeping a single "latest wins" slot"""
+        self._debounce_handle = None
+        if self._update_task is not None and not self._update_task.done():
+            if self._update_pending:
+                WATCH_COALESCED.inc()
+            self._update_pending = True
+            return
+        self._update_task = self.loop.create_task(self._run_updates())
+    
+    async def _run_updates(self):
+        self._update_pending = True
+        while self._update_pending:
+            self._update_pending = False
+            WATCH_UPDATES.inc()
+            await self.update_workflow()
     
     async def update_workflow(self):
-        """Parse the script and send updates to all clients"""
+        """Parse the script off the event loop and send updates to all clients"""
         try:
-            workflow = self.parser.parse()
-            message = {
-                "type": "workflow_update",
-                "workflow": workflow
-            }
+            message = await load_snapshot()
+            if message is None:
+                logger.info("Workflow unchanged; nothing to send")
+                return
             await self.manager.broadcast(message)
-            logger.info("Workflow update sent to clients")
+            logger.info(f"Workflow version {history.version} sent to clients")
         except Exception as e:
             logger.error(f"Error updating workflow: {e}")
 
-# Initialize file watcher
-script_path = Path(__file__).parent.parent / "article-optimizer" / "content_audit_agent_v4.py"
+# Initialize file watcher (WORKFLOW_SCRIPT points it at another agent, e.g. for benchmarks)
+script_path = Path(os.environ.get(
+    "WORKFLOW_SCRIPT", Path(__file__).parent.parent / "article-optimizer" / "content_audit_agent_v4.py"))
 watcher = ScriptWatcher(str(script_path), manager)
 
-# Set up file monitoring
+# Set up file monitoring; with several workers only the elected leader watches the script
+script_observer = Observer()
+script_observer.schedule(watcher, path=str(script_path.parent), recursive=False)
 observer = Observer()
-observer.schedule(watcher, path=str(script_path.parent), recursive=False)
 
-# Serve static files
-app.mount("/static", StaticFiles(directory=Path(__file__).parent), name="static")
+# Static assets are served from memory, precompressed, with content-hash ETags
+static_dir = Path(__file__).parent
+asset_store = AssetStore(static_dir)
+
+# Checklist summary and details, rebuilt from the agent's checklists/*.json when they change
+checklist_index = ChecklistIndex(script_path.parent / "checklists")
+
+class AssetWatcher(FileSystemEventHandler):
+    """Reloads changed static assets so ETags and fingerprints stay current"""
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        path = getattr(event, "dest_path", None) or event.src_path
+        asset_store.invalidate(path)
+        if Path(path).name == "checklist-data.js":
+            checklist_index.invalidate()
+
+observer.schedule(AssetWatcher(), path=str(static_dir), recursive=False)
+
+class ChecklistWatcher(FileSystemEventHandler):
+    """Drops the checklist index when a checklist file changes"""
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        checklist_index.invalidate(getattr(event, "dest_path", None) or event.src_path)
+
+if checklist_index.checklist_dir.is_dir():
+    observer.schedule(ChecklistWatcher(), path=str(checklist_index.checklist_dir), recursive=False)
+
+def asset_response(name: str, request: Request) -> Optional[Response]:
+    """Serve ``name`` from the asset store, or None if it isn't a known asset"""
+    result = asset_store.respond(
+        name,
+        request.query_params.get("v"),
+        request.headers.get("accept-encoding"),
+        request.headers.get("if-none-match"),
+    )
+    if result is None:
+        return None
+    status, headers, body = result
+    media_type = headers.pop("Content-Type", None)
+    headers.pop("Content-Length", None)
+    return Response(content=body, status_code=status, headers=headers, media_type=media_type)
 
 @app.get("/")
-async def serve_index():
+async def serve_index(request: Request):
     """Serve the main HTML page"""
-    return FileResponse(Path(__file__).parent / "index-enhanced.html")
+    return asset_response("index-enhanced.html", request)
+
+@app.get("/static/{name}")
+async def serve_static(name: str, request: Request):
+    """Serve files from the visualizer directory, preferring the in-memory asset store"""
+    response = asset_response(name, request)
+    if response is not None:
+        return response
+    path = static_dir / name
+    if not path.is_file():
+        raise HTTPException(status_code=404)
+    return FileResponse(path)
+
+def checklist_response(kind: str, key: str, request: Request) -> Response:
+    result = checklist_index.respond(kind, key, request.headers.get("if-none-match"))
+    if result is None:
+        raise HTTPException(status_code=404)
+    status, headers, body = result
+    media_type = headers.pop("Content-Type", None)
+    headers.pop("Content-Length", None)
+    return Response(content=body, status_code=status, headers=headers, media_type=media_type)
+
+@app.get("/checklists")
+async def serve_checklist_summary(request: Request):
+    """Category names, colors and counts for the master checklist view"""
+    return checklist_response("summary", "", request)
+
+@app.get("/checklists/{category_id}")
+async def serve_checklist_category(category_id: str, request: Request):
+    """Compact check list (id, label, severity, auto-fix) for one category"""
+    return checklist_response("category", category_id, request)
+
+@app.get("/checks/{check_id}")
+async def serve_check(check_id: str, request: Request):
+    """Full definition of one check"""
+    return checklist_response("check", check_id, request)
+
+@app.get("/cache-stats")
+async def serve_cache_stats():
+    """Report parse cache and node detail cache counters"""
+    return {**parse_cache.stats(), "node_details": node_details.stats()}
+
+@app.get("/cluster-stats")
+async def serve_cluster_stats():
+    """This worker's role and broker counters (multi-worker deployments only)"""
+    if cluster is None:
+        raise HTTPException(status_code=404, detail="Not running with WORKFLOW_BROKER_SOCKET")
+    return {**cluster.stats(), "version": history.version, "epoch": history.epoch}
+
+@app.get("/metrics")
+async def serve_metrics():
+    """Prometheus text-format metrics for this worker"""
+    return Response(REGISTRY.render(), headers={"Content-Type": CONTENT_TYPE})
+
+@app.get("/nodes/{node_id}")
+async def serve_node_details(node_id: str, request: Request):
+    """Detail document (panel content) for one node of the current workflow
+
+    Reads the store as the watchers last published it; requests never parse.
+    """
+    result = node_details.respond(node_id, request.headers.get("if-none-match"))
+    if result is None:
+        raise HTTPException(status_code=404)
+    status, headers, body = result
+    media_type = headers.pop("Content-Type", None)
+    headers.pop("Content-Length", None)
+    return Response(content=body, status_code=status, headers=headers, media_type=media_type)
+
+# Completed spans from traced runs, bounded by WORKFLOW_TRACE_CAPACITY records
+trace_store = TraceStore(capacity=int(os.environ.get("WORKFLOW_TRACE_CAPACITY", "65536")))
+
+async def record_spans(spans):
+    """Record trace span events (see tracing.py) and stream them to this worker's /ws clients"""
+    if spans:
+        trace_store.extend(spans)
+        await manager.broadcast(json.dumps({"type": "trace_spans", "spans": spans}, separators=(",", ":")))
+
+async def publish_spans(spans) -> int:
+    """Record span events here and pass them on to the other workers
+
+    Spans for nodes that aren't in the current workflow are dropped, so
+    posted ids can neither grow the trace store nor reach the page.
+    Returns how many were kept.
+    """
+    spans = [span for span in spans if node_details.has_node(span["node"])]
+    await record_spans(spans)
+    if spans and cluster is not None:
+        await cluster.publish("spans", spans)
+    return len(spans)
 
-@app.get("/styles.css")
-async def serve_styles():
-    """Serve the CSS file"""
-    return FileResponse(Path(__file__).parent / "styles.css")
+def span_error(span) -> Optional[str]:
+    """Why a posted span event is malformed, or None if it is well formed"""
+    if not isinstance(span, dict) or not isinstance(span.get("node"), str):
+        return "each span needs a string node"
+    if span.get("phase") not in ("begin", "end"):
+        return "phase must be begin or end"
+    for field in ("t", "ms"):
+        value = span.get(field)
+        required = field == "t" or span["phase"] == "end"
+        if (value is None and required) or (value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float)))):
+            return f"{field} must be a number"
+    if span.get("run") is not None and not isinstance(span["run"], str):
+        return "run must be a string"
+    return None
 
-@app.get("/styles-enhanced.css")
-async def serve_enhanced_styles():
-    """Serve the enhanced CSS file"""
-    return FileResponse(Path(__file__).parent / "styles-enhanced.css")
+@app.post("/spans")
+async def receive_spans(request: Request):
+    """Accept a batch of span events from a traced audit run"""
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    spans = payload.get("spans") if isinstance(payload, dict) else payload
+    if not isinstance(spans, list):
+        raise HTTPException(status_code=400, detail="Expected a list of span events")
+    for index, span in enumerate(spans):
+        error = span_error(span)
+        if error is not None:
+            raise HTTPException(status_code=400, detail=f"Span {index}: {error}")
+    accepted = await publish_spans(spans)
+    return {"received": len(spans), "accepted": accepted}
 
-@app.get("/workflow.js")
-async def serve_script():
-    """Serve the JavaScript file"""
-    return FileResponse(Path(__file__).parent / "workflow.js")
+# Audit runs in a process pool; spans from the runs feed the live graph
+audit_jobs = AuditJobQueue(on_spans=publish_spans)
 
-@app.get("/workflow-enhanced.js")
-async def serve_enhanced_script():
-    """Serve the enhanced JavaScript file"""
-    return FileResponse(Path(__file__).parent / "workflow-enhanced.js")
+@app.post("/audit")
+async def run_audit(request: Request):
+    """Run a content audit and stream its logs, spans and result as server-sent events
+
+    Body: ``{"content"?: str, "url"?: str, "fix"?: bool, "web_search"?: bool}``.
+    Events: ``queued``, ``started``, ``log`` (tagged with the node id),
+    ``spans``, then ``result`` (``{report_markdown, fixed_content}``) or ``error``.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    if not isinstance(body, dict) or not any(isinstance(body.get(key), str) and body[key] for key in ("content", "url")):
+        raise HTTPException(status_code=400, detail="Provide content or url")
+    
+    try:
+        job = audit_jobs.submit(body)
+    except AuditQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    
+    return StreamingResponse(
+        audit_jobs.stream(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/audit-stats")
+async def serve_audit_stats():
+    """Report audit queue depth and worker usage"""
+    return audit_jobs.stats()
+
+@app.get("/trace-stats")
+async def serve_trace_stats(window: Optional[float] = None):
+    """Per-node p50/p95/p99 latencies over a sliding window (seconds)"""
+    if window is None:
+        window = trace_store.windows[0]
+    if window <= 0 or window > max(trace_store.windows):
+        raise HTTPException(status_code=400, detail=f"window must be in (0, {max(trace_store.windows)}]")
+    return {
+        "window": window,
+        "windows": trace_store.windows,
+        "nodes": trace_store.percentiles(window),
+        "store": trace_store.stats(),
+    }
 
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates"""
+async def websocket_endpoint(websocket: WebSocket, epoch: Optional[str] = None, version: Optional[int] = None):
+    """WebSocket endpoint for real-time updates
+
+    Reconnecting clients pass their last-seen ``epoch`` and ``version`` as
+    query parameters and are caught up with a delta instead of a full resend.
+    """
+    # Make sure the history reflects the script on disk before joining the broadcast set
+    message = await load_snapshot()
+    if message is not None:
+        await manager.broadcast(message)
+    
     await manager.connect(websocket)
     
     try:
-        # Send initial workflow on connection
-        parser = WorkflowParser(str(script_path))
-        workflow = parser.parse()
-        await websocket.send_json({
-            "type": "workflow_update",
-            "workflow": workflow
-        })
+        # Catch this client up from its last-seen version (a new follower may not have one yet)
+        catch_up = history.catch_up_message(epoch, version)
+        if catch_up is not None:
+            manager.send(websocket, catch_up.encode())
         
         # Keep connection alive
         while True:
-            # Wait for messages from client (ping/pong)
+            # Wait for messages from client (ping/pong, resync requests)
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text("pong")
+                manager.send(websocket, "pong")
+            elif data == "resync":
+                manager.send(websocket, history.full_message().encode())
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -151,26 +550,67 @@ async def websocket_endpoint(websocket: WebSocket):
         logger.error(f"WebSocket error: {e}")
         manager.disconnect(websocket)
 
+# Keep last: catch-all for top-level assets (/workflow.js, /styles.css, ...)
+@app.get("/{name}")
+async def serve_asset(name: str, request: Request):
+    """Serve a static asset from memory"""
+    response = asset_response(name, request)
+    if response is None:
+        raise HTTPException(status_code=404)
+    return response
+
+async def start_script_watcher():
+    """Watch and parse the script in this process (the only worker, or the elected leader)"""
+    script_observer.start()
+    logger.info(f"Monitoring script at: {script_path}")
+    # Publish the current version now so followers don't wait for the next edit
+    await watcher.update_workflow()
+
+# Several workers (WORKFLOW_BROKER_SOCKET set) share one script watcher through pubsub.py
+BROKER_SOCKET = os.environ.get("WORKFLOW_BROKER_SOCKET")
+cluster = WorkerCluster(
+    BROKER_SOCKET,
+    handlers={"snapshot": apply_leader_snapshot, "spans": record_spans},
+    on_leader=start_script_watcher,
+) if BROKER_SOCKET else None
+
 @app.on_event("startup")
 async def startup_event():
-    """Start the file watcher on server startup"""
+    """Start the file watchers on server startup"""
     observer.start()
     watcher.set_loop(asyncio.get_event_loop())
-    logger.info(f"Monitoring script at: {script_path}")
+    if cluster is None:
+        await start_script_watcher()
+    else:
+        cluster.start()
     logger.info("WebSocket server started on ws://localhost:8002")
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop the file watcher on server shutdown"""
+    """Stop the file watchers on server shutdown"""
+    if cluster is not None:
+        await cluster.stop()
+    if script_observer.is_alive():
+        script_observer.stop()
+        script_observer.join()
     observer.stop()
     observer.join()
+    parse_executor.shutdown(wait=False)
+    audit_jobs.shutdown()
     logger.info("File watcher stopped")
 
 if __name__ == "__main__":
+    # WORKFLOW_WORKERS > 1 runs that many processes sharing one watcher (see pubsub.py)
+    workers = int(os.environ.get("WORKFLOW_WORKERS", "1"))
+    if workers > 1:
+        os.environ.setdefault("WORKFLOW_BROKER_SOCKET",
+                              str(Path(tempfile.gettempdir()) / "workflow-visualizer-8002.sock"))
+    
     # Run the server
     uvicorn.run(
-        app, 
+        "server:app" if workers > 1 else app,
         host="0.0.0.0", 
         port=8002,
+        workers=workers,
         log_level="info"
     )
\ No newline at end of file
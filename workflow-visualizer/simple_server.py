@@ -4,44 +4,58 @@ Simple Workflow Visualizer Server - No external dependencies required
 Uses only Python standard library modules
 """
 
+import argparse
+import errno
 import http.server
-import socketserver
 import json
 import os
+import tempfile
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from assets import AssetStore
+from checklist_index import ChecklistIndex
+from node_details import NodeDetailStore
+from graph_metrics import compute_metrics
+from layout import apply_layout
+from metrics import CONTENT_TYPE, REGISTRY
+from parser import ParseCache
 
 # Configuration
 PORT = 8002
-SCRIPT_PATH = Path(__file__).parent.parent / "article-optimizer" / "content_audit_agent_v4.py"
-WORKFLOW_JSON = Path(__file__).parent / "workflow.json"
+WORKERS = 0  # 0 = one thread per request; N = fixed pool of N worker threads
+SCRIPT_PATH = Path(os.environ.get(
+    "WORKFLOW_SCRIPT", Path(__file__).parent.parent / "article-optimizer" / "content_audit_agent_v4.py"))
+WORKFLOW_JSON = Path(os.environ.get("WORKFLOW_OUTPUT", Path(__file__).parent / "workflow.json"))
 
-def generate_workflow():
+def generate_workflow(script_path=SCRIPT_PATH, content=None, previous=None):
     """Generate workflow JSON from the script"""
     workflow = {
         "nodes": [
-            {"id": "start", "type": "input", "label": "Input Content", "subtext": "Google Doc / File", "x": 100, "y": 100},
-            {"id": "load-checklists", "type": "checklist", "label": "Load Checklists", "subtext": "5 checklists", "x": 100, "y": 200},
-            {"id": "split-chunks", "type": "process", "label": "Split into Chunks", "subtext": "~400 words each", "x": 350, "y": 100},
-            {"id": "analyze-loop", "type": "process", "label": "Analyze Chunks", "subtext": "For each chunk", "x": 600, "y": 100},
-            {"id": "check-seo", "type": "checklist", "label": "SEO Checks", "subtext": "Keywords, titles", "x": 850, "y": 50},
-            {"id": "check-nlp", "type": "checklist", "label": "NLP Checks", "subtext": "Readability", "x": 850, "y": 150},
-            {"id": "check-ai", "type": "checklist", "label": "AI Patterns", "subtext": "Content quality", "x": 850, "y": 250},
-            {"id": "check-master", "type": "checklist", "label": "Master Checks", "subtext": "Overall quality", "x": 1050, "y": 100},
-            {"id": "check-pvod", "type": "checklist", "label": "PVOD Checks", "subtext": "Value & depth", "x": 1050, "y": 200},
-            {"id": "decision-fix", "type": "decision", "label": "Fix Issues?", "subtext": "--fix flag", "x": 600, "y": 350},
-            {"id": "fix-issues", "type": "api", "label": "Fix with OpenAI", "subtext": "API calls", "x": 850, "y": 350},
-            {"id": "decision-websearch", "type": "decision", "label": "Web Search?", "subtext": "--web-search", "x": 850, "y": 450},
-            {"id": "web-search", "type": "api", "label": "Search Web", "subtext": "Fact checking", "x": 1100, "y": 450},
-            {"id": "postprocess", "type": "process", "label": "Postprocess", "subtext": "Clean & normalize", "x": 600, "y": 550},
-            {"id": "strip-scaffold", "type": "process", "label": "Strip Scaffolding", "subtext": "Remove meta", "x": 850, "y": 550},
-            {"id": "clean-links", "type": "process", "label": "Clean Links", "subtext": "Remove UTM", "x": 1050, "y": 550},
-            {"id": "fix-code", "type": "process", "label": "Fix Code Fences", "subtext": "Normalize", "x": 850, "y": 650},
-            {"id": "dedupe", "type": "process", "label": "Deduplicate", "subtext": "Remove repeats", "x": 1050, "y": 650},
-            {"id": "generate-report", "type": "process", "label": "Generate Report", "subtext": "Audit results", "x": 350, "y": 750},
-            {"id": "generate-mdx", "type": "process", "label": "Generate MDX", "subtext": "If requested", "x": 600, "y": 750},
-            {"id": "output", "type": "input", "label": "Output", "subtext": "Report & Fixed content", "x": 850, "y": 750}
+            {"id": "start", "type": "input", "label": "Input Content", "subtext": "Google Doc / File"},
+            {"id": "load-checklists", "type": "checklist", "label": "Load Checklists", "subtext": "5 checklists"},
+            {"id": "split-chunks", "type": "process", "label": "Split into Chunks", "subtext": "~400 words each"},
+            {"id": "analyze-loop", "type": "process", "label": "Analyze Chunks", "subtext": "For each chunk"},
+            {"id": "check-seo", "type": "checklist", "label": "SEO Checks", "subtext": "Keywords, titles"},
+            {"id": "check-nlp", "type": "checklist", "label": "NLP Checks", "subtext": "Readability"},
+            {"id": "check-ai", "type": "checklist", "label": "AI Patterns", "subtext": "Content quality"},
+            {"id": "check-master", "type": "checklist", "label": "Master Checks", "subtext": "Overall quality"},
+            {"id": "check-pvod", "type": "checklist", "label": "PVOD Checks", "subtext": "Value & depth"},
+            {"id": "decision-fix", "type": "decision", "label": "Fix Issues?", "subtext": "--fix flag"},
+            {"id": "fix-issues", "type": "api", "label": "Fix with OpenAI", "subtext": "API calls"},
+            {"id": "decision-websearch", "type": "decision", "label": "Web Search?", "subtext": "--web-search"},
+            {"id": "web-search", "type": "api", "label": "Search Web", "subtext": "Fact checking"},
+            {"id": "postprocess", "type": "process", "label": "Postprocess", "subtext": "Clean & normalize"},
+            {"id": "strip-scaffold", "type": "process", "label": "Strip Scaffolding", "subtext": "Remove meta"},
+            {"id": "clean-links", "type": "process", "label": "Clean Links", "subtext": "Remove UTM"},
+            {"id": "fix-code", "type": "process", "label": "Fix Code Fences", "subtext": "Normalize"},
+            {"id": "dedupe", "type": "process", "label": "Deduplicate", "subtext": "Remove repeats"},
+            {"id": "generate-report", "type": "process", "label": "Generate Report", "subtext": "Audit results"},
+            {"id": "generate-mdx", "type": "process", "label": "Generate MDX", "subtext": "If requested"},
+            {"id": "output", "type": "input", "label": "Output", "subtext": "Report & Fixed content"}
         ],
         "connections": [
             {"from": "start", "to": "load-checklists"},
@@ -75,13 +89,14 @@ def generate_workflow():
     }
     
     # Try to enhance with actual script analysis if possible
-    if SCRIPT_PATH.exists():
+    if script_path.exists():
         try:
-            with open(SCRIPT_PATH, 'r') as f:
-                content = f.read()
+            if content is None:
+                with open(script_path, 'r') as f:
+                    content = f.read()
                 
             # Count actual checklists
-            checklist_dir = SCRIPT_PATH.parent / "checklists"
+            checklist_dir = script_path.parent / "checklists"
             if checklist_dir.exists():
                 checklist_count = len(list(checklist_dir.glob("*.json")))
                 for node in workflow["nodes"]:
@@ -99,25 +114,84 @@ def generate_workflow():
         except Exception as e:
             print(f"Note: Could not enhance workflow from script: {e}")
     
+    metrics = compute_metrics(workflow)
+    apply_layout(workflow, metrics, previous)
+    workflow["metrics"] = metrics
     return workflow
 
+# Content-hash keyed cache; only regenerates when the script or checklists change
+workflow_cache = ParseCache(builder=generate_workflow)
+
+# Static assets served from memory, precompressed, with content-hash ETags
+asset_store = AssetStore(Path(__file__).parent)
+
+# Checklist summary and per-category/per-check details, rebuilt when a checklist file changes
+checklist_index = ChecklistIndex(SCRIPT_PATH.parent / "checklists")
+
+# Per-node detail documents for /nodes/<id>; /workflow.json and /events carry only the topology
+node_details = NodeDetailStore()
+
+# Latest published snapshot; SSE streams wait on this condition for changes
+current_snapshot = None
+published_at = 0.0
+snapshot_changed = threading.Condition()
+
+# Seconds between SSE keep-alive comments (also how quickly dead streams are noticed)
+SSE_KEEPALIVE = 15
+
+# Served at /metrics; polling stands in for watchdog, so there is nothing to coalesce
+WATCH_POLLS = REGISTRY.counter("workflow_watch_polls", "Script and checklist polls by the watcher thread")
+WATCH_UPDATES = REGISTRY.counter("workflow_watch_updates", "Polls that published a new workflow")
+BROADCAST_SECONDS = REGISTRY.histogram(
+    "workflow_broadcast_duration_seconds", "Time to write workflow.json and wake every /events stream")
+SEND_LAG_SECONDS = REGISTRY.histogram(
+    "workflow_client_send_lag_seconds", "Time from publishing a workflow until an /events stream wrote it")
+SENT_BYTES = REGISTRY.counter("workflow_sent_bytes", "Response body bytes sent, by kind", ["type"])
+ACTIVE_STREAMS = REGISTRY.gauge("workflow_active_connections", "Open /events streams")
+DROPPED_STREAMS = REGISTRY.counter("workflow_dropped_clients", "/events streams that ended on a write error")
+REGISTRY.callback("workflow_parse_cache_hits", "Parse cache lookups answered without parsing", "counter",
+                  lambda: workflow_cache.stats()["hits"])
+REGISTRY.callback("workflow_parse_cache_misses", "Parse cache lookups that ran the parser", "counter",
+                  lambda: workflow_cache.stats()["misses"])
+
+def write_atomic(path, text):
+    """Write to a temp file and rename it over ``path`` so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
 def update_workflow_file():
-    """Update the workflow JSON file"""
-    workflow = generate_workflow()
-    with open(WORKFLOW_JSON, 'w') as f:
-        json.dump(workflow, f, indent=2)
+    """Publish a new snapshot (and update the workflow JSON file) if the workflow changed"""
+    global current_snapshot, published_at
+    WATCH_POLLS.inc()
+    snapshot = workflow_cache.get(SCRIPT_PATH)
+    # Detail-only changes evict just those nodes and don't republish the topology
+    node_details.publish(snapshot.details)
+    # Content changes that don't alter the generated workflow keep the old ETag
+    if current_snapshot is not None and snapshot.json == current_snapshot.json:
+        return
+    WATCH_UPDATES.inc()
+    started = time.perf_counter()
+    write_atomic(WORKFLOW_JSON, snapshot.json)
+    with snapshot_changed:
+        current_snapshot = snapshot
+        published_at = time.perf_counter()
+        snapshot_changed.notify_all()
+    BROADCAST_SECONDS.observe(time.perf_counter() - started)
     print(f"Updated workflow.json at {time.strftime('%H:%M:%S')}")
 
 def watch_script():
     """Watch for script changes and update workflow"""
-    last_modified = 0
     while True:
         try:
-            if SCRIPT_PATH.exists():
-                current_modified = os.path.getmtime(SCRIPT_PATH)
-                if current_modified != last_modified:
-                    last_modified = current_modified
-                    update_workflow_file()
+            update_workflow_file()
+            asset_store.refresh()
+            checklist_index.refresh()
             time.sleep(2)  # Check every 2 seconds
         except Exception as e:
             print(f"Watch error: {e}")
@@ -133,23 +207,234 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         """Handle GET requests"""
         if self.path == '/':
             self.path = '/index-enhanced.html'
-        elif self.path.startswith('/workflow.json'):
-            # Serve the workflow JSON (ignore cache buster)
-            self.path = '/workflow.json'
+        elif self.path == '/cache-stats':
+            body = json.dumps({**workflow_cache.stats(), "node_details": node_details.stats()}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        elif self.path == '/metrics':
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        elif self.path.split('?', 1)[0] == '/workflow.json':
+            # Serve the workflow JSON from memory (ignore cache buster)
+            return self.serve_workflow()
+        elif self.path.split('?', 1)[0] == '/events':
+            return self.serve_events()
+        elif self.path.startswith('/nodes/'):
+            return self.serve_node_details()
+        elif self.path.split('?', 1)[0] == '/checklists' or self.path.startswith(('/checklists/', '/checks/')):
+            return self.serve_checklist()
         
+        if self.serve_asset():
+            return
         return super().do_GET()
     
+    def serve_asset(self):
+        """Serve the request from the in-memory asset store; returns False if it isn't an asset"""
+        url = urlsplit(self.path)
+        version = parse_qs(url.query).get('v', [None])[0]
+        result = asset_store.respond(
+            url.path,
+            version,
+            self.headers.get('Accept-Encoding'),
+            self.headers.get('If-None-Match'),
+        )
+        if result is None:
+            return False
+        
+        status, headers, body = result
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        SENT_BYTES.labels("asset").inc(len(body))
+        return True
+    
+    def serve_node_details(self):
+        """Serve one node's detail document, answering 304 when unchanged"""
+        node_id = unquote(urlsplit(self.path).path[len('/nodes/'):])
+        result = node_details.respond(node_id, self.headers.get('If-None-Match'))
+        if result is None:
+            return self.send_error(404)
+        
+        status, headers, body = result
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        SENT_BYTES.labels("node_details").inc(len(body))
+    
+    def serve_checklist(self):
+        """Serve the checklist summary, a category's checks or one check's details"""
+        parts = urlsplit(self.path).path.strip('/').split('/')
+        if parts == ['checklists']:
+            kind, key = 'summary', ''
+        elif len(parts) == 2:
+            kind, key = ('category' if parts[0] == 'checklists' else 'check'), unquote(parts[1])
+        else:
+            return self.send_error(404)
+        result = checklist_index.respond(kind, key, self.headers.get('If-None-Match'))
+        if result is None:
+            return self.send_error(404)
+        
+        status, headers, body = result
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        SENT_BYTES.labels("checklist").inc(len(body))
+    
+    def serve_workflow(self):
+        """Serve the current snapshot with a strong ETag, answering 304 when unchanged"""
+        snapshot = current_snapshot
+        etag = f'"{snapshot.digest}"'
+        
+        if_none_match = self.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            return
+        
+        body = snapshot.json.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+        SENT_BYTES.labels("workflow").inc(len(body))
+    
+    def serve_events(self):
+        """Server-Sent Events stream that pushes the workflow only when it changes"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        self.end_headers()
+        
+        if self.server.pool is not None:
+            # Stream from a thread of its own so open tabs never take up the request pool
+            self.close_connection = True
+            self.server.detach(self.request)
+            threading.Thread(target=self.stream_events, name="events", daemon=True).start()
+            return
+        self.stream_events()
+    
+    def stream_events(self):
+        """Push the workflow whenever it changes until the client goes away"""
+        # A reconnecting EventSource sends the digest it last saw
+        last_digest = self.headers.get('Last-Event-ID')
+        connected_at = time.perf_counter()
+        ACTIVE_STREAMS.inc()
+        try:
+            while True:
+                with snapshot_changed:
+                    if current_snapshot is None or current_snapshot.digest == last_digest:
+                        snapshot_changed.wait(SSE_KEEPALIVE)
+                    snapshot, changed_at = current_snapshot, published_at
+                
+                if snapshot is not None and snapshot.digest != last_digest:
+                    last_digest = snapshot.digest
+                    event = f"id: {snapshot.digest}\nevent: workflow\ndata: {snapshot.json}\n\n".encode()
+                    self.wfile.write(event)
+                    self.wfile.flush()
+                    # A stream that connected after the publish only waited since connecting
+                    SEND_LAG_SECONDS.observe(time.perf_counter() - max(changed_at, connected_at))
+                    SENT_BYTES.labels("workflow_event").inc(len(event))
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            DROPPED_STREAMS.inc()
+        finally:
+            ACTIVE_STREAMS.dec()
+            if self.server.is_detached(self.request):
+                super().finish()
+                self.server.close_detached(self.request)
+    
+    def finish(self):
+        # A detached stream's thread closes the connection when the stream ends
+        if not self.server.is_detached(self.request):
+            super().finish()
+    
     def log_message(self, format, *args):
         """Suppress normal logging"""
         pass
 
+class WorkflowHTTPServer(http.server.ThreadingHTTPServer):
+    """Threaded HTTP server, optionally limited to a fixed pool of workers
+
+    HTTPServer already sets SO_REUSEADDR, so a restart can rebind while old
+    connections sit in TIME_WAIT. With a pool, /events streams are detached
+    onto threads of their own, so open tabs never starve other requests.
+    """
+    
+    def __init__(self, server_address, handler_class, workers=WORKERS):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http") if workers > 0 else None
+        self._detached = set()
+        self._detached_lock = threading.Lock()
+        super().__init__(server_address, handler_class)
+    
+    def detach(self, request):
+        """Leave ``request`` open after its handler returns; ``close_detached`` closes it"""
+        with self._detached_lock:
+            self._detached.add(request)
+    
+    def is_detached(self, request):
+        with self._detached_lock:
+            return request in self._detached
+    
+    def close_detached(self, request):
+        with self._detached_lock:
+            self._detached.discard(request)
+        super().shutdown_request(request)
+    
+    def shutdown_request(self, request):
+        if not self.is_detached(request):
+            super().shutdown_request(request)
+    
+    def process_request(self, request, client_address):
+        if self.pool is None:
+            return super().process_request(request, client_address)
+        self.pool.submit(self.process_request_thread, request, client_address)
+    
+    def server_close(self):
+        super().server_close()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Workflow visualizer simple server")
+    parser.add_argument("--port", type=int, default=PORT, help=f"port to listen on (default {PORT})")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="size of the request worker pool; 0 starts a thread per request (default)")
+    return parser.parse_args()
+
 def main():
     """Main server function"""
+    args = parse_args()
+    port = args.port
+    
     print("=" * 50)
     print("WORKFLOW VISUALIZER - Simple Server")
     print("=" * 50)
     print(f"Script monitored: {SCRIPT_PATH}")
-    print(f"Server port: {PORT}")
+    print(f"Server port: {port}")
+    print(f"Workers: {args.workers or 'thread per request'}")
     print()
     
     # Generate initial workflow
@@ -160,14 +445,23 @@ def main():
     watcher_thread.start()
     print("✓ File watcher started")
     
-    # Start HTTP server
-    with socketserver.TCPServer(("", PORT), CustomHTTPRequestHandler) as httpd:
-        print(f"✓ Server running at http://localhost:{PORT}")
+    # Start HTTP server (threaded, so open /events streams don't block other requests)
+    try:
+        httpd = WorkflowHTTPServer(("", port), CustomHTTPRequestHandler, workers=args.workers)
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        print(f"✗ Port {port} is already in use - is another visualizer server running?")
+        print("  Stop it or start this one with --port <other port>")
+        raise SystemExit(1)
+    
+    with httpd:
+        print(f"✓ Server running at http://localhost:{port}")
         print()
         print("Open your browser and navigate to:")
-        print(f"  → http://localhost:{PORT}")
+        print(f"  → http://localhost:{port}")
         print()
-        print("The visualization will auto-refresh every 2 seconds")
+        print("The visualization updates whenever the workflow changes")
         print("Press Ctrl+C to stop the server")
         print("-" * 50)
         
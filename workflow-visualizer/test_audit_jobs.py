@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Audit Jobs tests - POST /audit end to end with the offline DryRunAgent
+
+Run from this directory with ``python -m pytest test_audit_jobs.py``.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from audit_jobs import AuditJobQueue
+
+DRY_RUN_AGENT = "audit_jobs:DryRunAgent"
+
+
+@pytest.fixture(scope="module")
+def client():
+    # The server's startup (file observers) can run only once per process
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def audit_queue(monkeypatch):
+    """Swap in a fresh single-worker queue with no waiting room"""
+    queue = AuditJobQueue(workers=1, max_queue=0, agent_spec=DRY_RUN_AGENT)
+    monkeypatch.setattr(server, "audit_jobs", queue)
+    yield queue
+    queue.shutdown()
+
+
+def read_events(response):
+    """(event, data) pairs of a server-sent event stream"""
+    events = []
+    event = None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+def test_dry_run_audit_streams_to_a_result(client, audit_queue):
+    with client.stream("POST", "/audit", json={"content": "Some words to audit. " * 50, "fix": True}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = read_events(response)
+
+    names = [name for name, _ in events]
+    assert names[:2] == ["queued", "started"]
+    assert names[-1] == "result"
+    assert "log" in names
+    assert events[-1][1]["report_markdown"].startswith("# Audit Report")
+    assert events[-1][1]["fixed_content"]
+    assert audit_queue.stats()["completed"] == 1
+
+
+def test_full_queue_answers_429_with_retry_after(client, audit_queue):
+    # TestClient buffers whole responses, so the first audit runs on its own thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        first = pool.submit(client.post, "/audit", json={"content": "first"})
+        deadline = time.monotonic() + 10
+        while audit_queue.running + audit_queue.waiting == 0:
+            assert time.monotonic() < deadline, "first audit was never admitted"
+            time.sleep(0.01)
+
+        rejected = client.post("/audit", json={"content": "second"})
+        assert rejected.status_code == 429
+        assert int(rejected.headers["Retry-After"]) >= 1
+
+        response = first.result(timeout=60)
+    assert response.status_code == 200
+    assert read_events(response)[-1][0] == "result"
+    assert audit_queue.stats()["rejected"] == 1
+
+
+def test_audit_requires_content(client, audit_queue):
+    assert client.post("/audit", json={"fix": True}).status_code == 400
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Batch Parse tests - incremental runs still write every script's workflow
+
+Run from this directory with ``python -m pytest test_batch_parse.py``.
+"""
+
+import json
+
+import batch_parse
+from benchmark import agent_source
+
+
+def run(tmp_path, output_name):
+    output = tmp_path / output_name
+    argv = [str(tmp_path / "agents"), "-o", str(output), "--manifest", str(tmp_path / "manifest.json"), "-j", "1"]
+    assert batch_parse.main(argv) == 0
+    return {record["path"]: record for record in map(json.loads, output.read_text().splitlines())}
+
+
+def test_rerun_keeps_every_workflow(tmp_path):
+    agents = tmp_path / "agents"
+    agents.mkdir()
+    for steps in range(3):
+        (agents / f"agent_{steps}.py").write_text(agent_source(steps, 1))
+
+    first = run(tmp_path, "graphs.ndjson")
+    assert {record["status"] for record in first.values()} == {"parsed"}
+
+    # Change one script; the others are skipped but must keep their graphs, in the same or a new output
+    (agents / "agent_0.py").write_text(agent_source(4, 1))
+    for output_name in ("graphs.ndjson", "other.ndjson"):
+        second = run(tmp_path, output_name)
+        assert second.keys() == first.keys()
+        for path, record in second.items():
+            assert record["workflow"]["nodes"], path
+            if path.endswith("agent_0.py"):
+                assert record["workflow"] != first[path]["workflow"]
+            else:
+                assert record["status"] == "unchanged"
+                assert record["workflow"] == first[path]["workflow"]
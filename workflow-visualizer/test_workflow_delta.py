@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Workflow Delta tests - apply_delta(old, diff_workflows(old, new)) rebuilds new
+
+``apply_delta`` is the reference for the clients' ``applyDelta`` in
+workflow.js. Run from this directory with ``python -m pytest test_workflow_delta.py``.
+"""
+
+import pytest
+
+from benchmark import agent_source
+from node_details import split_workflow
+from parser import WorkflowParser
+from workflow_delta import apply_delta, diff_workflows
+
+
+def node(node_id, x=100, y=50, label=None):
+    return {"id": node_id, "type": "process", "label": label or node_id, "x": x, "y": y}
+
+
+BASE = {
+    "nodes": [node("a"), node("b", y=150), node("c", x=350)],
+    "connections": [{"from": "a", "to": "c"}, {"from": "b", "to": "c"}],
+    "metrics": {"nodes": 3},
+}
+
+CHANGES = {
+    "add node and connection": {
+        **BASE,
+        "nodes": BASE["nodes"] + [node("d", x=600)],
+        "connections": BASE["connections"] + [{"from": "c", "to": "d"}],
+        "metrics": {"nodes": 4},
+    },
+    "remove node and connection": {
+        **BASE,
+        "nodes": [node("a"), node("c", x=350)],
+        "connections": [{"from": "a", "to": "c"}],
+        "metrics": {"nodes": 2},
+    },
+    "move and relabel nodes": {
+        **BASE,
+        "nodes": [node("a", y=80), node("b", y=150, label="B"), node("c", x=600)],
+    },
+    "unchanged": BASE,
+}
+
+
+@pytest.mark.parametrize("name", CHANGES)
+def test_apply_delta_rebuilds_new_workflow(name):
+    new = CHANGES[name]
+    assert apply_delta(BASE, diff_workflows(BASE, new)) == new
+
+
+def test_apply_delta_leaves_input_untouched():
+    before = repr(BASE)
+    apply_delta(BASE, diff_workflows(BASE, CHANGES["remove node and connection"]))
+    assert repr(BASE) == before
+
+
+@pytest.mark.parametrize("steps_before, steps_after", [(5, 6), (6, 5)])
+def test_apply_delta_round_trips_parsed_workflows(tmp_path, steps_before, steps_after):
+    script = tmp_path / "content_audit_agent.py"
+    script.write_text(agent_source(steps_before, 2))
+    old, _ = split_workflow(WorkflowParser(str(script)).parse())
+    script.write_text(agent_source(steps_after, 2))
+    positions = {n["id"]: (n["x"], n["y"]) for n in old["nodes"]}
+    new, _ = split_workflow(WorkflowParser(str(script), positions).parse())
+
+    delta = diff_workflows(old, new)
+    assert delta["nodes"]["upsert"] or delta["nodes"]["remove"]
+    assert apply_delta(old, delta) == new
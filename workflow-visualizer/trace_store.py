@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Trace Store - Bounded storage for span timings with rolling percentiles
+
+Completed spans (see tracing.py) are kept in a fixed-capacity ring of
+fixed-width columns, so memory stays flat no matter how many audit runs
+are traced. Per-node latency percentiles come from log-bucketed
+histograms kept in short time slots, which are merged on demand for each
+sliding window.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Any, Optional, Sequence
+
+DEFAULT_WINDOWS = (60, 300, 3600)
+PERCENTILES = (50, 95, 99)
+
+# Histogram bucket for zero (or clock-skewed negative) durations, below any log bucket
+ZERO_BUCKET = -(2 ** 31)
+
+# Ring node id of records whose node was evicted from the intern table
+EVICTED = 2 ** 32 - 1
+
+
+def run_key(run_id: Optional[str]) -> int:
+    """64-bit key for a run id; runs are not interned so the table can't grow unbounded"""
+    if not run_id:
+        return 0
+    return int.from_bytes(hashlib.blake2b(run_id.encode(), digest_size=8).digest(), "big")
+
+
+class SpanRing:
+    """Append-only ring of (node, start, duration, run) records in typed arrays
+
+    Each record takes 24 bytes: a 4-byte interned node id, an 8-byte start
+    time, a 4-byte duration in milliseconds and an 8-byte run key. The
+    oldest records are overwritten once ``capacity`` is reached.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        self.capacity = capacity
+        self.node = array("I", bytes(4 * capacity))
+        self.start = array("d", bytes(8 * capacity))
+        self.duration = array("f", bytes(4 * capacity))
+        self.run = array("Q", bytes(8 * capacity))
+        self.total = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, node: int, start: float, duration_ms: float, run: int) -> None:
+        i = self.total % self.capacity
+        self.node[i] = node
+        self.start[i] = start
+        self.duration[i] = duration_ms
+        self.run[i] = run
+        self.total += 1
+
+    def indices(self, newest_first: bool = True):
+        """Slot indices of the stored records"""
+        count = len(self)
+        newest = self.total - 1
+        order = range(count) if newest_first else range(count - 1, -1, -1)
+        for back in order:
+            yield (newest - back) % self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in (self.node, self.start, self.duration, self.run))
+
+
+class RollingHistogram:
+    """Latency histogram over sliding windows
+
+    Values are counted in logarithmic buckets, so any percentile is within
+    ``relative_accuracy`` of the exact value. Buckets are kept per
+    ``slot_seconds`` time slot. A window query merges the slots it covers
+    and slots older than ``max_window`` are dropped.
+    """
+
+    def __init__(self, slot_seconds: float = 10, max_window: float = 3600,
+                 relative_accuracy: float = 0.01):
+        self.slot_seconds = slot_seconds
+        self.max_slots = int(math.ceil(max_window / slot_seconds)) + 1
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._slots: "deque[tuple]" = deque()  # (slot number, Counter of bucket -> count)
+
+    def _bucket(self, value: float) -> int:
+        if value <= 0:
+            return ZERO_BUCKET
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _value(self, bucket: int) -> float:
+        if bucket == ZERO_BUCKET:
+            return 0.0
+        # Bucket b covers (gamma^(b-1), gamma^b]; this point is within the accuracy of both ends
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+    def add(self, value: float, now: float) -> None:
+        slot = int(now // self.slot_seconds)
+        if not self._slots or self._slots[-1][0] < slot:
+            self._slots.append((slot, Counter()))
+            while self._slots and self._slots[0][0] <= slot - self.max_slots:
+                self._slots.popleft()
+        target = self._slots[-1]
+        if target[0] != slot:
+            # Late span from an older slot; count it where it belongs if still kept
+            target = next((entry for entry in self._slots if entry[0] == slot), None)
+            if target is None:
+                return
+        target[1][self._bucket(value)] += 1
+
+    def summary(self, window: float, now: float,
+                percentiles: Sequence[int] = PERCENTILES) -> Optional[Dict[str, float]]:
+        """Count and percentiles of the values added in the last ``window`` seconds"""
+        first = int((now - window) // self.slot_seconds) + 1
+        merged: Counter = Counter()
+        for slot, buckets in reversed(self._slots):
+            if slot < first:
+                break
+            merged.update(buckets)
+        count = sum(merged.values())
+        if not count:
+            return None
+
+        result: Dict[str, float] = {"count": count}
+        ordered = sorted(merged.items())
+        for p in percentiles:
+            rank = max(1, int(math.ceil(p / 100 * count)))
+            seen = 0
+            for bucket, bucket_count in ordered:
+                seen += bucket_count
+                if seen >= rank:
+                    result[f"p{p}"] = round(self._value(bucket), 3)
+                    break
+        return result
+
+
+class TraceStore:
+    """Completed spans per workflow node: a bounded ring plus rolling percentiles"""
+
+    def __init__(self, capacity: int = 65536, windows: Sequence[float] = DEFAULT_WINDOWS,
+                 slot_seconds: float = 10, recent_runs: int = 1024, max_nodes: int = 1024):
+        self.windows = tuple(windows)
+        self.ring = SpanRing(capacity)
+        self.slot_seconds = slot_seconds
+        self.max_nodes = max_nodes
+        self.evicted_nodes = 0
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._histograms: List[RollingHistogram] = []
+        # Interned node indices, least recently recorded first
+        self._node_use: "OrderedDict[int, None]" = OrderedDict()
+        # Run key -> run id for recent runs, so records can be reported by their original id
+        self._run_names: "OrderedDict[int, str]" = OrderedDict()
+        self._recent_runs = recent_runs
+        self._lock = threading.Lock()
+
+    def _intern(self, node_id: str) -> int:
+        index = self._node_index.get(node_id)
+        if index is not None:
+            self._node_use.move_to_end(index)
+            return index
+        histogram = RollingHistogram(self.slot_seconds, max(self.windows))
+        if len(self._node_ids) < self.max_nodes:
+            index = len(self._node_ids)
+            self._node_ids.append(node_id)
+            self._histograms.append(histogram)
+        else:
+            # Reuse the least recently recorded node's slot; its stored records lose their node
+            index, _ = self._node_use.popitem(last=False)
+            del self._node_index[self._node_ids[index]]
+            for i in self.ring.indices():
+                if self.ring.node[i] == index:
+                    self.ring.node[i] = EVICTED
+            self._node_ids[index] = node_id
+            self._histograms[index] = histogram
+            self.evicted_nodes += 1
+        self._node_index[node_id] = index
+        self._node_use[index] = None
+        return index
+
+    def record(self, node_id: str, start: float, duration_ms: float, run_id: Optional[str] = None,
+               now: Optional[float] = None) -> None:
+        key = run_key(run_id)
+        with self._lock:
+            node = self._intern(node_id)
+            self.ring.append(node, start, duration_ms, key)
+            self._histograms[node].add(duration_ms, time.time() if now is None else now)
+            if run_id:
+                self._run_names[key] = run_id
+                self._run_names.move_to_end(key)
+                while len(self._run_names) > self._recent_runs:
+                    self._run_names.popitem(last=False)
+
+    def extend(self, spans: List[Dict[str, Any]]) -> int:
+        """Record the ``end`` events of a batch from tracing.py; returns how many were stored"""
+        stored = 0
+        for span in spans:
+            if span.get("phase") == "end" and isinstance(span.get("ms"), (int, float)):
+                self.record(span["node"], float(span.get("t") or 0), float(span["ms"]), span.get("run"))
+                stored += 1
+        return stored
+
+    def percentiles(self, window: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """``{node_id: {"count", "p50", "p95", "p99"}}`` over the last ``window`` seconds"""
+        if window is None:
+            window = self.windows[0]
+        now = time.time() if now is None else now
+        with self._lock:
+            summaries = {}
+            for node_id, histogram in zip(self._node_ids, self._histograms):
+                summary = histogram.summary(window, now)
+                if summary is not None:
+                    summaries[node_id] = summary
+            return summaries
+
+    def recent(self, node_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest stored spans, optionally for one node"""
+        with self._lock:
+            node = self._node_index.get(node_id) if node_id is not None else None
+            if node_id is not None and node is None:
+                return []
+            records = []
+            for i in self.ring.indices():
+                if self.ring.node[i] == EVICTED or (node is not None and self.ring.node[i] != node):
+                    continue
+                key = self.ring.run[i]
+                records.append({
+                    "node": self._node_ids[self.ring.node[i]],
+                    "t": self.ring.start[i],
+                    "ms": round(self.ring.duration[i], 3),
+                    "run": self._run_names.get(key, format(key, "016x") if key else None),
+                })
+                if len(records) >= limit:
+                    break
+            return records
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "records": len(self.ring),
+                "recorded_total": self.ring.total,
+                "capacity": self.ring.capacity,
+                "ring_bytes": self.ring.nbytes,
+                "nodes": len(self._node_ids),
+                "evicted_nodes": self.evicted_nodes,
+            }
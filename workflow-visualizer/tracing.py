@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Execution Tracing - Per-node span events from a running ContentAuditAgent
+
+Wraps the agent methods that the parser maps to workflow nodes and emits a
+``begin`` and an ``end`` event for each call, keyed by the visualizer's node
+ids. Events are buffered and handed to a sink in batches from a background
+thread, so a traced call only pays for two clock reads and a deque append.
+
+Typical use from the audit script::
+
+    tracer = Tracer(HttpSpanSink("http://localhost:8002/spans"))
+    agent = tracer.attach(ContentAuditAgent(...))
+    with tracer.run():
+        agent.audit_content(...)
+    tracer.close()
+"""
+
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Any, Optional
+
+from parser import AUDIT_METHOD_NODES
+
+# Method name -> node id for the methods traced by default
+METHOD_NODE_IDS: Dict[str, str] = {method: node[0] for method, node in AUDIT_METHOD_NODES.items()}
+
+SpanSink = Callable[[List[Dict[str, Any]]], None]
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar("trace_run", default=None)
+_current_node: contextvars.ContextVar = contextvars.ContextVar("trace_node", default=None)
+
+
+def current_node() -> Optional[str]:
+    """Node id of the innermost traced call in progress, e.g. to tag log lines"""
+    return _current_node.get()
+
+
+class Tracer:
+    """Collects span events and flushes them to ``sink`` in batches
+
+    An event looks like::
+
+        {"run": "3f2a...", "node": "analyze-chunks", "phase": "end",
+         "t": 1700000000.123, "ms": 412.7, "ok": true}
+
+    ``t`` is the wall-clock start time of the call and ``ms`` its duration
+    (``end`` events only). ``ok`` is false when the call raised.
+    """
+
+    def __init__(self, sink: SpanSink, method_nodes: Optional[Dict[str, str]] = None,
+                 flush_interval: float = 0.25, max_batch: int = 256):
+        self.sink = sink
+        self.method_nodes = dict(METHOD_NODE_IDS if method_nodes is None else method_nodes)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._events: deque = deque()
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="span-flush", daemon=True)
+        self._flusher.start()
+
+    def attach(self, agent: Any) -> Any:
+        """Trace the mapped methods of ``agent`` (instance-level, the class is untouched)"""
+        for method_name, node_id in self.method_nodes.items():
+            method = getattr(agent, method_name, None)
+            if callable(method):
+                setattr(agent, method_name, self.wrap(method, node_id))
+        return agent
+
+    def traced(self, node_id: str):
+        """Decorator form of ``wrap`` for functions defined in the traced code"""
+        return lambda func: self.wrap(func, node_id)
+
+    def wrap(self, func: Callable, node_id: str) -> Callable:
+        events = self._events
+
+        @functools.wraps(func)
+        def traced_call(*args, **kwargs):
+            run_id = _current_run.get()
+            started = time.time()
+            events.append({"run": run_id, "node": node_id, "phase": "begin", "t": started})
+            node_token = _current_node.set(node_id)
+            start = time.perf_counter()
+            ok = True
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                ok = False
+                raise
+            finally:
+                _current_node.reset(node_token)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                events.append({
+                    "run": run_id, "node": node_id, "phase": "end",
+                    "t": started, "ms": round(elapsed_ms, 3), "ok": ok,
+                })
+                if len(events) >= self.max_batch:
+                    self._wakeup.set()
+
+        return traced_call
+
+    @contextmanager
+    def run(self, run_id: Optional[str] = None):
+        """Tag every span emitted inside the block with ``run_id``"""
+        run_id = run_id or uuid.uuid4().hex
+        token = _current_run.set(run_id)
+        try:
+            yield run_id
+        finally:
+            _current_run.reset(token)
+            self._wakeup.set()
+
+    def flush(self) -> None:
+        while self._events:
+            batch = []
+            while self._events and len(batch) < self.max_batch:
+                batch.append(self._events.popleft())
+            try:
+                self.sink(batch)
+            except Exception:
+                # Tracing must never break the audit itself
+                self.dropped += len(batch)
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the background thread after flushing what is buffered"""
+        self._closed.set()
+        self._wakeup.set()
+        self._flusher.join()
+        self.flush()
+
+
+class HttpSpanSink:
+    """Posts span batches to the visualizer server's ``/spans`` endpoint"""
+
+    def __init__(self, url: str = "http://localhost:8002/spans", timeout: float = 2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, spans: List[Dict[str, Any]]) -> None:
+        body = json.dumps({"spans": spans}, separators=(",", ":")).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
@@ -7,12 +7,19 @@ let raycaster, mouse;
 let autoRotate = true;
 let hoveredNode = null;
 let tooltip;
-let particles = [];
 let executionPath = [];
 let isSimulating = false;
 let simulationStep = 0;
 let clock = new THREE.Clock();
 
+// Checklist catalogue, fetched piecewise from /checklists, /checklists/{category} and /checks/{id}
+let checklistSummary = null;
+const checkDetailsCache = new Map();
+let masterViewToken = 0;
+
+// Node id -> promise of its /nodes/{id} detail document; the workflow carries only topology
+const nodeDetailsCache = new Map();
+
 // Node colors by type
 const nodeColors = {
     input: 0x667eea,
@@ -22,6 +29,348 @@ const nodeColors = {
     checklist: 0x9C27B0
 };
 
+// Objects a view adds besides its nodes (headers, platforms, legends); removed on view switch
+let viewObjects = [];
+
+// Scratch objects reused every frame so the render loop allocates nothing
+const UNIT_SCALE = new THREE.Vector3(1, 1, 1);
+const HIDDEN_SCALE = new THREE.Vector3(0, 0, 0);
+const _matrix = new THREE.Matrix4();
+const _quaternion = new THREE.Quaternion();
+const _color = new THREE.Color();
+
+// Node boxes are instances of one InstancedMesh per shape, so a view is a few draw calls
+// however many nodes it has. Batches live for the whole session and are refilled per view.
+const INITIAL_BATCH_CAPACITY = 64;
+const batchShapes = {
+    workflow: () => [new THREE.BoxGeometry(15, 8, 4), {}],
+    check: () => [new THREE.BoxGeometry(4, 4, 4), {}],
+    'check-manual': () => [new THREE.BoxGeometry(4, 4, 4), { transparent: true, opacity: 0.6 }],
+    metric: () => [new THREE.BoxGeometry(8, 1, 8), {}]  // scaled to each bar's height
+};
+const nodeBatches = {};
+const batchList = [];
+const batchMeshes = [];
+
+// Stands in for a Mesh in `nodes`: position, scale, visibility, glow and userData
+class NodeInstance {
+    constructor(data, color) {
+        this.userData = data;
+        this.position = new THREE.Vector3();
+        this.scale = new THREE.Vector3(1, 1, 1);
+        this.baseY = 0;  // resting height; animate() bobs around it
+        this.visible = true;
+        this.color = new THREE.Color(color);
+        this.emissiveIntensity = 0.1;
+    }
+}
+
+class InstancedBatch {
+    constructor(geometry, materialOptions) {
+        this.geometry = geometry;
+        // Instance colors multiply the material color, so it stays white
+        this.material = new THREE.MeshPhongMaterial({ color: 0xffffff, ...materialOptions });
+        this.instances = [];
+        this.mesh = null;
+        this.allocate(INITIAL_BATCH_CAPACITY);
+    }
+    
+    allocate(capacity) {
+        const previous = this.mesh;
+        this.mesh = new THREE.InstancedMesh(this.geometry, this.material, capacity);
+        this.mesh.instanceMatrix.setUsage(THREE.DynamicDrawUsage);
+        this.mesh.setColorAt(0, _color.set(0xffffff));  // creates the instanceColor buffer
+        this.mesh.count = 0;
+        this.mesh.castShadow = true;
+        this.mesh.receiveShadow = true;
+        // Instances are spread out; the geometry's own bounds would cull them wrongly
+        this.mesh.frustumCulled = false;
+        this.mesh.userData = { batch: this, pooled: true };
+        this.capacity = capacity;
+        if (previous) {
+            scene.remove(previous);
+            previous.dispose();
+            batchMeshes[batchMeshes.indexOf(previous)] = this.mesh;
+        } else {
+            batchMeshes.push(this.mesh);
+        }
+    }
+    
+    add(data, color) {
+        if (this.instances.length === this.capacity) {
+            this.allocate(this.capacity * 2);
+        }
+        const instance = new NodeInstance(data, color);
+        this.instances.push(instance);
+        if (!this.mesh.parent) {
+            scene.add(this.mesh);
+        }
+        return instance;
+    }
+    
+    clear() {
+        this.instances.length = 0;
+        this.mesh.count = 0;
+    }
+    
+    // Copy every instance's transform and glow into the GPU buffers
+    sync() {
+        const mesh = this.mesh;
+        const instances = this.instances;
+        for (let i = 0; i < instances.length; i++) {
+            const instance = instances[i];
+            _matrix.compose(instance.position, _quaternion, instance.visible ? instance.scale : HIDDEN_SCALE);
+            mesh.setMatrixAt(i, _matrix);
+            mesh.setColorAt(i, _color.copy(instance.color).multiplyScalar(1 + instance.emissiveIntensity));
+        }
+        mesh.count = instances.length;
+        mesh.instanceMatrix.needsUpdate = true;
+        mesh.instanceColor.needsUpdate = true;
+    }
+}
+
+function getBatch(kind) {
+    if (!nodeBatches[kind]) {
+        const [geometry, materialOptions] = batchShapes[kind]();
+        nodeBatches[kind] = new InstancedBatch(geometry, materialOptions);
+        batchList.push(nodeBatches[kind]);
+    }
+    return nodeBatches[kind];
+}
+
+function clearNodeBatches() {
+    for (let i = 0; i < batchList.length; i++) {
+        batchList[i].clear();
+    }
+}
+
+// The visible node instance under the mouse, or null
+function pickNode() {
+    raycaster.setFromCamera(mouse, camera);
+    const hits = raycaster.intersectObjects(batchMeshes);
+    for (const hit of hits) {
+        const instance = hit.object.userData.batch.instances[hit.instanceId];
+        if (instance && instance.visible) {
+            return instance;
+        }
+    }
+    return null;
+}
+
+// Particles: a fixed pool of points in one geometry; position, size and alpha are attributes
+const PARTICLE_POOL_SIZE = 256;
+const PARTICLE_SPEED = 0.3;  // curve fraction per second
+
+const particleVertexShader = `
+    attribute float size;
+    attribute float alpha;
+    uniform float scale;
+    varying float vAlpha;
+    void main() {
+        vAlpha = alpha;
+        vec4 mvPosition = modelViewMatrix * vec4(position, 1.0);
+        gl_PointSize = size * scale / -mvPosition.z;
+        gl_Position = projectionMatrix * mvPosition;
+    }
+`;
+
+const particleFragmentShader = `
+    uniform vec3 color;
+    varying float vAlpha;
+    void main() {
+        vec2 offset = gl_PointCoord - 0.5;
+        if (dot(offset, offset) > 0.25) discard;
+        gl_FragColor = vec4(color, vAlpha);
+    }
+`;
+
+class ParticlePool {
+    constructor(size) {
+        this.size = size;
+        this.next = 0;
+        this.active = 0;
+        this.curves = new Float32Array(size * 9);  // start, control point, end
+        this.progress = new Float32Array(size).fill(-1);  // < 0 = free slot
+        this.positions = new Float32Array(size * 3);
+        this.sizes = new Float32Array(size);
+        this.alphas = new Float32Array(size);
+        
+        const geometry = new THREE.BufferGeometry();
+        this.positionAttribute = new THREE.BufferAttribute(this.positions, 3).setUsage(THREE.DynamicDrawUsage);
+        this.sizeAttribute = new THREE.BufferAttribute(this.sizes, 1).setUsage(THREE.DynamicDrawUsage);
+        this.alphaAttribute = new THREE.BufferAttribute(this.alphas, 1).setUsage(THREE.DynamicDrawUsage);
+        geometry.setAttribute('position', this.positionAttribute);
+        geometry.setAttribute('size', this.sizeAttribute);
+        geometry.setAttribute('alpha', this.alphaAttribute);
+        
+        this.material = new THREE.ShaderMaterial({
+            uniforms: {
+                color: { value: new THREE.Color(0x00ff00) },
+                scale: { value: 1 }
+            },
+            vertexShader: particleVertexShader,
+            fragmentShader: particleFragmentShader,
+            transparent: true,
+            depthWrite: false
+        });
+        this.points = new THREE.Points(geometry, this.material);
+        this.points.frustumCulled = false;
+        this.points.userData = { pooled: true };
+    }
+    
+    // Point size is in world units; convert to pixels for the current viewport
+    resize(viewportHeight, fov) {
+        this.material.uniforms.scale.value = viewportHeight / (2 * Math.tan(THREE.MathUtils.degToRad(fov / 2)));
+    }
+    
+    // Start a particle travelling from ``from`` to ``to``; reuses the oldest slot when full
+    emit(from, to) {
+        const i = this.next;
+        this.next = (this.next + 1) % this.size;
+        if (this.progress[i] < 0) this.active++;
+        
+        const c = this.curves;
+        const o = i * 9;
+        c[o] = from.x; c[o + 1] = from.y; c[o + 2] = from.z;
+        c[o + 3] = (from.x + to.x) / 2; c[o + 4] = (from.y + to.y) / 2 + 10; c[o + 5] = (from.z + to.z) / 2;
+        c[o + 6] = to.x; c[o + 7] = to.y; c[o + 8] = to.z;
+        this.progress[i] = 0;
+        
+        if (!this.points.parent) {
+            scene.add(this.points);
+        }
+    }
+    
+    update(delta) {
+        if (this.active === 0) return;
+        const c = this.curves;
+        for (let i = 0; i < this.size; i++) {
+            let t = this.progress[i];
+            if (t < 0) continue;
+            t += delta * PARTICLE_SPEED;
+            if (t >= 1) {
+                this.progress[i] = -1;
+                this.sizes[i] = 0;
+                this.alphas[i] = 0;
+                this.active--;
+                continue;
+            }
+            this.progress[i] = t;
+            
+            // Quadratic Bezier from start through the raised midpoint to the end
+            const o = i * 9;
+            const u = 1 - t;
+            const a = u * u, b = 2 * u * t, d = t * t;
+            this.positions[i * 3] = a * c[o] + b * c[o + 3] + d * c[o + 6];
+            this.positions[i * 3 + 1] = a * c[o + 1] + b * c[o + 4] + d * c[o + 7];
+            this.positions[i * 3 + 2] = a * c[o + 2] + b * c[o + 5] + d * c[o + 8];
+            
+            // Glow: fade out and swell mid-flight
+            this.alphas[i] = 1 - t * 0.5;
+            this.sizes[i] = 1 + Math.sin(t * Math.PI) * 0.5;
+        }
+        this.positionAttribute.needsUpdate = true;
+        this.sizeAttribute.needsUpdate = true;
+        this.alphaAttribute.needsUpdate = true;
+    }
+    
+    clear() {
+        this.progress.fill(-1);
+        this.sizes.fill(0);
+        this.alphas.fill(0);
+        this.active = 0;
+        this.sizeAttribute.needsUpdate = true;
+        this.alphaAttribute.needsUpdate = true;
+    }
+}
+
+let particlePool;
+
+// Frame-time HUD: frame interval and render-loop CPU time over the last FRAME_SAMPLES frames
+const FRAME_SAMPLES = 120;
+const HUD_INTERVAL_MS = 500;
+const frameIntervals = new Float32Array(FRAME_SAMPLES);
+const frameWork = new Float32Array(FRAME_SAMPLES);
+const sortedIntervals = new Float32Array(FRAME_SAMPLES);
+let frameIndex = 0;
+let frameCount = 0;
+let lastFrameAt = 0;
+let hudUpdatedAt = 0;
+let frameHud = null;
+
+function recordFrame(frameStart) {
+    const now = performance.now();
+    if (lastFrameAt) {
+        frameIntervals[frameIndex] = frameStart - lastFrameAt;
+        frameWork[frameIndex] = now - frameStart;
+        frameIndex = (frameIndex + 1) % FRAME_SAMPLES;
+        frameCount = Math.min(frameCount + 1, FRAME_SAMPLES);
+    }
+    lastFrameAt = frameStart;
+    
+    if (frameHud && frameCount && now - hudUpdatedAt > HUD_INTERVAL_MS) {
+        hudUpdatedAt = now;
+        updateFrameHud();
+    }
+}
+
+function updateFrameHud() {
+    let intervalSum = 0, workSum = 0;
+    for (let i = 0; i < frameCount; i++) {
+        intervalSum += frameIntervals[i];
+        workSum += frameWork[i];
+        sortedIntervals[i] = frameIntervals[i];
+    }
+    const sorted = sortedIntervals.subarray(0, frameCount).sort();
+    const p95 = sorted[Math.min(frameCount - 1, Math.floor(frameCount * 0.95))];
+    const average = intervalSum / frameCount;
+    
+    let instances = 0;
+    for (let i = 0; i < batchList.length; i++) {
+        instances += batchList[i].instances.length;
+    }
+    const info = renderer.info;
+    frameHud.textContent =
+        `${(1000 / average).toFixed(0)} fps  frame ${average.toFixed(1)} ms (p95 ${p95.toFixed(1)}, max ${sorted[frameCount - 1].toFixed(1)})\n` +
+        `cpu ${(workSum / frameCount).toFixed(2)} ms  draw calls ${info.render.calls}  triangles ${info.render.triangles}\n` +
+        `instances ${instances}  particles ${particlePool.active}/${particlePool.size}\n` +
+        `geometries ${info.memory.geometries}  textures ${info.memory.textures}`;
+}
+
+window.toggleFrameHud = function() {
+    if (frameHud) {
+        frameHud.remove();
+        frameHud = null;
+        return;
+    }
+    frameHud = document.createElement('pre');
+    frameHud.id = 'frameHud';
+    document.body.appendChild(frameHud);
+    hudUpdatedAt = 0;
+};
+
+function addViewObject(object) {
+    scene.add(object);
+    viewObjects.push(object);
+    return object;
+}
+
+// Free the GPU buffers of an object removed from the scene (pooled batches are kept)
+function disposeObject(object) {
+    if (object.userData && object.userData.label) {
+        // Atlas labels stay rasterized for the next view; only the reference is dropped
+        labelAtlas.release(object.userData.label);
+        object.userData.label = null;
+        return;
+    }
+    if (object.userData && object.userData.pooled) return;
+    if (object.geometry) object.geometry.dispose();
+    if (object.material) {
+        if (object.material.map) object.material.map.dispose();
+        object.material.dispose();
+    }
+}
+
 function init() {
     // Scene setup
     scene = new THREE.Scene();
@@ -67,6 +416,10 @@ function init() {
     // Tooltip
     tooltip = document.getElementById('tooltip');
     
+    // Particle pool (one draw call for every particle in flight)
+    particlePool = new ParticlePool(PARTICLE_POOL_SIZE);
+    particlePool.resize(window.innerHeight, camera.fov);
+    
     // Event listeners
     window.addEventListener('resize', onWindowResize);
     renderer.domElement.addEventListener('mousemove', onMouseMove);
@@ -123,6 +476,7 @@ async function loadWorkflow() {
     try {
         const response = await fetch('/workflow.json');
         const data = await response.json();
+        nodeDetailsCache.clear();
         createWorkflowNodes(data.nodes);
         createConnections(data.connections, data.nodes);
     } catch (error) {
@@ -133,18 +487,10 @@ async function loadWorkflow() {
 }
 
 function createWorkflowNodes(nodeData) {
+    const batch = getBatch('workflow');
     nodeData.forEach((node, index) => {
-        // Create 3D box for each node
-        const geometry = new THREE.BoxGeometry(15, 8, 4);
-        const material = new THREE.MeshPhongMaterial({
-            color: nodeColors[node.type] || 0x888888,
-            emissive: nodeColors[node.type] || 0x888888,
-            emissiveIntensity: 0.1
-        });
-        
-        const mesh = new THREE.Mesh(geometry, material);
-        mesh.castShadow = true;
-        mesh.receiveShadow = true;
+        // One box instance per node
+        const mesh = batch.add(node, nodeColors[node.type] || 0x888888);
         
         // Position nodes in 3D space
         const x = (node.x - 700) * 0.1;
@@ -152,35 +498,144 @@ function createWorkflowNodes(nodeData) {
         const y = node.type === 'api' ? 10 : 0;
         
         mesh.position.set(x, y, z);
-        mesh.userData = node;
+        mesh.baseY = y;
         
         // Add text sprite
         const sprite = createTextSprite(node.label, node.type);
         sprite.position.set(x, y + 6, z);
         
-        scene.add(mesh);
         scene.add(sprite);
         nodes.push({ mesh, sprite, data: node });
     });
 }
 
+// Text labels are rasterized once into shared atlas pages: one canvas texture and one sprite
+// material per page, with each sprite pointing at its cell through per-cell UVs. Cells are
+// keyed by style + text and survive view switches; unreferenced cells are reused LRU-first.
+const LABEL_CELL_WIDTH = 256;
+const LABEL_CELL_HEIGHT = 64;
+const LABEL_ATLAS_SIZE = 2048;  // 8 x 32 = 256 labels per page
+
+// Every node type currently draws the same way; add entries here to vary it
+const labelStyles = {
+    default: { background: 'rgba(255, 255, 255, 0.9)', color: '#333', font: '20px Arial', lineHeight: 22 }
+};
+
+class LabelAtlas {
+    constructor() {
+        this.pages = [];
+        this.cells = new Map();  // style + text -> cell
+        this.columns = LABEL_ATLAS_SIZE / LABEL_CELL_WIDTH;
+        this.rows = LABEL_ATLAS_SIZE / LABEL_CELL_HEIGHT;
+        this.useCounter = 0;
+    }
+    
+    addPage() {
+        const canvas = document.createElement('canvas');
+        canvas.width = LABEL_ATLAS_SIZE;
+        canvas.height = LABEL_ATLAS_SIZE;
+        const texture = new THREE.CanvasTexture(canvas);
+        // No mipmaps: lower levels would bleed neighbouring labels into each other
+        texture.generateMipmaps = false;
+        texture.minFilter = THREE.LinearFilter;
+        const page = {
+            canvas,
+            context: canvas.getContext('2d'),
+            texture,
+            material: new THREE.SpriteMaterial({ map: texture }),
+            cells: []
+        };
+        for (let index = 0; index < this.columns * this.rows; index++) {
+            page.cells.push(this.createCell(page, index));
+        }
+        this.pages.push(page);
+        return page;
+    }
+    
+    createCell(page, index) {
+        const x = (index % this.columns) * LABEL_CELL_WIDTH;
+        const y = Math.floor(index / this.columns) * LABEL_CELL_HEIGHT;
+        // Half-texel inset keeps linear filtering inside the cell
+        const u0 = (x + 0.5) / LABEL_ATLAS_SIZE;
+        const u1 = (x + LABEL_CELL_WIDTH - 0.5) / LABEL_ATLAS_SIZE;
+        const v1 = 1 - (y + 0.5) / LABEL_ATLAS_SIZE;
+        const v0 = 1 - (y + LABEL_CELL_HEIGHT - 0.5) / LABEL_ATLAS_SIZE;
+        
+        const geometry = new THREE.BufferGeometry();
+        geometry.setIndex([0, 1, 2, 0, 2, 3]);
+        geometry.setAttribute('position', new THREE.Float32BufferAttribute(
+            [-0.5, -0.5, 0, 0.5, -0.5, 0, 0.5, 0.5, 0, -0.5, 0.5, 0], 3));
+        geometry.setAttribute('uv', new THREE.Float32BufferAttribute([u0, v0, u1, v0, u1, v1, u0, v1], 2));
+        return { page, x, y, geometry, key: null, refs: 0, lastUsed: 0 };
+    }
+    
+    // The cell holding ``text`` in ``style``, rasterizing it if needed
+    acquire(text, style) {
+        const key = `${style}\u0000${text}`;
+        let cell = this.cells.get(key);
+        if (!cell) {
+            cell = this.freeCell();
+            if (cell.key !== null) {
+                this.cells.delete(cell.key);
+            }
+            cell.key = key;
+            this.draw(cell, text, labelStyles[style]);
+            this.cells.set(key, cell);
+        }
+        cell.refs++;
+        cell.lastUsed = ++this.useCounter;
+        return cell;
+    }
+    
+    release(cell) {
+        cell.refs = Math.max(0, cell.refs - 1);
+    }
+    
+    // An empty cell, else the least recently used unreferenced one, else a new page
+    freeCell() {
+        let candidate = null;
+        for (const page of this.pages) {
+            for (const cell of page.cells) {
+                if (cell.key === null) return cell;
+                if (cell.refs === 0 && (!candidate || cell.lastUsed < candidate.lastUsed)) {
+                    candidate = cell;
+                }
+            }
+        }
+        return candidate || this.addPage().cells[0];
+    }
+    
+    draw(cell, text, style) {
+        const context = cell.page.context;
+        context.clearRect(cell.x, cell.y, LABEL_CELL_WIDTH, LABEL_CELL_HEIGHT);
+        context.fillStyle = style.background;
+        context.fillRect(cell.x, cell.y, LABEL_CELL_WIDTH, LABEL_CELL_HEIGHT);
+        
+        context.font = style.font;
+        context.fillStyle = style.color;
+        context.textAlign = 'center';
+        context.textBaseline = 'middle';
+        const lines = String(text).split('\n');
+        const top = cell.y + LABEL_CELL_HEIGHT / 2 - (lines.length - 1) * style.lineHeight / 2;
+        lines.forEach((line, i) => {
+            context.fillText(line, cell.x + LABEL_CELL_WIDTH / 2, top + i * style.lineHeight, LABEL_CELL_WIDTH - 8);
+        });
+        // One upload per page per frame, however many labels were drawn
+        cell.page.texture.needsUpdate = true;
+    }
+}
+
+const labelAtlas = new LabelAtlas();
+
 function createTextSprite(text, type) {
-    const canvas = document.createElement('canvas');
-    const context = canvas.getContext('2d');
-    canvas.width = 256;
-    canvas.height = 64;
-    
-    context.fillStyle = 'rgba(255, 255, 255, 0.9)';
-    context.fillRect(0, 0, canvas.width, canvas.height);
-    
-    context.font = '20px Arial';
-    context.fillStyle = '#333';
-    context.textAlign = 'center';
-    context.fillText(text, canvas.width / 2, canvas.height / 2);
-    
-    const texture = new THREE.CanvasTexture(canvas);
-    const material = new THREE.SpriteMaterial({ map: texture });
-    const sprite = new THREE.Sprite(material);
+    const style = labelStyles[type] ? type : 'default';
+    const cell = labelAtlas.acquire(text, style);
+    
+    const sprite = new THREE.Sprite(cell.page.material);
+    sprite.geometry = cell.geometry;
+    // The material and texture belong to the atlas page; disposing the sprite only releases the cell
+    sprite.userData.label = cell;
+    sprite.userData.pooled = true;
     sprite.scale.set(15, 3.75, 1);
     
     return sprite;
@@ -240,6 +695,7 @@ function onWindowResize() {
     camera.aspect = window.innerWidth / window.innerHeight;
     camera.updateProjectionMatrix();
     renderer.setSize(window.innerWidth, window.innerHeight);
+    particlePool.resize(window.innerHeight, camera.fov);
 }
 
 function onMouseMove(event) {
@@ -247,24 +703,24 @@ function onMouseMove(event) {
     mouse.y = -(event.clientY / window.innerHeight) * 2 + 1;
     
     // Check for hover
-    raycaster.setFromCamera(mouse, camera);
-    const intersects = raycaster.intersectObjects(nodes.map(n => n.mesh));
+    const node = pickNode();
     
-    if (intersects.length > 0) {
-        const node = intersects[0].object;
+    if (node) {
         if (hoveredNode !== node) {
             if (hoveredNode) {
-                hoveredNode.material.emissiveIntensity = 0.1;
+                hoveredNode.emissiveIntensity = 0.1;
             }
             hoveredNode = node;
-            node.material.emissiveIntensity = 0.3;
+            node.emissiveIntensity = 0.3;
             
-            // Show tooltip
-            showTooltip(event, node.userData);
+            // Show tooltip once the node's details are in
+            withNodeDetails(node.userData).then(data => {
+                if (hoveredNode === node) showTooltip(event, data);
+            });
         }
     } else {
         if (hoveredNode) {
-            hoveredNode.material.emissiveIntensity = 0.1;
+            hoveredNode.emissiveIntensity = 0.1;
             hoveredNode = null;
             hideTooltip();
         }
@@ -272,22 +728,42 @@ function onMouseMove(event) {
 }
 
 function onMouseClick(event) {
-    raycaster.setFromCamera(mouse, camera);
-    const intersects = raycaster.intersectObjects(nodes.map(n => n.mesh));
+    const node = pickNode();
     
-    if (intersects.length > 0) {
-        const node = intersects[0].object;
+    if (node) {
         
         // Check if this is a checklist item
         if (node.userData.id && node.userData.id.match(/^[A-Z]+\d+$/)) {
-            showCheckDetails(node.userData);
+            openCheckDetails(node.userData.id);
         } else {
             focusOnNode(node);
-            showDetailPanel(node.userData);
+            // Revalidate on click so a detail-only change shows up (304 when unchanged)
+            withNodeDetails(node.userData, true).then(showDetailPanel);
         }
     }
 }
 
+async function fetchChecklistJSON(url) {
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error(`${url}: ${response.status}`);
+    }
+    return response.json();
+}
+
+// Full check definitions are only fetched when a check is clicked
+async function openCheckDetails(checkId) {
+    try {
+        if (!checkDetailsCache.has(checkId)) {
+            checkDetailsCache.set(checkId, await fetchChecklistJSON(`/checks/${encodeURIComponent(checkId)}`));
+        }
+        showCheckDetails(checkDetailsCache.get(checkId));
+    } catch (error) {
+        console.error('Failed to load check details:', error);
+        showNotification(`Could not load details for ${checkId}`);
+    }
+}
+
 // Enhanced detail display for individual checks
 function showCheckDetails(check) {
     const panel = document.getElementById('detailPanel');
@@ -487,6 +963,15 @@ function getAutoFixDescription(check) {
     return descriptions[check.id] || 'Apply appropriate fixes based on the check requirements';
 }
 
+function withNodeDetails(nodeData, refresh = false) {
+    if (refresh || !nodeDetailsCache.has(nodeData.id)) {
+        nodeDetailsCache.set(nodeData.id, fetch(`/nodes/${encodeURIComponent(nodeData.id)}`)
+            .then(response => response.ok ? response.json() : {})
+            .catch(() => ({})));
+    }
+    return nodeDetailsCache.get(nodeData.id).then(details => ({ ...nodeData, ...details }));
+}
+
 function showDetailPanel(nodeData) {
     const panel = document.getElementById('detailPanel');
     const title = document.getElementById('detailTitle');
@@ -502,7 +987,7 @@ function showDetailPanel(nodeData) {
         // Description section
         html += `<div class="detail-section">
             <h3>Description</h3>
-            <p>${nodeData.details.description}</p>
+            <p>${escapeHtml(nodeData.details.description)}</p>
         </div>`;
         
         // Fixes section
@@ -511,7 +996,7 @@ function showDetailPanel(nodeData) {
                 <h3>Fixes Applied</h3>
                 <ul class="detail-list">`;
             nodeData.details.fixes.forEach(fix => {
-                html += `<li>${fix}</li>`;
+                html += `<li>${escapeHtml(fix)}</li>`;
             });
             html += `</ul></div>`;
         }
@@ -522,11 +1007,11 @@ function showDetailPanel(nodeData) {
                 <h3>Before & After Examples</h3>
                 <div class="example-box">
                     <h4>Before:</h4>
-                    <p class="example-before">${nodeData.details.examples.before}</p>
+                    <p class="example-before">${escapeHtml(nodeData.details.examples.before)}</p>
                     <h4>After:</h4>
-                    <p class="example-after">${nodeData.details.examples.after}</p>
+                    <p class="example-after">${escapeHtml(nodeData.details.examples.after)}</p>
                     <h4>Explanation:</h4>
-                    <p>${nodeData.details.examples.explanation}</p>
+                    <p>${escapeHtml(nodeData.details.examples.explanation)}</p>
                 </div>
             </div>`;
         }
@@ -540,8 +1025,8 @@ function showDetailPanel(nodeData) {
             
             for (const [key, value] of Object.entries(metrics)) {
                 html += `<div class="metric-item">
-                    <div class="metric-label">${key.replace(/([A-Z])/g, ' $1').trim()}</div>
-                    <div class="metric-value">${value}</div>
+                    <div class="metric-label">${escapeHtml(key.replace(/([A-Z])/g, ' $1').trim())}</div>
+                    <div class="metric-value">${escapeHtml(value)}</div>
                 </div>`;
             }
             html += `</div></div>`;
@@ -553,7 +1038,7 @@ function showDetailPanel(nodeData) {
                 <h3>Patterns Detected</h3>
                 <ul class="detail-list">`;
             nodeData.details.patterns.forEach(pattern => {
-                html += `<li>"${pattern}"</li>`;
+                html += `<li>"${escapeHtml(pattern)}"</li>`;
             });
             html += `</ul></div>`;
         }
@@ -564,7 +1049,7 @@ function showDetailPanel(nodeData) {
                 <h3>Rules & Guidelines</h3>
                 <ul class="detail-list">`;
             nodeData.details.rules.forEach(rule => {
-                html += `<li>${rule}</li>`;
+                html += `<li>${escapeHtml(rule)}</li>`;
             });
             html += `</ul></div>`;
         }
@@ -575,7 +1060,7 @@ function showDetailPanel(nodeData) {
                 <h3>Techniques</h3>
                 <ul class="detail-list">`;
             nodeData.details.techniques.forEach(technique => {
-                html += `<li>${technique}</li>`;
+                html += `<li>${escapeHtml(technique)}</li>`;
             });
             html += `</ul></div>`;
         }
@@ -589,7 +1074,7 @@ function showDetailPanel(nodeData) {
                 html += `<h4 style="margin-top: 10px; font-size: 13px;">Techniques:</h4>
                 <ul class="detail-list">`;
                 nodeData.details.humanization.techniques.forEach(tech => {
-                    html += `<li>${tech}</li>`;
+                    html += `<li>${escapeHtml(tech)}</li>`;
                 });
                 html += `</ul>`;
             }
@@ -598,7 +1083,7 @@ function showDetailPanel(nodeData) {
                 html += `<h4 style="margin-top: 10px; font-size: 13px;">Voice Traits:</h4>
                 <ul class="detail-list">`;
                 nodeData.details.humanization.voiceTraits.forEach(trait => {
-                    html += `<li>${trait}</li>`;
+                    html += `<li>${escapeHtml(trait)}</li>`;
                 });
                 html += `</ul>`;
             }
@@ -613,8 +1098,8 @@ function showDetailPanel(nodeData) {
             
             for (const [key, value] of Object.entries(nodeData.details.detection)) {
                 html += `<div class="metric-item">
-                    <div class="metric-label">${key.replace(/([A-Z])/g, ' $1').trim()}</div>
-                    <div class="metric-value">${value}</div>
+                    <div class="metric-label">${escapeHtml(key.replace(/([A-Z])/g, ' $1').trim())}</div>
+                    <div class="metric-value">${escapeHtml(value)}</div>
                 </div>`;
             }
             html += `</div></div>`;
@@ -651,9 +1136,9 @@ function showDetailPanel(nodeData) {
         // Generic node information
         html += `<div class="detail-section">
             <h3>Node Information</h3>
-            <p>Type: ${nodeData.type}</p>
-            <p>ID: ${nodeData.id}</p>
-            <p>Position: (${nodeData.x}, ${nodeData.y})</p>
+            <p>Type: ${escapeHtml(nodeData.type)}</p>
+            <p>ID: ${escapeHtml(nodeData.id)}</p>
+            <p>Position: (${escapeHtml(nodeData.x)}, ${escapeHtml(nodeData.y)})</p>
         </div>`;
     }
     
@@ -696,17 +1181,17 @@ function animateCamera(targetPosition) {
 }
 
 function showTooltip(event, nodeData) {
-    let content = `<h3>${nodeData.label}</h3>`;
-    content += `<p>${nodeData.subtext || ''}</p>`;
+    let content = `<h3>${escapeHtml(nodeData.label)}</h3>`;
+    content += `<p>${escapeHtml(nodeData.subtext || '')}</p>`;
     
     if (nodeData.details) {
-        content += `<p>${nodeData.details.description || ''}</p>`;
+        content += `<p>${escapeHtml(nodeData.details.description || '')}</p>`;
         
         if (nodeData.details.fixes) {
             content += '<p><strong>Fixes:</strong></p>';
             content += '<ul style="margin: 0; padding-left: 20px; font-size: 11px;">';
             nodeData.details.fixes.forEach(fix => {
-                content += `<li>${fix}</li>`;
+                content += `<li>${escapeHtml(fix)}</li>`;
             });
             content += '</ul>';
         }
@@ -724,6 +1209,7 @@ function hideTooltip() {
 
 function animate() {
     requestAnimationFrame(animate);
+    const frameStart = performance.now();
     const delta = clock.getDelta();
     
     // Auto-rotate camera
@@ -734,26 +1220,30 @@ function animate() {
         camera.lookAt(0, 0, 0);
     }
     
-    // Animate nodes slightly
-    nodes.forEach((node, index) => {
-        const time = Date.now() * 0.001;
-        node.mesh.position.y = node.data.type === 'api' ? 
-            10 + Math.sin(time + index) * 0.5 : 
-            Math.sin(time + index) * 0.2;
+    // Animate nodes slightly (plain loop: no per-frame closures or vectors)
+    const time = Date.now() * 0.001;
+    const activeNodeId = isSimulating ? executionPath[simulationStep] : null;
+    for (let index = 0; index < nodes.length; index++) {
+        const node = nodes[index];
+        const mesh = node.mesh;
+        mesh.position.y = mesh.baseY + Math.sin(time + index) * (node.data.type === 'api' ? 0.5 : 0.2);
             
         // Pulse effect for active simulation node
-        if (isSimulating && executionPath[simulationStep] === node.data.id) {
+        if (activeNodeId !== null && activeNodeId === node.data.id) {
             const scale = 1 + Math.sin(time * 5) * 0.2;
-            node.mesh.scale.set(scale, scale, scale);
-            node.mesh.material.emissiveIntensity = 0.5 + Math.sin(time * 5) * 0.3;
-        } else if (node.mesh.scale.x > 1) {
-            node.mesh.scale.lerp(new THREE.Vector3(1, 1, 1), 0.1);
-            node.mesh.material.emissiveIntensity = Math.max(0.1, node.mesh.material.emissiveIntensity - 0.02);
+            mesh.scale.set(scale, scale, scale);
+            mesh.emissiveIntensity = 0.5 + Math.sin(time * 5) * 0.3;
+        } else if (mesh.scale.x > 1) {
+            mesh.scale.lerp(UNIT_SCALE, 0.1);
+            mesh.emissiveIntensity = Math.max(0.1, mesh.emissiveIntensity - 0.02);
         }
-    });
+    }
+    for (let i = 0; i < batchList.length; i++) {
+        batchList[i].sync();
+    }
     
     // Update particles
-    updateParticles(delta);
+    particlePool.update(delta);
     
     // Update simulation
     if (isSimulating) {
@@ -761,68 +1251,11 @@ function animate() {
     }
     
     renderer.render(scene, camera);
-}
-
-function updateParticles(delta) {
-    particles.forEach((particle, index) => {
-        if (particle.active) {
-            // Move particle along path
-            particle.progress += delta * 0.3;
-            
-            if (particle.progress >= 1) {
-                particle.active = false;
-                scene.remove(particle.mesh);
-                particles.splice(index, 1);
-            } else {
-                // Calculate position along curve
-                const point = particle.curve.getPoint(particle.progress);
-                particle.mesh.position.copy(point);
-                
-                // Add glow effect
-                particle.mesh.material.opacity = 1 - particle.progress * 0.5;
-                const scale = 1 + Math.sin(particle.progress * Math.PI) * 0.5;
-                particle.mesh.scale.set(scale, scale, scale);
-            }
-        }
-    });
+    recordFrame(frameStart);
 }
 
 function createParticle(fromNode, toNode) {
-    const geometry = new THREE.SphereGeometry(0.5, 16, 16);
-    const material = new THREE.MeshBasicMaterial({
-        color: 0x00ff00,
-        transparent: true,
-        opacity: 0.8,
-        emissive: 0x00ff00,
-        emissiveIntensity: 0.5
-    });
-    
-    const particle = new THREE.Mesh(geometry, material);
-    
-    const from = new THREE.Vector3(
-        fromNode.position.x,
-        fromNode.position.y,
-        fromNode.position.z
-    );
-    const to = new THREE.Vector3(
-        toNode.position.x,
-        toNode.position.y,
-        toNode.position.z
-    );
-    
-    const mid = from.clone().add(to).multiplyScalar(0.5);
-    mid.y += 10;
-    
-    const curve = new THREE.QuadraticBezierCurve3(from, mid, to);
-    
-    scene.add(particle);
-    
-    particles.push({
-        mesh: particle,
-        curve: curve,
-        progress: 0,
-        active: true
-    });
+    particlePool.emit(fromNode.position, toNode.position);
 }
 
 function updateSimulation() {
@@ -843,7 +1276,7 @@ function updateSimulation() {
                 createParticle(currentNode.mesh, nextNode.mesh);
                 
                 // Show execution info
-                showExecutionInfo(nextNode.data);
+                withNodeDetails(nextNode.data).then(showExecutionInfo);
             }
             
             simulationStep++;
@@ -877,9 +1310,9 @@ function showExecutionInfo(nodeData) {
     `;
     
     info.innerHTML = `
-        <div style="font-weight: 600; color: #333; margin-bottom: 5px;">Executing: ${nodeData.label}</div>
-        <div style="font-size: 14px; color: #666;">${nodeData.subtext || ''}</div>
-        ${nodeData.details ? `<div style="font-size: 12px; color: #999; margin-top: 5px;">${nodeData.details.description || ''}</div>` : ''}
+        <div style="font-weight: 600; color: #333; margin-bottom: 5px;">Executing: ${escapeHtml(nodeData.label)}</div>
+        <div style="font-size: 14px; color: #666;">${escapeHtml(nodeData.subtext || '')}</div>
+        ${nodeData.details ? `<div style="font-size: 12px; color: #999; margin-top: 5px;">${escapeHtml(nodeData.details.description || '')}</div>` : ''}
     `;
     
     document.body.appendChild(info);
@@ -1008,14 +1441,27 @@ window.switchView = function(viewType, evt) {
         evt.target.style.color = 'white';
     }
     
-    // Clear and rebuild scene based on view
+    // Clear and rebuild scene based on view; node instances go back to their pooled batches
     nodes.forEach(node => {
-        scene.remove(node.mesh);
-        if (node.sprite) scene.remove(node.sprite);
+        if (node.sprite) {
+            scene.remove(node.sprite);
+            disposeObject(node.sprite);
+        }
+    });
+    clearNodeBatches();
+    connections.forEach(conn => {
+        scene.remove(conn);
+        disposeObject(conn);
+    });
+    viewObjects.forEach(object => {
+        scene.remove(object);
+        disposeObject(object);
     });
-    connections.forEach(conn => scene.remove(conn));
     nodes = [];
     connections = [];
+    viewObjects = [];
+    hoveredNode = null;
+    particlePool.clear();
     
     switch(viewType) {
         case 'workflow':
@@ -1059,6 +1505,7 @@ window.switchView = function(viewType, evt) {
                             10,
                             Math.sin(angle) * 30
                         );
+                        node.mesh.baseY = 10;
                         node.sprite.position.copy(node.mesh.position);
                         node.sprite.position.y += 8;
                         node.mesh.scale.set(1.3, 1.3, 1.3);
@@ -1138,12 +1585,12 @@ function createScoringOverlay() {
 }
 
 function calculateChecklistScores() {
-    // Simulate scoring based on checklist categories
-    return masterChecklistData.categories.map(category => {
-        const total = category.checks.length;
-        const criticalCount = category.checks.filter(c => c.params.severity === 'critical').length;
-        const highCount = category.checks.filter(c => c.params.severity === 'high').length;
-        const autoFixable = category.checks.filter(c => c.params.auto_fixable).length;
+    // Simulate scoring based on the per-category counts in the checklist summary
+    return checklistSummary.categories.map(category => {
+        const total = category.total;
+        const criticalCount = category.severity.critical || 0;
+        const highCount = category.severity.high || 0;
+        const autoFixable = category.auto_fixable;
         
         // Weight calculation
         const weight = (criticalCount * 4 + highCount * 2 + (total - criticalCount - highCount)) / total;
@@ -1167,10 +1614,24 @@ function getScoreColor(score) {
     return '#F44336';
 }
 
-function createMasterChecklistView() {
-    // Clear scene first
+async function createMasterChecklistView() {
+    // Fetches still in flight for an earlier master view are ignored once this changes
+    const viewToken = ++masterViewToken;
+    let scoringOverlay = null;
+    
+    // Clean up function for view switching
+    window.cleanupMasterView = () => {
+        masterViewToken++;
+        if (scoringOverlay && scoringOverlay.parentNode) {
+            scoringOverlay.parentNode.removeChild(scoringOverlay);
+        }
+    };
+    
+    // Clear scene first (pooled node batches and particles stay allocated for reuse)
     while(scene.children.length > 0) { 
-        scene.remove(scene.children[0]);
+        const child = scene.children[0];
+        scene.remove(child);
+        disposeObject(child);
     }
     
     // Re-add lights
@@ -1180,11 +1641,19 @@ function createMasterChecklistView() {
     directionalLight.position.set(50, 100, 50);
     scene.add(directionalLight);
     
-    // Create a grid layout for all 85 checks
-    const categories = masterChecklistData.categories;
-    let totalIndex = 0;
+    // Only the category summary is needed for the first paint
+    let summary;
+    try {
+        summary = await fetchChecklistJSON('/checklists');
+    } catch (error) {
+        console.error('Failed to load checklist summary:', error);
+        showNotification('Could not load the master checklist');
+        return;
+    }
+    if (viewToken !== masterViewToken) return;
+    checklistSummary = summary;
     
-    categories.forEach((category, catIndex) => {
+    summary.categories.forEach((category, catIndex) => {
         const categoryColor = new THREE.Color(category.color);
         
         // Create category header
@@ -1196,74 +1665,13 @@ function createMasterChecklistView() {
         });
         const header = new THREE.Mesh(headerGeometry, headerMaterial);
         header.position.set(catIndex * 40 - 140, 50, -80);
-        scene.add(header);
+        addViewObject(header);
         
         // Add category label
         const categorySprite = createTextSprite(category.name, 'category');
         categorySprite.position.set(catIndex * 40 - 140, 55, -80);
         categorySprite.scale.set(20, 5, 1);
-        scene.add(categorySprite);
-        
-        // Create individual check boxes
-        category.checks.forEach((check, checkIndex) => {
-            const checkGeometry = new THREE.BoxGeometry(4, 4, 4);
-            
-            // Color based on severity
-            let checkColor = categoryColor;
-            if (check.params.severity === 'critical') {
-                checkColor = new THREE.Color(0xff0000);
-            } else if (check.params.severity === 'high') {
-                checkColor = new THREE.Color(0xff9800);
-            } else if (check.params.severity === 'medium') {
-                checkColor = new THREE.Color(0xffeb3b);
-            }
-            
-            const checkMaterial = new THREE.MeshPhongMaterial({
-                color: checkColor,
-                emissive: checkColor,
-                emissiveIntensity: 0.1,
-                transparent: true,
-                opacity: check.params.auto_fixable ? 1.0 : 0.6
-            });
-            
-            const checkBox = new THREE.Mesh(checkGeometry, checkMaterial);
-            
-            // Position in a grid under category
-            const row = Math.floor(checkIndex / 3);
-            const col = checkIndex % 3;
-            checkBox.position.set(
-                catIndex * 40 - 140 + (col - 1) * 8,
-                40 - row * 8,
-                -80
-            );
-            
-            // Store check data
-            checkBox.userData = {
-                ...check,
-                category: category.name,
-                categoryColor: category.color
-            };
-            
-            // Add interaction
-            checkBox.castShadow = true;
-            checkBox.receiveShadow = true;
-            
-            scene.add(checkBox);
-            nodes.push({ 
-                mesh: checkBox, 
-                sprite: null, 
-                data: checkBox.userData 
-            });
-            
-            // Add check ID label
-            const labelSprite = createTextSprite(check.id, 'checkId');
-            labelSprite.position.copy(checkBox.position);
-            labelSprite.position.y += 3;
-            labelSprite.scale.set(3, 1, 1);
-            scene.add(labelSprite);
-            
-            totalIndex++;
-        });
+        addViewObject(categorySprite);
     });
     
     // Add summary platform
@@ -1276,13 +1684,13 @@ function createMasterChecklistView() {
     const platform = new THREE.Mesh(platformGeometry, platformMaterial);
     platform.position.set(0, -10, -80);
     platform.receiveShadow = true;
-    scene.add(platform);
+    addViewObject(platform);
     
     // Add total count display
-    const totalSprite = createTextSprite(`Total Checks: ${totalIndex}/85`, 'total');
+    const totalSprite = createTextSprite(`Total Checks: ${summary.total_checks}`, 'total');
     totalSprite.position.set(0, 65, -80);
     totalSprite.scale.set(25, 5, 1);
-    scene.add(totalSprite);
+    addViewObject(totalSprite);
     
     // Add legend for severity levels
     const severities = [
@@ -1297,23 +1705,74 @@ function createMasterChecklistView() {
         const legendMaterial = new THREE.MeshPhongMaterial({ color: sev.color });
         const legendBox = new THREE.Mesh(legendGeometry, legendMaterial);
         legendBox.position.set(sev.x, -20, -80);
-        scene.add(legendBox);
+        addViewObject(legendBox);
         
         const legendLabel = createTextSprite(sev.label, 'legend');
         legendLabel.position.set(sev.x, -25, -80);
         legendLabel.scale.set(8, 2, 1);
-        scene.add(legendLabel);
+        addViewObject(legendLabel);
     });
     
     // Add scoring overlay
-    const scoringOverlay = createScoringOverlay();
-    
-    // Clean up function for view switching
-    window.cleanupMasterView = () => {
-        if (scoringOverlay && scoringOverlay.parentNode) {
-            scoringOverlay.parentNode.removeChild(scoringOverlay);
+    scoringOverlay = createScoringOverlay();
+    
+    // Check boxes fill in per category as each one arrives
+    summary.categories.forEach((category, catIndex) => {
+        fetchChecklistJSON(`/checklists/${encodeURIComponent(category.id)}`)
+            .then(detail => {
+                if (viewToken !== masterViewToken) return;
+                createCategoryChecks(detail, catIndex);
+            })
+            .catch(error => console.error(`Failed to load checklist category ${category.id}:`, error));
+    });
+}
+
+function createCategoryChecks(category, catIndex) {
+    const categoryColor = new THREE.Color(category.color);
+    
+    // Create individual check boxes (instances; manual-review checks go to the translucent batch)
+    category.checks.forEach((check, checkIndex) => {
+        // Color based on severity
+        let checkColor = categoryColor;
+        if (check.severity === 'critical') {
+            checkColor = 0xff0000;
+        } else if (check.severity === 'high') {
+            checkColor = 0xff9800;
+        } else if (check.severity === 'medium') {
+            checkColor = 0xffeb3b;
         }
-    };
+        
+        // Store the compact check entry; full details are fetched on click
+        const userData = {
+            ...check,
+            category: category.name,
+            categoryColor: category.color
+        };
+        const checkBox = getBatch(check.auto_fixable ? 'check' : 'check-manual').add(userData, checkColor);
+        
+        // Position in a grid under category
+        const row = Math.floor(checkIndex / 3);
+        const col = checkIndex % 3;
+        checkBox.position.set(
+            catIndex * 40 - 140 + (col - 1) * 8,
+            40 - row * 8,
+            -80
+        );
+        checkBox.baseY = checkBox.position.y;
+        
+        // Add check ID label
+        const labelSprite = createTextSprite(check.id, 'checkId');
+        labelSprite.position.copy(checkBox.position);
+        labelSprite.position.y += 3;
+        labelSprite.scale.set(3, 1, 1);
+        scene.add(labelSprite);
+        
+        nodes.push({ 
+            mesh: checkBox, 
+            sprite: labelSprite, 
+            data: userData 
+        });
+    });
 }
 
 function createMetricsView() {
@@ -1326,26 +1785,20 @@ function createMetricsView() {
         { label: 'Content Depth', value: 68, color: 0x9C27B0 }
     ];
     
+    const batch = getBatch('metric');
     metricsData.forEach((metric, index) => {
-        // Create bar
+        // Create bar (a unit-height instance scaled to the value)
         const height = metric.value / 5;
-        const geometry = new THREE.BoxGeometry(8, height, 8);
-        const material = new THREE.MeshPhongMaterial({
-            color: metric.color,
-            emissive: metric.color,
-            emissiveIntensity: 0.2
-        });
-        
-        const bar = new THREE.Mesh(geometry, material);
+        const bar = batch.add(metric, metric.color);
+        bar.scale.set(1, height, 1);
         bar.position.set((index - 2) * 15, height / 2, 0);
-        bar.castShadow = true;
-        bar.userData = metric;
+        bar.baseY = height / 2;
+        bar.emissiveIntensity = 0.2;
         
         // Create label
         const sprite = createTextSprite(`${metric.label}\n${metric.value}%`, 'metric');
         sprite.position.set((index - 2) * 15, height + 5, 0);
         
-        scene.add(bar);
         scene.add(sprite);
         nodes.push({ mesh: bar, sprite, data: metric });
     });
@@ -1356,7 +1809,7 @@ function createMetricsView() {
     const platform = new THREE.Mesh(platformGeometry, platformMaterial);
     platform.position.y = -0.5;
     platform.receiveShadow = true;
-    scene.add(platform);
+    addViewObject(platform);
 };
 
 // Initialize on load
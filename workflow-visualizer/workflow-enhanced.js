@@ -20,12 +20,115 @@ class EnhancedWorkflowVisualizer {
         this.nodeStats = new Map();
         this.nodeGroups = new Map();
         this.executionTimes = new Map();
+        this.measuredTimes = new Map();
         this.filterActive = false;
+        this.activeFilter = 'all';
         this.searchTerm = '';
         
+        // Rendered elements keyed by node id and "from→to", patched in place on updates
+        this.nodeIndex = new Map();
+        this.connectionIndex = new Map();
+        this.workflowSignature = null;
+        this.dirtyConnections = new Set();
+        this.backgroundsGroup = null;
+        this.backgroundsDirty = false;
+        this.groupsSignature = null;
+        this.layoutFrame = null;
+        
+        this.workflowEtag = null;
+        this.eventSource = null;
+        this.pollTimer = null;
+        this.traceSocket = null;
+        
         this.initEnhancements();
         this.loadWorkflow();
-        setInterval(() => this.loadWorkflow(), 2000);
+        this.subscribeToChanges();
+        this.subscribeToTraces();
+    }
+    
+    subscribeToTraces() {
+        // Live span events from traced audit runs; only server.py provides /ws
+        if (!window.WebSocket) return;
+        
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        let opened = false;
+        this.traceSocket = new WebSocket(`${protocol}//${window.location.host}/ws`);
+        this.traceSocket.binaryType = 'arraybuffer';
+        const decoder = new TextDecoder();
+        
+        this.traceSocket.onopen = () => { opened = true; };
+        this.traceSocket.onmessage = (event) => {
+            if (event.data === 'pong') return;
+            const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+            const data = JSON.parse(text);
+            if (data.type === 'trace_spans') {
+                this.applySpans(data.spans);
+            }
+        };
+        this.traceSocket.onclose = () => {
+            // Reconnect to a server that had /ws; give up on one that never did
+            this.traceSocket = null;
+            if (opened) setTimeout(() => this.subscribeToTraces(), 3000);
+        };
+    }
+    
+    applySpans(spans) {
+        const touched = new Set();
+        spans.forEach(span => {
+            const entry = this.nodeIndex.get(span.node);
+            const element = entry && entry.element;
+            if (span.phase === 'begin') {
+                if (element) element.classList.add('running');
+                return;
+            }
+            if (element) element.classList.remove('running');
+            
+            const measured = this.measuredTimes.get(span.node) || { count: 0, min: Infinity, max: 0, avg: 0 };
+            measured.count += 1;
+            measured.min = Math.min(measured.min, span.ms);
+            measured.max = Math.max(measured.max, span.ms);
+            measured.avg += (span.ms - measured.avg) / measured.count;
+            this.measuredTimes.set(span.node, measured);
+            this.executionTimes.set(span.node, measured);
+            touched.add(span.node);
+        });
+        
+        touched.forEach(nodeId => {
+            const entry = this.nodeIndex.get(nodeId);
+            if (entry) this.setNodePerformance(entry, nodeId);
+        });
+    }
+    
+    subscribeToChanges() {
+        // Prefer the server's change stream; fall back to conditional polling
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+        
+        let receivedEvent = false;
+        this.eventSource = new EventSource('/events');
+        
+        this.eventSource.addEventListener('workflow', (event) => {
+            receivedEvent = true;
+            this.workflowEtag = `"${event.lastEventId}"`;
+            this.applyWorkflow(JSON.parse(event.data));
+        });
+        
+        this.eventSource.onerror = () => {
+            // Server without /events: stop retrying and poll instead
+            if (!receivedEvent) {
+                this.eventSource.close();
+                this.eventSource = null;
+                this.startPolling();
+            }
+        };
+    }
+    
+    startPolling() {
+        if (!this.pollTimer) {
+            this.pollTimer = setInterval(() => this.loadWorkflow(), 2000);
+        }
     }
     
     initEnhancements() {
@@ -135,36 +238,61 @@ class EnhancedWorkflowVisualizer {
     
     async loadWorkflow() {
         try {
-            const response = await fetch('/workflow.json?' + Date.now());
-            const data = await response.json();
+            // Revalidate with the server's ETag instead of busting the cache
+            const headers = this.workflowEtag ? { 'If-None-Match': this.workflowEtag } : {};
+            const response = await fetch('/workflow.json', { cache: 'no-store', headers });
+            document.getElementById('script-status').textContent = 'Connected';
             
-            // Calculate additional metrics
-            this.calculateMetrics(data);
+            if (response.status === 304) return;
             
-            // Update visualization
-            this.updateWorkflow(data);
-            this.updateLastUpdated();
-            document.getElementById('script-status').textContent = 'Connected';
+            this.workflowEtag = response.headers.get('ETag');
+            this.applyWorkflow(await response.json());
         } catch (error) {
             console.error('Failed to load workflow:', error);
             document.getElementById('script-status').textContent = 'Error loading';
         }
     }
     
+    applyWorkflow(data) {
+        document.getElementById('script-status').textContent = 'Connected';
+        
+        // The stream and the poll can both deliver the current document; skip the repeat
+        const signature = JSON.stringify(data);
+        if (signature === this.workflowSignature) return;
+        this.workflowSignature = signature;
+        
+        // Calculate additional metrics
+        this.calculateMetrics(data);
+        
+        // Update visualization
+        this.updateWorkflow(data);
+        this.updateLastUpdated();
+    }
+    
     calculateMetrics(workflow) {
+        // Servers precompute degree, depth and the critical path once per parse
+        const precomputed = workflow.metrics;
+        
         // Calculate node statistics
         workflow.nodes.forEach(node => {
-            const incomingConnections = workflow.connections.filter(c => c.to === node.id).length;
-            const outgoingConnections = workflow.connections.filter(c => c.from === node.id).length;
+            const serverStats = precomputed && precomputed.nodes[node.id];
+            const incomingConnections = serverStats ? serverStats.incoming :
+                workflow.connections.filter(c => c.to === node.id).length;
+            const outgoingConnections = serverStats ? serverStats.outgoing :
+                workflow.connections.filter(c => c.from === node.id).length;
             
             this.nodeStats.set(node.id, {
                 incoming: incomingConnections,
                 outgoing: outgoingConnections,
                 complexity: incomingConnections + outgoingConnections,
-                depth: this.calculateNodeDepth(node.id, workflow)
+                depth: serverStats ? serverStats.depth : this.calculateNodeDepth(node.id, workflow)
             });
             
-            // Estimate execution times (mock data for demonstration)
+            // Prefer timings measured by traced runs; estimate until one arrives
+            if (this.measuredTimes.has(node.id)) {
+                this.executionTimes.set(node.id, this.measuredTimes.get(node.id));
+                return;
+            }
             const baseTime = {
                 'input': 100,
                 'process': 500,
@@ -184,7 +312,11 @@ class EnhancedWorkflowVisualizer {
         this.identifyNodeGroups(workflow);
         
         // Calculate critical path
-        this.calculateCriticalPath(workflow);
+        if (precomputed) {
+            this.criticalPath = precomputed.critical_path;
+        } else {
+            this.calculateCriticalPath(workflow);
+        }
     }
     
     calculateNodeDepth(nodeId, workflow, visited = new Set()) {
@@ -272,33 +404,157 @@ class EnhancedWorkflowVisualizer {
     }
     
     updateWorkflow(workflow) {
-        // Clear existing elements
-        this.nodesGroup.innerHTML = '';
-        this.connectionsGroup.innerHTML = '';
-        this.nodes = [];
-        this.connections = [];
-        
         // Create gradients
         this.createGradients();
         
-        // Create group backgrounds
-        this.createGroupBackgrounds(workflow);
+        // Patch elements by node id and "from→to" instead of rebuilding the graph
+        const moved = this.reconcileNodes(workflow.nodes);
+        this.reconcileConnections(workflow.connections, moved);
         
-        // Create connections with enhanced styling
-        workflow.connections.forEach(conn => {
-            this.createEnhancedConnection(conn, workflow.nodes);
-        });
+        // Group backgrounds follow the nodes; redraw them with the connection paths
+        const groups = JSON.stringify(this.nodeGroups);
+        if (moved.size > 0 || groups !== this.groupsSignature) {
+            this.groupsSignature = groups;
+            this.backgroundsDirty = true;
+        }
+        this.scheduleLayout();
         
-        // Create nodes with enhanced features
-        workflow.nodes.forEach(nodeData => {
-            this.createEnhancedNode(nodeData);
-        });
+        // Re-apply the active search or filter to new and replaced elements
+        if (this.activeFilter !== 'all') {
+            this.filterNodes(this.activeFilter);
+        } else if (this.searchTerm) {
+            this.searchNodes(this.searchTerm);
+        }
         
         // Update metrics
         this.updateEnhancedMetrics(workflow);
     }
     
-    createGroupBackgrounds(workflow) {
+    nodeSignature(nodeData) {
+        // Everything createEnhancedNode draws except position and the timing text
+        const stats = this.nodeStats.get(nodeData.id);
+        return JSON.stringify([
+            nodeData.type, nodeData.label, nodeData.subtext,
+            this.criticalPath.includes(nodeData.id),
+            stats ? [stats.incoming, stats.outgoing, stats.complexity > 3] : null,
+            this.executionTimes.has(nodeData.id)
+        ]);
+    }
+    
+    reconcileNodes(nodes) {
+        // Returns the ids of nodes that were added, moved or removed
+        const moved = new Set();
+        const seen = new Set();
+        
+        this.nodes = nodes.map(nodeData => {
+            seen.add(nodeData.id);
+            const signature = this.nodeSignature(nodeData);
+            let entry = this.nodeIndex.get(nodeData.id);
+            
+            if (!entry) {
+                entry = this.createEnhancedNode(nodeData, signature);
+                this.nodesGroup.appendChild(entry.element);
+                this.nodeIndex.set(nodeData.id, entry);
+                moved.add(nodeData.id);
+                return entry;
+            }
+            
+            if (entry.signature !== signature) {
+                // Redraw the node, keeping its selection, running and filter state
+                const replacement = this.createEnhancedNode(nodeData, signature);
+                replacement.element.setAttribute('class', entry.element.getAttribute('class'));
+                replacement.element.style.opacity = entry.element.style.opacity;
+                this.nodesGroup.replaceChild(replacement.element, entry.element);
+                this.nodeIndex.set(nodeData.id, replacement);
+                if (this.hoveredNode && this.hoveredNode.id === nodeData.id) this.hideTooltip();
+                entry = replacement;
+            } else {
+                this.setNodePerformance(entry, nodeData.id);
+            }
+            
+            const previous = entry.data;
+            if (previous.x !== nodeData.x || previous.y !== nodeData.y) {
+                entry.element.setAttribute('transform', `translate(${nodeData.x}, ${nodeData.y})`);
+                moved.add(nodeData.id);
+            }
+            entry.data = nodeData;
+            return entry;
+        });
+        
+        this.nodeIndex.forEach((entry, id) => {
+            if (seen.has(id)) return;
+            entry.element.remove();
+            this.nodeIndex.delete(id);
+            moved.add(id);
+        });
+        
+        // Keep selection and hover pointing at the current node objects
+        if (this.selectedNode) {
+            const selected = this.nodeIndex.get(this.selectedNode.id);
+            if (selected) {
+                this.selectedNode = selected.data;
+            } else {
+                this.clearSelection();
+            }
+        }
+        if (this.hoveredNode && !this.nodeIndex.has(this.hoveredNode.id)) {
+            this.hoveredNode = null;
+            this.hideTooltip();
+        }
+        
+        return moved;
+    }
+    
+    reconcileConnections(connections, movedNodes) {
+        const seen = new Set();
+        
+        this.connections = [];
+        connections.forEach(connData => {
+            const key = `${connData.from}→${connData.to}`;
+            if (!this.nodeIndex.has(connData.from) || !this.nodeIndex.has(connData.to)) return;
+            seen.add(key);
+            
+            let entry = this.connectionIndex.get(key);
+            if (!entry) {
+                entry = this.createEnhancedConnection(connData);
+                this.connectionIndex.set(key, entry);
+                this.dirtyConnections.add(key);
+            } else if (this.connectionSignature(connData) !== entry.signature) {
+                this.styleConnection(entry, connData);
+                this.dirtyConnections.add(key);
+            }
+            entry.data = connData;
+            if (movedNodes.has(connData.from) || movedNodes.has(connData.to)) {
+                this.dirtyConnections.add(key);
+            }
+            this.connections.push(entry);
+        });
+        
+        this.connectionIndex.forEach((entry, key) => {
+            if (seen.has(key)) return;
+            entry.element.remove();
+            if (entry.label) entry.label.remove();
+            this.connectionIndex.delete(key);
+            this.dirtyConnections.delete(key);
+        });
+    }
+    
+    scheduleLayout() {
+        // Recompute dirty paths and the group backgrounds in a single frame
+        if (this.layoutFrame !== null) return;
+        if (this.dirtyConnections.size === 0 && !this.backgroundsDirty) return;
+        this.layoutFrame = requestAnimationFrame(() => {
+            this.layoutFrame = null;
+            this.dirtyConnections.forEach(key => this.layoutConnection(this.connectionIndex.get(key)));
+            this.dirtyConnections.clear();
+            if (this.backgroundsDirty) {
+                this.backgroundsDirty = false;
+                this.createGroupBackgrounds();
+            }
+        });
+    }
+    
+    createGroupBackgrounds() {
         const groupColors = {
             'validation': 'rgba(156, 39, 176, 0.05)',
             'processing': 'rgba(76, 175, 80, 0.05)',
@@ -306,10 +562,17 @@ class EnhancedWorkflowVisualizer {
             'output': 'rgba(255, 193, 7, 0.05)'
         };
         
+        // Backgrounds live in their own group behind the connections
+        if (!this.backgroundsGroup) {
+            this.backgroundsGroup = document.createElementNS('http://www.w3.org/2000/svg', 'g');
+            this.connectionsGroup.insertBefore(this.backgroundsGroup, this.connectionsGroup.firstChild);
+        }
+        this.backgroundsGroup.innerHTML = '';
+        
         Object.entries(this.nodeGroups).forEach(([groupName, nodeIds]) => {
             if (nodeIds.length === 0) return;
             
-            const nodes = nodeIds.map(id => workflow.nodes.find(n => n.id === id)).filter(Boolean);
+            const nodes = nodeIds.map(id => this.nodeIndex.get(id)).filter(Boolean).map(entry => entry.data);
             if (nodes.length === 0) return;
             
             const minX = Math.min(...nodes.map(n => n.x)) - 20;
@@ -327,16 +590,19 @@ class EnhancedWorkflowVisualizer {
             rect.setAttribute('rx', '15');
             rect.setAttribute('ry', '15');
             
-            this.connectionsGroup.appendChild(rect);
+            this.backgroundsGroup.appendChild(rect);
         });
     }
     
-    createEnhancedNode(nodeData) {
+    createEnhancedNode(nodeData, signature) {
         const group = document.createElementNS('http://www.w3.org/2000/svg', 'g');
         group.setAttribute('class', 'workflow-node enhanced');
         group.setAttribute('transform', `translate(${nodeData.x}, ${nodeData.y})`);
         group.setAttribute('data-node-id', nodeData.id);
         
+        // Handlers read entry.data so they see the node's latest version
+        const entry = { element: group, perf: null, data: nodeData, signature };
+        
         // Background rect with gradient
         const rect = document.createElementNS('http://www.w3.org/2000/svg', 'rect');
         rect.setAttribute('width', this.nodeWidth);
@@ -374,16 +640,16 @@ class EnhancedWorkflowVisualizer {
         subtext.textContent = nodeData.subtext || '';
         
         // Performance indicator
-        const execTime = this.executionTimes.get(nodeData.id);
-        if (execTime) {
+        if (this.executionTimes.has(nodeData.id)) {
             const perfText = document.createElementNS('http://www.w3.org/2000/svg', 'text');
             perfText.setAttribute('class', 'node-performance');
             perfText.setAttribute('x', this.nodeWidth / 2);
             perfText.setAttribute('y', 65);
             perfText.setAttribute('font-size', '10');
             perfText.setAttribute('fill', 'rgba(255,255,255,0.7)');
-            perfText.textContent = `~${Math.round(execTime.avg)}ms`;
             group.appendChild(perfText);
+            entry.perf = perfText;
+            this.setNodePerformance(entry, nodeData.id);
         }
         
         // Connection count badges
@@ -406,12 +672,25 @@ class EnhancedWorkflowVisualizer {
         group.appendChild(subtext);
         
         // Event handlers
-        group.addEventListener('click', () => this.selectNode(nodeData));
-        group.addEventListener('mouseenter', (e) => this.showTooltip(e, nodeData));
-        group.addEventListener('mouseleave', () => this.hideTooltip());
+        group.addEventListener('click', () => this.selectNode(entry.data));
+        group.addEventListener('mouseenter', (e) => {
+            this.hoveredNode = entry.data;
+            this.showTooltip(e, entry.data);
+        });
+        group.addEventListener('mouseleave', () => {
+            this.hoveredNode = null;
+            this.hideTooltip();
+        });
         
-        this.nodesGroup.appendChild(group);
-        this.nodes.push({ element: group, data: nodeData });
+        return entry;
+    }
+    
+    setNodePerformance(entry, nodeId) {
+        const execTime = this.executionTimes.get(nodeId);
+        if (!entry.perf || !execTime) return;
+        const prefix = this.measuredTimes.has(nodeId) ? '' : '~';
+        const text = `${prefix}${Math.round(execTime.avg)}ms`;
+        if (entry.perf.textContent !== text) entry.perf.textContent = text;
     }
     
     createBadge(x, y, count, color) {
@@ -438,14 +717,27 @@ class EnhancedWorkflowVisualizer {
         return g;
     }
     
-    createEnhancedConnection(connData, nodes) {
-        const fromNode = nodes.find(n => n.id === connData.from);
-        const toNode = nodes.find(n => n.id === connData.to);
-        
-        if (!fromNode || !toNode) return;
-        
+    createEnhancedConnection(connData) {
+        // The path's shape is filled in by layoutConnection on the next frame
         const path = document.createElementNS('http://www.w3.org/2000/svg', 'path');
+        path.setAttribute('marker-end', 'url(#arrowhead)');
+        
+        const entry = { element: path, label: null, data: connData, signature: null };
+        this.connectionsGroup.appendChild(path);
+        this.styleConnection(entry, connData);
+        return entry;
+    }
+    
+    connectionSignature(connData) {
+        const onCriticalPath = this.criticalPath.includes(connData.from) && 
+                               this.criticalPath.includes(connData.to);
+        return `${onCriticalPath}:${connData.label || ''}`;
+    }
+    
+    styleConnection(entry, connData) {
+        const path = entry.element;
         path.setAttribute('class', 'flow-line enhanced');
+        entry.signature = this.connectionSignature(connData);
         
         // Check if this connection is on the critical path
         const onCriticalPath = this.criticalPath.includes(connData.from) && 
@@ -455,26 +747,20 @@ class EnhancedWorkflowVisualizer {
             path.classList.add('critical-path');
         }
         
-        const x1 = fromNode.x + this.nodeWidth;
-        const y1 = fromNode.y + this.nodeHeight / 2;
-        const x2 = toNode.x;
-        const y2 = toNode.y + this.nodeHeight / 2;
-        
-        const midX = (x1 + x2) / 2;
-        const d = `M ${x1} ${y1} Q ${midX} ${y1} ${midX} ${(y1 + y2) / 2} T ${x2} ${y2}`;
-        path.setAttribute('d', d);
-        path.setAttribute('marker-end', 'url(#arrowhead)');
+        if (entry.label) {
+            entry.label.remove();
+            entry.label = null;
+        }
         
         if (connData.label) {
             const labelText = document.createElementNS('http://www.w3.org/2000/svg', 'text');
-            labelText.setAttribute('x', midX);
-            labelText.setAttribute('y', (y1 + y2) / 2 - 10);
             labelText.setAttribute('text-anchor', 'middle');
             labelText.setAttribute('font-size', '12');
             labelText.setAttribute('font-weight', 'bold');
             labelText.setAttribute('fill', connData.label === 'Yes' ? '#4CAF50' : '#f44336');
             labelText.textContent = connData.label;
-            this.connectionsGroup.appendChild(labelText);
+            this.connectionsGroup.insertBefore(labelText, path);
+            entry.label = labelText;
             
             if (connData.label === 'Yes') {
                 path.classList.add('decision-yes');
@@ -482,9 +768,26 @@ class EnhancedWorkflowVisualizer {
                 path.classList.add('decision-no');
             }
         }
+    }
+    
+    layoutConnection(entry) {
+        if (!entry) return;
+        const fromNode = this.nodeIndex.get(entry.data.from).data;
+        const toNode = this.nodeIndex.get(entry.data.to).data;
         
-        this.connectionsGroup.appendChild(path);
-        this.connections.push({ element: path, data: connData });
+        const x1 = fromNode.x + this.nodeWidth;
+        const y1 = fromNode.y + this.nodeHeight / 2;
+        const x2 = toNode.x;
+        const y2 = toNode.y + this.nodeHeight / 2;
+        
+        const midX = (x1 + x2) / 2;
+        const d = `M ${x1} ${y1} Q ${midX} ${y1} ${midX} ${(y1 + y2) / 2} T ${x2} ${y2}`;
+        entry.element.setAttribute('d', d);
+        
+        if (entry.label) {
+            entry.label.setAttribute('x', midX);
+            entry.label.setAttribute('y', (y1 + y2) / 2 - 10);
+        }
     }
     
     searchNodes(term) {
@@ -507,8 +810,8 @@ class EnhancedWorkflowVisualizer {
         
         // Update connections visibility
         this.connections.forEach(conn => {
-            const fromNode = this.nodes.find(n => n.data.id === conn.data.from);
-            const toNode = this.nodes.find(n => n.data.id === conn.data.to);
+            const fromNode = this.nodeIndex.get(conn.data.from);
+            const toNode = this.nodeIndex.get(conn.data.to);
             
             if (fromNode && toNode && 
                 !fromNode.element.classList.contains('dimmed') && 
@@ -521,6 +824,7 @@ class EnhancedWorkflowVisualizer {
     }
     
     filterNodes(type) {
+        this.activeFilter = type;
         if (type === 'all') {
             this.nodes.forEach(node => {
                 node.element.style.opacity = '1';
@@ -549,8 +853,8 @@ class EnhancedWorkflowVisualizer {
         
         // Update connections
         this.connections.forEach(conn => {
-            const fromNode = this.nodes.find(n => n.data.id === conn.data.from);
-            const toNode = this.nodes.find(n => n.data.id === conn.data.to);
+            const fromNode = this.nodeIndex.get(conn.data.from);
+            const toNode = this.nodeIndex.get(conn.data.to);
             
             if (fromNode && toNode && 
                 !fromNode.element.classList.contains('filtered') && 
@@ -674,11 +978,53 @@ class EnhancedWorkflowVisualizer {
             
             overlay.innerHTML = html;
             overlay.style.display = 'flex';
+            this.renderPercentiles(overlay);
         } else {
             overlay.style.display = 'none';
         }
     }
     
+    async renderPercentiles(overlay) {
+        // Rolling latency percentiles from traced runs (server.py only)
+        let stats;
+        try {
+            const response = await fetch('/trace-stats?window=300', { cache: 'no-store' });
+            if (!response.ok) return;
+            stats = await response.json();
+        } catch (error) {
+            return;
+        }
+        
+        const entries = Object.entries(stats.nodes).sort((a, b) => b[1].p95 - a[1].p95);
+        if (entries.length === 0 || overlay.style.display === 'none') return;
+        
+        // Built with text nodes: ids in the trace store arrive over the network
+        const section = document.createElement('div');
+        section.className = 'perf-percentiles';
+        const heading = document.createElement('h4');
+        heading.textContent = `Measured latency (last ${Math.round(stats.window / 60)} min, ms):`;
+        const table = document.createElement('table');
+        const addRow = (cellTag, values) => {
+            const row = document.createElement('tr');
+            values.forEach(value => {
+                const cell = document.createElement(cellTag);
+                cell.textContent = value;
+                row.appendChild(cell);
+            });
+            table.appendChild(row);
+        };
+        addRow('th', ['Node', 'p50', 'p95', 'p99', 'Runs']);
+        entries.forEach(([nodeId, p]) => {
+            const entry = this.nodeIndex.get(nodeId);
+            addRow('td', [entry ? entry.data.label : nodeId,
+                Math.round(p.p50), Math.round(p.p95), Math.round(p.p99), p.count]);
+        });
+        section.appendChild(heading);
+        section.appendChild(table);
+        const summary = overlay.querySelector('.performance-summary');
+        summary.insertBefore(section, summary.querySelector('button'));
+    }
+    
     navigateNodes(direction) {
         // Implementation for keyboard navigation between nodes
         const currentIndex = this.nodes.findIndex(n => n.data.id === this.selectedNode.id);
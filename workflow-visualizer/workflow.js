@@ -1,4 +1,12 @@
 // Workflow Visualization Engine
+
+// Node labels and details come from the parsed script; escape them before building HTML
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
 class WorkflowVisualizer {
     constructor() {
         this.canvas = document.getElementById('workflow-canvas');
@@ -11,12 +19,24 @@ class WorkflowVisualizer {
         this.selectedNode = null;
         this.hoveredNode = null;
         
+        // Rendered elements keyed by node id and "from→to", patched in place on updates
+        this.nodeIndex = new Map();
+        this.connectionIndex = new Map();
+        this.workflowSignature = null;
+        this.dirtyConnections = new Set();
+        this.layoutFrame = null;
+        
         this.nodeWidth = 180;
         this.nodeHeight = 60;
         this.nodeSpacing = { x: 250, y: 120 };
         
         this.ws = null;
+        this.workflowData = null;
+        this.workflowEpoch = null;
+        this.workflowVersion = null;
         this.floatingDetail = null;
+        // Node id -> promise of its /nodes/{id} detail document
+        this.nodeDetailsCache = new Map();
         this.isDragging = false;
         this.dragStart = { x: 0, y: 0 };
         this.canvasOffset = { x: 0, y: 0 };
@@ -96,17 +116,17 @@ class WorkflowVisualizer {
     }
     
     showFloatingDetail(nodeData, x, y) {
-        let html = `<div class="floating-detail-header">${nodeData.label}</div>`;
+        let html = `<div class="floating-detail-header">${escapeHtml(nodeData.label)}</div>`;
         html += `<div class="floating-detail-content">`;
         
         if (nodeData.details) {
-            html += `<p>${nodeData.details.description}</p>`;
+            html += `<p>${escapeHtml(nodeData.details.description)}</p>`;
             
             if (nodeData.details.fixes) {
                 html += `<strong>Fixes Applied:</strong>`;
                 html += `<ul class="floating-detail-list">`;
                 nodeData.details.fixes.forEach(fix => {
-                    html += `<li>${fix}</li>`;
+                    html += `<li>${escapeHtml(fix)}</li>`;
                 });
                 html += `</ul>`;
             }
@@ -115,7 +135,7 @@ class WorkflowVisualizer {
                 html += `<strong>Features:</strong>`;
                 html += `<ul class="floating-detail-list">`;
                 nodeData.details.features.forEach(feature => {
-                    html += `<li>${feature}</li>`;
+                    html += `<li>${escapeHtml(feature)}</li>`;
                 });
                 html += `</ul>`;
             }
@@ -124,20 +144,20 @@ class WorkflowVisualizer {
                 html += `<strong>Patterns:</strong>`;
                 html += `<ul class="floating-detail-list">`;
                 nodeData.details.patterns.forEach(pattern => {
-                    html += `<li>"${pattern}"</li>`;
+                    html += `<li>"${escapeHtml(pattern)}"</li>`;
                 });
                 html += `</ul>`;
             }
             
             if (nodeData.details.metrics) {
-                html += `<p><strong>Target:</strong> ${nodeData.details.metrics}</p>`;
+                html += `<p><strong>Target:</strong> ${escapeHtml(nodeData.details.metrics)}</p>`;
             }
             
             if (nodeData.details.api) {
-                html += `<p><strong>API:</strong> ${nodeData.details.api}</p>`;
+                html += `<p><strong>API:</strong> ${escapeHtml(nodeData.details.api)}</p>`;
             }
         } else {
-            html += `<p>${nodeData.subtext || 'Processing node'}</p>`;
+            html += `<p>${escapeHtml(nodeData.subtext || 'Processing node')}</p>`;
         }
         
         html += `</div>`;
@@ -206,10 +226,18 @@ class WorkflowVisualizer {
     
     initWebSocket() {
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const wsUrl = `${protocol}//localhost:8002/ws`;
+        let wsUrl = `${protocol}//localhost:8002/ws`;
+        
+        // Report the last-seen version so the server can reply with a delta
+        if (this.workflowEpoch && this.workflowVersion !== null) {
+            wsUrl += `?epoch=${encodeURIComponent(this.workflowEpoch)}&version=${this.workflowVersion}`;
+        }
         
         try {
             this.ws = new WebSocket(wsUrl);
+            // Workflow messages arrive as UTF-8 encoded binary frames
+            this.ws.binaryType = 'arraybuffer';
+            this.textDecoder = this.textDecoder || new TextDecoder();
             
             this.ws.onopen = () => {
                 console.log('WebSocket connected');
@@ -217,10 +245,26 @@ class WorkflowVisualizer {
             };
             
             this.ws.onmessage = (event) => {
-                const data = JSON.parse(event.data);
-                if (data.type === 'workflow_update') {
+                if (event.data === 'pong') return;
+                
+                const text = typeof event.data === 'string' ? event.data : this.textDecoder.decode(event.data);
+                const data = JSON.parse(text);
+                if (data.type === 'resync') {
+                    // Server dropped our backlog; fetch the full workflow
+                    this.ws.send('resync');
+                } else if (data.type === 'workflow_update') {
+                    this.setWorkflowVersion(data);
                     this.updateWorkflow(data.workflow);
                     this.updateLastUpdated();
+                } else if (data.type === 'workflow_delta') {
+                    if (!this.workflowData || data.epoch !== this.workflowEpoch || data.base !== this.workflowVersion) {
+                        // Missed a version; ask for the full document
+                        this.ws.send('resync');
+                        return;
+                    }
+                    this.setWorkflowVersion(data);
+                    this.updateWorkflow(this.applyDelta(this.workflowData, data.delta));
+                    this.updateLastUpdated();
                 }
             };
             
@@ -241,6 +285,37 @@ class WorkflowVisualizer {
         }
     }
     
+    setWorkflowVersion(message) {
+        this.workflowEpoch = message.epoch || null;
+        this.workflowVersion = message.version !== undefined ? message.version : null;
+    }
+    
+    applyDelta(workflow, delta) {
+        const connectionKey = (from, to) => `${from}→${to}`;
+        
+        const removedNodes = new Set(delta.nodes.remove);
+        const nodes = new Map();
+        workflow.nodes.forEach(node => {
+            if (!removedNodes.has(node.id)) nodes.set(node.id, node);
+        });
+        delta.nodes.upsert.forEach(node => nodes.set(node.id, node));
+        
+        const removedConnections = new Set(delta.connections.remove.map(([from, to]) => connectionKey(from, to)));
+        const connections = new Map();
+        workflow.connections.forEach(conn => {
+            const key = connectionKey(conn.from, conn.to);
+            if (!removedConnections.has(key)) connections.set(key, conn);
+        });
+        delta.connections.upsert.forEach(conn => connections.set(connectionKey(conn.from, conn.to), conn));
+        
+        return {
+            ...workflow,
+            ...(delta.set || {}),
+            nodes: Array.from(nodes.values()),
+            connections: Array.from(connections.values())
+        };
+    }
+    
     updateConnectionStatus(connected) {
         const indicator = document.getElementById('connection-status');
         if (connected) {
@@ -301,24 +376,142 @@ class WorkflowVisualizer {
     }
     
     updateWorkflow(workflow) {
-        // Clear existing elements
-        this.nodesGroup.innerHTML = '';
-        this.connectionsGroup.innerHTML = '';
-        this.nodes = [];
+        // Broadcasts often repeat the current document; leave the DOM (and hover state) alone
+        const signature = JSON.stringify(workflow);
+        if (signature === this.workflowSignature) return;
+        this.workflowSignature = signature;
+        
+        this.workflowData = workflow;
+        this.nodeDetailsCache.clear();
+        
+        // Patch elements by node id and "from→to" instead of rebuilding the graph
+        const moved = this.reconcileNodes(workflow.nodes);
+        this.reconcileConnections(workflow.connections, moved);
+        
+        // Update metrics
+        this.updateMetrics(workflow);
+    }
+    
+    reconcileNodes(nodes) {
+        // Returns the ids of nodes that were added or moved
+        const moved = new Set();
+        const seen = new Set();
+        
+        this.nodes = nodes.map(nodeData => {
+            seen.add(nodeData.id);
+            let entry = this.nodeIndex.get(nodeData.id);
+            if (!entry) {
+                entry = this.createNode(nodeData);
+                this.nodeIndex.set(nodeData.id, entry);
+                moved.add(nodeData.id);
+                return entry;
+            }
+            
+            const previous = entry.data;
+            if (previous.x !== nodeData.x || previous.y !== nodeData.y) {
+                entry.element.setAttribute('transform', `translate(${nodeData.x}, ${nodeData.y})`);
+                moved.add(nodeData.id);
+            }
+            if (previous.type !== nodeData.type) {
+                entry.rect.setAttribute('class', `node-rect ${nodeData.type}`);
+            }
+            if (previous.label !== nodeData.label) {
+                entry.text.textContent = nodeData.label;
+            }
+            if (previous.subtext !== nodeData.subtext) {
+                entry.subtext.textContent = nodeData.subtext || '';
+            }
+            entry.data = nodeData;
+            return entry;
+        });
+        
+        this.nodeIndex.forEach((entry, id) => {
+            if (seen.has(id)) return;
+            entry.element.remove();
+            this.nodeIndex.delete(id);
+        });
+        
+        // Keep selection and hover pointing at the current node objects
+        if (this.selectedNode) {
+            const selected = this.nodeIndex.get(this.selectedNode.id);
+            this.selectedNode = selected ? selected.data : null;
+        }
+        if (this.hoveredNode && !this.nodeIndex.has(this.hoveredNode.id)) {
+            this.hoveredNode = null;
+            this.hideFloatingDetail();
+        }
+        
+        return moved;
+    }
+    
+    reconcileConnections(connections, movedNodes) {
+        const seen = new Set();
+        
         this.connections = [];
+        connections.forEach(connData => {
+            const key = `${connData.from}→${connData.to}`;
+            if (!this.nodeIndex.has(connData.from) || !this.nodeIndex.has(connData.to)) return;
+            seen.add(key);
+            
+            let entry = this.connectionIndex.get(key);
+            if (!entry) {
+                entry = this.createConnection(connData);
+                this.connectionIndex.set(key, entry);
+                this.dirtyConnections.add(key);
+            } else {
+                if (entry.data.label !== connData.label) {
+                    this.setConnectionLabel(entry, connData.label);
+                    this.dirtyConnections.add(key);
+                }
+                entry.data = connData;
+            }
+            if (movedNodes.has(connData.from) || movedNodes.has(connData.to)) {
+                this.dirtyConnections.add(key);
+            }
+            this.connections.push(entry);
+        });
         
-        // Create connections first (so they appear behind nodes)
-        workflow.connections.forEach(conn => {
-            this.createConnection(conn, workflow.nodes);
+        this.connectionIndex.forEach((entry, key) => {
+            if (seen.has(key)) return;
+            entry.element.remove();
+            if (entry.label) entry.label.remove();
+            this.connectionIndex.delete(key);
+            this.dirtyConnections.delete(key);
         });
         
-        // Create nodes
-        workflow.nodes.forEach(nodeData => {
-            this.createNode(nodeData);
+        this.scheduleConnectionLayout();
+    }
+    
+    scheduleConnectionLayout() {
+        // Recompute every dirty path in a single frame
+        if (this.layoutFrame !== null || this.dirtyConnections.size === 0) return;
+        this.layoutFrame = requestAnimationFrame(() => {
+            this.layoutFrame = null;
+            this.dirtyConnections.forEach(key => this.layoutConnection(this.connectionIndex.get(key)));
+            this.dirtyConnections.clear();
         });
+    }
+    
+    layoutConnection(entry) {
+        if (!entry) return;
+        const fromNode = this.nodeIndex.get(entry.data.from).data;
+        const toNode = this.nodeIndex.get(entry.data.to).data;
         
-        // Update metrics
-        this.updateMetrics(workflow);
+        // Calculate connection points
+        const x1 = fromNode.x + this.nodeWidth;
+        const y1 = fromNode.y + this.nodeHeight / 2;
+        const x2 = toNode.x;
+        const y2 = toNode.y + this.nodeHeight / 2;
+        
+        // Create curved path
+        const midX = (x1 + x2) / 2;
+        const d = `M ${x1} ${y1} Q ${midX} ${y1} ${midX} ${(y1 + y2) / 2} T ${x2} ${y2}`;
+        entry.element.setAttribute('d', d);
+        
+        if (entry.label) {
+            entry.label.setAttribute('x', midX);
+            entry.label.setAttribute('y', (y1 + y2) / 2 - 10);
+        }
     }
     
     createNode(nodeData) {
@@ -353,14 +546,22 @@ class WorkflowVisualizer {
         group.appendChild(text);
         group.appendChild(subtext);
         
+        // Handlers read entry.data so they see the node's latest version
+        const entry = { element: group, rect, text, subtext, data: nodeData };
+        
         // Add interaction handlers
-        group.addEventListener('click', () => this.selectNode(nodeData));
+        group.addEventListener('click', () => this.selectNode(entry.data));
         
         group.addEventListener('mouseenter', () => {
+            const nodeData = entry.data;
             this.hoveredNode = nodeData;
             const rect = group.getBoundingClientRect();
             const containerRect = document.querySelector('.workflow-container').getBoundingClientRect();
-            this.showFloatingDetail(nodeData, rect.left - containerRect.left, rect.top - containerRect.top);
+            this.withDetails(nodeData).then(data => {
+                if (this.hoveredNode === nodeData) {
+                    this.showFloatingDetail(data, rect.left - containerRect.left, rect.top - containerRect.top);
+                }
+            });
         });
         
         group.addEventListener('mouseleave', () => {
@@ -369,49 +570,41 @@ class WorkflowVisualizer {
         });
         
         this.nodesGroup.appendChild(group);
-        this.nodes.push({ element: group, data: nodeData });
+        return entry;
     }
     
-    createConnection(connData, nodes) {
-        const fromNode = nodes.find(n => n.id === connData.from);
-        const toNode = nodes.find(n => n.id === connData.to);
-        
-        if (!fromNode || !toNode) return;
-        
+    createConnection(connData) {
+        // The path's shape is filled in by layoutConnection on the next frame
         const path = document.createElementNS('http://www.w3.org/2000/svg', 'path');
         path.setAttribute('class', 'flow-line');
         
-        // Calculate connection points
-        const x1 = fromNode.x + this.nodeWidth;
-        const y1 = fromNode.y + this.nodeHeight / 2;
-        const x2 = toNode.x;
-        const y2 = toNode.y + this.nodeHeight / 2;
-        
-        // Create curved path
-        const midX = (x1 + x2) / 2;
-        const d = `M ${x1} ${y1} Q ${midX} ${y1} ${midX} ${(y1 + y2) / 2} T ${x2} ${y2}`;
-        path.setAttribute('d', d);
-        
-        // Add label if present
-        if (connData.label) {
-            const labelText = document.createElementNS('http://www.w3.org/2000/svg', 'text');
-            labelText.setAttribute('x', midX);
-            labelText.setAttribute('y', (y1 + y2) / 2 - 10);
-            labelText.setAttribute('text-anchor', 'middle');
-            labelText.setAttribute('font-size', '12');
-            labelText.setAttribute('fill', connData.label === 'Yes' ? '#4CAF50' : '#f44336');
-            labelText.textContent = connData.label;
-            this.connectionsGroup.appendChild(labelText);
-            
-            if (connData.label === 'Yes') {
-                path.classList.add('decision-yes');
-            } else if (connData.label === 'No') {
-                path.classList.add('decision-no');
-            }
-        }
-        
+        const entry = { element: path, label: null, data: connData };
+        this.setConnectionLabel(entry, connData.label);
         this.connectionsGroup.appendChild(path);
-        this.connections.push({ element: path, data: connData });
+        return entry;
+    }
+    
+    setConnectionLabel(entry, label) {
+        if (entry.label) {
+            entry.label.remove();
+            entry.label = null;
+        }
+        entry.element.classList.remove('decision-yes', 'decision-no');
+        if (!label) return;
+        
+        const labelText = document.createElementNS('http://www.w3.org/2000/svg', 'text');
+        labelText.setAttribute('text-anchor', 'middle');
+        labelText.setAttribute('font-size', '12');
+        labelText.setAttribute('fill', label === 'Yes' ? '#4CAF50' : '#f44336');
+        labelText.textContent = label;
+        this.connectionsGroup.insertBefore(labelText, entry.element.parentNode ? entry.element : null);
+        entry.label = labelText;
+        
+        if (label === 'Yes') {
+            entry.element.classList.add('decision-yes');
+        } else if (label === 'No') {
+            entry.element.classList.add('decision-no');
+        }
     }
     
     selectNode(nodeData) {
@@ -426,7 +619,22 @@ class WorkflowVisualizer {
         }
         
         this.selectedNode = nodeData;
-        this.showNodeDetails(nodeData);
+        // Revalidate on click so a detail-only change shows up (304 when unchanged)
+        this.withDetails(nodeData, true).then(data => {
+            if (this.selectedNode === nodeData) {
+                this.showNodeDetails(data);
+            }
+        });
+    }
+    
+    withDetails(nodeData, refresh = false) {
+        // The workflow carries only topology; details come from /nodes/{id}
+        if (refresh || !this.nodeDetailsCache.has(nodeData.id)) {
+            this.nodeDetailsCache.set(nodeData.id, fetch(`/nodes/${encodeURIComponent(nodeData.id)}`)
+                .then(response => response.ok ? response.json() : {})
+                .catch(() => ({})));
+        }
+        return this.nodeDetailsCache.get(nodeData.id).then(details => ({ ...nodeData, ...details }));
     }
     
     showNodeDetails(nodeData) {
@@ -434,12 +642,12 @@ class WorkflowVisualizer {
         if (nodeData.details) {
             let html = `
                 <div class="detail-section">
-                    <div class="detail-label">Node: ${nodeData.label}</div>
-                    <div class="detail-value">${nodeData.subtext || ''}</div>
+                    <div class="detail-label">Node: ${escapeHtml(nodeData.label)}</div>
+                    <div class="detail-value">${escapeHtml(nodeData.subtext)}</div>
                 </div>
                 <div class="detail-section">
-                    <div class="detail-label">Type: ${nodeData.type.toUpperCase()}</div>
-                    <div class="detail-value">${nodeData.details.description}</div>
+                    <div class="detail-label">Type: ${escapeHtml(nodeData.type.toUpperCase())}</div>
+                    <div class="detail-value">${escapeHtml(nodeData.details.description)}</div>
                 </div>
             `;
             
@@ -449,7 +657,7 @@ class WorkflowVisualizer {
                     <div class="detail-section">
                         <div class="detail-label">Fixes Applied:</div>
                         <ul class="detail-list">
-                            ${nodeData.details.fixes.map(f => `<li>${f}</li>`).join('')}
+                            ${nodeData.details.fixes.map(f => `<li>${escapeHtml(f)}</li>`).join('')}
                         </ul>
                     </div>
                 `;
@@ -460,7 +668,7 @@ class WorkflowVisualizer {
                     <div class="detail-section">
                         <div class="detail-label">Features:</div>
                         <ul class="detail-list">
-                            ${nodeData.details.features.map(f => `<li>${f}</li>`).join('')}
+                            ${nodeData.details.features.map(f => `<li>${escapeHtml(f)}</li>`).join('')}
                         </ul>
                     </div>
                 `;
@@ -471,7 +679,7 @@ class WorkflowVisualizer {
                     <div class="detail-section">
                         <div class="detail-label">Patterns Detected:</div>
                         <ul class="detail-list">
-                            ${nodeData.details.patterns.map(p => `<li>"${p}"</li>`).join('')}
+                            ${nodeData.details.patterns.map(p => `<li>"${escapeHtml(p)}"</li>`).join('')}
                         </ul>
                     </div>
                 `;
@@ -481,7 +689,7 @@ class WorkflowVisualizer {
                 html += `
                     <div class="detail-section">
                         <div class="detail-label">Target Metrics:</div>
-                        <div class="detail-value">${nodeData.details.metrics}</div>
+                        <div class="detail-value">${escapeHtml(nodeData.details.metrics)}</div>
                     </div>
                 `;
             }
@@ -490,7 +698,7 @@ class WorkflowVisualizer {
                 html += `
                     <div class="detail-section">
                         <div class="detail-label">Threshold:</div>
-                        <div class="detail-value">${nodeData.details.threshold}</div>
+                        <div class="detail-value">${escapeHtml(nodeData.details.threshold)}</div>
                     </div>
                 `;
             }
@@ -500,7 +708,7 @@ class WorkflowVisualizer {
                     <div class="detail-section">
                         <div class="detail-label">Data Sources:</div>
                         <ul class="detail-list">
-                            ${nodeData.details.sources.map(s => `<li>${s}</li>`).join('')}
+                            ${nodeData.details.sources.map(s => `<li>${escapeHtml(s)}</li>`).join('')}
                         </ul>
                     </div>
                 `;
@@ -510,7 +718,7 @@ class WorkflowVisualizer {
                 html += `
                     <div class="detail-section">
                         <div class="detail-label">API:</div>
-                        <div class="detail-value">${nodeData.details.api}</div>
+                        <div class="detail-value">${escapeHtml(nodeData.details.api)}</div>
                     </div>
                 `;
             }
@@ -519,7 +727,7 @@ class WorkflowVisualizer {
                 html += `
                     <div class="detail-section">
                         <div class="detail-label">Format:</div>
-                        <div class="detail-value">${nodeData.details.format}</div>
+                        <div class="detail-value">${escapeHtml(nodeData.details.format)}</div>
                     </div>
                 `;
             }
@@ -577,11 +785,11 @@ class WorkflowVisualizer {
         
         let html = `
             <div class="detail-section">
-                <div class="detail-label">Node: ${nodeData.label}</div>
-                <div class="detail-value">${nodeData.subtext || ''}</div>
+                <div class="detail-label">Node: ${escapeHtml(nodeData.label)}</div>
+                <div class="detail-value">${escapeHtml(nodeData.subtext)}</div>
             </div>
             <div class="detail-section">
-                <div class="detail-label">Type: ${nodeData.type.toUpperCase()}</div>
+                <div class="detail-label">Type: ${escapeHtml(nodeData.type.toUpperCase())}</div>
                 <div class="detail-value">${typeDetails.description}</div>
             </div>
         `;
@@ -742,7 +950,7 @@ class VoiceAssistant {
                 
                 Optimization: O(n) chunk processing, parallel validation, memoized checklist parsing. WebSocket server: FastAPI/Uvicorn, file watcher via watchdog, message passing through JSON-RPC.
                 
-                Graph properties: Topological ordering ensures dependency resolution. Critical path analysis identifies optimization bottlenecks. Node positioning via force-directed layout algorithm.
+                Graph properties: Topological ordering ensures dependency resolution. Critical path analysis identifies optimization bottlenecks. Node positions come from a layered (Sugiyama) layout computed on the server.
                 
                 Real-time updates: inotify/FSEvents monitoring, differential updates, 100ms debounce. Client-side rendering: SVG, D3-inspired transitions, 60fps animation targets.`;
                 break;
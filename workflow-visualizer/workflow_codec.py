@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Workflow Codec - Compact binary encoding for streams of parsed workflows
+
+A stream is a sequence of MessagePack objects. Workflows repeat the same
+few strings over and over (map keys, node types, labels, ids in
+connections), so those are interned: the first occurrence in a stream is
+written once as an ext object that defines it, and every later one as a
+1-4 byte reference to its index. Any MessagePack reader can walk the
+stream (the interned strings surface as ext objects); ``decode_stream``
+resolves them back to plain dicts and lists.
+
+Ext type 1 defines the next interned string (UTF-8 payload); ext type 2
+refers to one by index (big-endian unsigned, 1, 2 or 4 bytes). Only the
+standard library is needed.
+"""
+
+import struct
+from typing import BinaryIO, Dict, Iterator, List, Any, Optional
+
+# Values of these fields are interned along with every map key
+INTERNED_FIELDS = frozenset(("type", "label", "subtext", "id", "from", "to", "status"))
+
+EXT_DEFINE = 1
+EXT_REFERENCE = 2
+
+_FLOAT = struct.Struct(">d")
+
+
+class WorkflowEncoder:
+    """Encodes objects into one stream, remembering the strings it has interned"""
+
+    def __init__(self):
+        self._interned: Dict[str, int] = {}
+
+    def encode(self, obj: Any) -> bytes:
+        out = bytearray()
+        self._pack(obj, out)
+        return bytes(out)
+
+    def _pack(self, obj: Any, out: bytearray, intern: bool = False) -> None:
+        if obj is None:
+            out.append(0xC0)
+        elif obj is True:
+            out.append(0xC3)
+        elif obj is False:
+            out.append(0xC2)
+        elif isinstance(obj, int):
+            _pack_int(obj, out)
+        elif isinstance(obj, float):
+            out.append(0xCB)
+            out += _FLOAT.pack(obj)
+        elif isinstance(obj, str):
+            if intern:
+                self._pack_interned(obj, out)
+            else:
+                _pack_str(obj, out)
+        elif isinstance(obj, (bytes, bytearray)):
+            _pack_header(len(obj), out, None, 0, 0xC4, 0xC5, 0xC6)
+            out += obj
+        elif isinstance(obj, (list, tuple)):
+            _pack_header(len(obj), out, 0x90, 16, None, 0xDC, 0xDD)
+            for item in obj:
+                self._pack(item, out)
+        elif isinstance(obj, dict):
+            _pack_header(len(obj), out, 0x80, 16, None, 0xDE, 0xDF)
+            for key, value in obj.items():
+                self._pack(key, out, intern=True)
+                self._pack(value, out, intern=key in INTERNED_FIELDS)
+        else:
+            raise TypeError(f"Cannot encode {type(obj).__name__}")
+
+    def _pack_interned(self, text: str, out: bytearray) -> None:
+        index = self._interned.get(text)
+        if index is None:
+            self._interned[text] = len(self._interned)
+            data = text.encode("utf-8")
+            _pack_ext(EXT_DEFINE, data, out)
+        elif index < 0x100:
+            _pack_ext(EXT_REFERENCE, bytes((index,)), out)
+        elif index < 0x10000:
+            _pack_ext(EXT_REFERENCE, index.to_bytes(2, "big"), out)
+        else:
+            _pack_ext(EXT_REFERENCE, index.to_bytes(4, "big"), out)
+
+
+def _pack_int(value: int, out: bytearray) -> None:
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -0x20 <= value < 0:
+        out.append(value & 0xFF)
+    elif value >= 0:
+        for code, size in ((0xCC, 1), (0xCD, 2), (0xCE, 4), (0xCF, 8)):
+            if value < 1 << (8 * size):
+                out.append(code)
+                out += value.to_bytes(size, "big")
+                return
+        raise OverflowError("Integer too large to encode")
+    else:
+        for code, size in ((0xD0, 1), (0xD1, 2), (0xD2, 4), (0xD3, 8)):
+            if value >= -(1 << (8 * size - 1)):
+                out.append(code)
+                out += value.to_bytes(size, "big", signed=True)
+                return
+        raise OverflowError("Integer too large to encode")
+
+
+def _pack_str(text: str, out: bytearray) -> None:
+    data = text.encode("utf-8")
+    _pack_header(len(data), out, 0xA0, 32, 0xD9, 0xDA, 0xDB)
+    out += data
+
+
+def _pack_header(length: int, out: bytearray, fix: Optional[int], fix_limit: int,
+                 code8: Optional[int], code16: int, code32: int) -> None:
+    """Length prefix for a str/bin/array/map, using the smallest form available"""
+    if fix is not None and length < fix_limit:
+        out.append(fix | length)
+    elif code8 is not None and length < 0x100:
+        out.append(code8)
+        out.append(length)
+    elif length < 0x10000:
+        out.append(code16)
+        out += length.to_bytes(2, "big")
+    else:
+        out.append(code32)
+        out += length.to_bytes(4, "big")
+
+
+def _pack_ext(code: int, data: bytes, out: bytearray) -> None:
+    fixed = {1: 0xD4, 2: 0xD5, 4: 0xD6, 8: 0xD7, 16: 0xD8}.get(len(data))
+    if fixed is not None:
+        out.append(fixed)
+    elif len(data) < 0x100:
+        out += bytes((0xC7, len(data)))
+    elif len(data) < 0x10000:
+        out.append(0xC8)
+        out += len(data).to_bytes(2, "big")
+    else:
+        out.append(0xC9)
+        out += len(data).to_bytes(4, "big")
+    out.append(code)
+    out += data
+
+
+class _Reader:
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.interned: List[str] = []
+
+    def read(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        if len(data) != size:
+            raise EOFError("Truncated workflow stream")
+        return data
+
+    def uint(self, size: int) -> int:
+        return int.from_bytes(self.read(size), "big")
+
+    def unpack(self) -> Any:
+        return self.value(self.read(1)[0])
+
+    def value(self, code: int) -> Any:
+        """The object whose type byte ``code`` has just been read"""
+        if code < 0x80:
+            return code
+        if code >= 0xE0:
+            return code - 0x100
+        if 0x80 <= code <= 0x8F:
+            return self.map(code & 0x0F)
+        if 0x90 <= code <= 0x9F:
+            return [self.unpack() for _ in range(code & 0x0F)]
+        if 0xA0 <= code <= 0xBF:
+            return self.read(code & 0x1F).decode("utf-8")
+        if code == 0xC0:
+            return None
+        if code in (0xC2, 0xC3):
+            return code == 0xC3
+        if code in (0xC4, 0xC5, 0xC6):
+            return self.read(self.uint(1 << (code - 0xC4)))
+        if code in (0xC7, 0xC8, 0xC9):
+            return self.ext(self.uint(1 << (code - 0xC7)))
+        if code == 0xCA:
+            return struct.unpack(">f", self.read(4))[0]
+        if code == 0xCB:
+            return _FLOAT.unpack(self.read(8))[0]
+        if 0xCC <= code <= 0xCF:
+            return self.uint(1 << (code - 0xCC))
+        if 0xD0 <= code <= 0xD3:
+            return int.from_bytes(self.read(1 << (code - 0xD0)), "big", signed=True)
+        if 0xD4 <= code <= 0xD8:
+            return self.ext(1 << (code - 0xD4))
+        if 0xD9 <= code <= 0xDB:
+            return self.read(self.uint(1 << (code - 0xD9))).decode("utf-8")
+        if code in (0xDC, 0xDD):
+            return [self.unpack() for _ in range(self.uint(2 if code == 0xDC else 4))]
+        if code in (0xDE, 0xDF):
+            return self.map(self.uint(2 if code == 0xDE else 4))
+        raise ValueError(f"Invalid type byte 0x{code:02x}")
+
+    def map(self, length: int) -> Dict[Any, Any]:
+        result = {}
+        for _ in range(length):
+            key = self.unpack()
+            result[key] = self.unpack()
+        return result
+
+    def ext(self, size: int) -> str:
+        code = self.read(1)[0]
+        data = self.read(size)
+        if code == EXT_DEFINE:
+            text = data.decode("utf-8")
+            self.interned.append(text)
+            return text
+        if code == EXT_REFERENCE:
+            return self.interned[int.from_bytes(data, "big")]
+        raise ValueError(f"Unknown ext type {code}")
+
+
+def decode_stream(stream: BinaryIO) -> Iterator[Any]:
+    """Yield each object of a stream written by ``WorkflowEncoder``"""
+    reader = _Reader(stream)
+    while True:
+        first = stream.read(1)
+        if not first:
+            return
+        yield reader.value(first[0])
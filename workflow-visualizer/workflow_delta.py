@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Workflow Deltas - Versioned workflow snapshots and compact diffs between them
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from parser import WorkflowSnapshot
+
+
+def connection_key(conn: Dict[str, Any]) -> str:
+    """Stable key for a connection, matching the client's ``from→to`` key"""
+    return f"{conn['from']}→{conn['to']}"
+
+
+def diff_workflows(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute the added/changed/removed nodes and connections between two workflows
+
+    The result has the compact form::
+
+        {"nodes": {"upsert": [...], "remove": [ids]},
+         "connections": {"upsert": [...], "remove": [[from, to], ...]},
+         "set": {other top-level key: new value}}
+    """
+    old_nodes = {n["id"]: n for n in old.get("nodes", [])}
+    new_nodes = {n["id"]: n for n in new.get("nodes", [])}
+    old_conns = {connection_key(c): c for c in old.get("connections", [])}
+    new_conns = {connection_key(c): c for c in new.get("connections", [])}
+
+    return {
+        "nodes": {
+            "upsert": [n for node_id, n in new_nodes.items() if old_nodes.get(node_id) != n],
+            "remove": [node_id for node_id in old_nodes if node_id not in new_nodes],
+        },
+        "connections": {
+            "upsert": [c for key, c in new_conns.items() if old_conns.get(key) != c],
+            "remove": [[c["from"], c["to"]] for key, c in old_conns.items() if key not in new_conns],
+        },
+        # Other top-level fields (e.g. metrics) are replaced wholesale when they change
+        "set": {
+            key: value for key, value in new.items()
+            if key not in ("nodes", "connections") and old.get(key) != value
+        },
+    }
+
+
+def apply_delta(workflow: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a delta from ``diff_workflows`` and return the patched workflow
+
+    The reference for ``applyDelta`` in workflow.js: kept entries stay in
+    place and new ones are appended, as the clients do.
+    """
+    removed_nodes = set(delta["nodes"]["remove"])
+    nodes = OrderedDict((n["id"], n) for n in workflow.get("nodes", []) if n["id"] not in removed_nodes)
+    for node in delta["nodes"]["upsert"]:
+        nodes[node["id"]] = node
+
+    removed_conns = {f"{f}→{t}" for f, t in delta["connections"]["remove"]}
+    conns = OrderedDict(
+        (connection_key(c), c) for c in workflow.get("connections", [])
+        if connection_key(c) not in removed_conns
+    )
+    for conn in delta["connections"]["upsert"]:
+        conns[connection_key(conn)] = conn
+
+    patched = dict(workflow)
+    patched.update(delta.get("set", {}))
+    patched["nodes"] = list(nodes.values())
+    patched["connections"] = list(conns.values())
+    return patched
+
+
+class WorkflowHistory:
+    """Monotonically versioned workflow snapshots
+
+    Keeps the last ``max_versions`` workflows so a reconnecting client that
+    reports its last-seen version can be caught up with a single delta.
+    The epoch changes every time the server starts, so versions from a
+    previous run are never mistaken for current ones.
+    """
+
+    def __init__(self, max_versions: int = 32):
+        self.max_versions = max_versions
+        self.epoch = format(time.time_ns(), "x")
+        self.version = 0
+        self.digest: Optional[str] = None
+        self._workflows: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._full_messages: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot: WorkflowSnapshot) -> Optional[str]:
+        """Record ``snapshot`` as the next version
+
+        Returns the message to broadcast to clients that are at the previous
+        version, or None when the workflow did not change.
+        """
+        with self._lock:
+            if snapshot.digest == self.digest:
+                return None
+
+            workflow = snapshot.workflow
+            previous_version = self.version
+            previous = self._workflows.get(previous_version)
+            self.digest = snapshot.digest
+            if workflow == previous:
+                # e.g. a comment-only edit: new content hash, same graph
+                return None
+
+            self.version += 1
+            self._workflows[self.version] = workflow
+            self._full_messages[self.version] = snapshot.message(epoch=self.epoch, version=self.version)
+            while len(self._workflows) > self.max_versions:
+                old_version, _ = self._workflows.popitem(last=False)
+                self._full_messages.pop(old_version, None)
+
+            if previous is None:
+                return self._full_messages[self.version]
+            return self._delta_message(previous_version, previous, workflow)
+
+    def replicate(self, snapshot: WorkflowSnapshot, epoch: str, version: int) -> Optional[str]:
+        """Record ``snapshot`` as ``epoch``/``version`` as published by another process
+
+        Used by workers that follow the parsing leader, so every worker hands
+        out the same epoch and version numbers. Returns the message to
+        broadcast, like ``publish``.
+        """
+        with self._lock:
+            if epoch != self.epoch:
+                # Our own epoch (or a previous leader's) is meaningless to clients now
+                self.epoch = epoch
+                self.version = 0
+                self._workflows.clear()
+                self._full_messages.clear()
+            elif version <= self.version:
+                return None
+
+            previous_version = self.version
+            previous = self._workflows.get(previous_version)
+            workflow = snapshot.workflow
+            self.digest = snapshot.digest
+            self.version = version
+            self._workflows[version] = workflow
+            self._full_messages[version] = snapshot.message(epoch=epoch, version=version)
+            while len(self._workflows) > self.max_versions:
+                old_version, _ = self._workflows.popitem(last=False)
+                self._full_messages.pop(old_version, None)
+
+            if previous is None:
+                return self._full_messages[version]
+            return self._delta_message(previous_version, previous, workflow)
+
+    def _delta_message(self, base: int, old: Dict[str, Any], new: Dict[str, Any]) -> str:
+        """Delta message from ``base`` to the current version, or a full one if smaller"""
+        delta = diff_workflows(old, new)
+        message = json.dumps({
+            "type": "workflow_delta",
+            "epoch": self.epoch,
+            "base": base,
+            "version": self.version,
+            "delta": delta,
+        }, separators=(",", ":"))
+        full = self._full_messages[self.version]
+        return full if len(message) >= len(full) else message
+
+    def full_message(self) -> Optional[str]:
+        with self._lock:
+            return self._full_messages.get(self.version)
+
+    def catch_up_message(self, epoch: Optional[str], version: Optional[int]) -> Optional[str]:
+        """Message bringing a client at ``epoch``/``version`` up to date
+
+        Returns a ``workflow_current`` acknowledgement when the client is
+        already current, a delta when its version is still in the history,
+        and the full workflow otherwise.
+        """
+        with self._lock:
+            if not self._workflows:
+                return None
+            if epoch == self.epoch and version is not None:
+                if version == self.version:
+                    return json.dumps({"type": "workflow_current", "epoch": self.epoch, "version": self.version})
+                base = self._workflows.get(version)
+                if base is not None:
+                    return self._delta_message(version, base, self._workflows[self.version])
+            return self._full_messages[self.version]